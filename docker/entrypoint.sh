@@ -0,0 +1,19 @@
+#!/bin/sh
+# Arranque del contenedor según POKEDEX_SERVER_MODE:
+#   dev  -> runserver (un proceso, recarga automática)
+#   wsgi -> gunicorn con worker gthread (ver gunicorn.conf.py)
+#   asgi -> gunicorn con worker uvicorn (uvicorn_worker.UvicornWorker)
+set -e
+
+MODE="${POKEDEX_SERVER_MODE:-dev}"
+
+if [ "$MODE" = "dev" ]; then
+    exec python manage.py runserver 0.0.0.0:8000
+fi
+
+# Estáticos con hash y precomprimidos (.gz / .br) en STATIC_ROOT
+python manage.py collectstatic --noinput --verbosity 0
+# Falla rápido si la DB no responde, faltan migraciones o el manifest
+python manage.py warmup --check-only
+
+exec gunicorn --config gunicorn.conf.py
@@ -7,10 +7,10 @@ class PokemonAdmin(admin.ModelAdmin):
     list_display = ('pokedex_id', 'name', 'types', 'height', 'weight')
     
     # Permite buscar por nombre y tipo desde el panel
-    search_fields = ('name', 'types')
+    search_fields = ('name', 'slots__type__name')
     
     # Permite filtrar por tipo rápidamente
-    list_filter = ('types',)
+    list_filter = ('slots__type',)
     
     # Orden por defecto
     ordering = ('pokedex_id',)
\ No newline at end of file
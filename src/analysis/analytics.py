@@ -0,0 +1,439 @@
+"""
+Motor de analítica columnar en memoria sobre la tabla Pokemon.
+
+La tabla se carga una vez en columnas compactas (`array` de la librería
+estándar, sin dependencias nuevas) y las estadísticas se calculan
+recorriendo esas columnas en lugar de instanciar objetos del ORM.
+
+La carga también precalcula lo que no depende de los filtros: las filas de
+cada tipo, el IMC de cada fila agrupado por tipo, cada columna numérica ya
+ordenada y los agregados del dataset completo. Los rangos de peso y altura
+se resuelven con dos `bisect` sobre la columna ordenada y un corte del
+orden de filas. Una consulta sin filtros responde con los totales; con
+filtros que dejan pocas filas, se leen solo esas filas; con el resto, se
+marcan en una máscara y se recorren los tramos precalculados con
+`compress` / `sum` / `bisect`, sin un `sorted` por consulta.
+
+El almacén se invalida con la misma versión de dataset que la caché de
+resultados del dashboard. Con POKEDEX_ANALYTICS_BACKGROUND_REFRESH (por
+defecto en modo producción) la recarga corre en segundo plano (JobRunner)
+y, mientras tanto, se sigue respondiendo con el almacén anterior; /stats/
+toma su ETag de la versión del almacén, así que nunca etiqueta datos viejos
+como nuevos. Sin esa opción, la primera consulta tras una escritura
+recarga las columnas.
+"""
+import bisect
+import math
+import threading
+from array import array
+from collections import Counter
+from functools import partial
+from itertools import chain, compress
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from . import result_cache
+from .jobs import runner
+from .models import Pokemon, split_types
+
+LOAD_CHUNK_SIZE = 2000
+DEFAULT_PERCENTILES = (25, 50, 75, 90, 99)
+NO_TYPE = -1
+NUMERIC_COLUMNS = ('height', 'weight')
+# Por debajo de 1/DIRECT_SCAN_RATIO del almacén, los agregados leen solo las
+# filas seleccionadas en lugar de recorrer los tramos precalculados
+DIRECT_SCAN_RATIO = 32
+# Nombre de la tarea de JobRunner que recarga el almacén
+REFRESH_JOB = 'analytics-refresh'
+
+# Filas seleccionadas para los agregados: (máscara, filas), ver ColumnStore._selection
+Selection = Tuple[Optional[bytearray], Optional[Sequence[int]]]
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> Optional[float]:
+    """Percentil `p` (0-100) con interpolación lineal sobre valores ya ordenados."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def histogram(sorted_values: Sequence[float], bins: int) -> Dict[str, List[float]]:
+    """
+    Histograma de `bins` intervalos iguales entre el mínimo y el máximo de
+    valores ya ordenados: cada conteo es la distancia entre dos `bisect`.
+    """
+    if not sorted_values:
+        return {'edges': [], 'counts': []}
+    low, high = sorted_values[0], sorted_values[-1]
+    width = (high - low) / bins or 1.0
+    edges = [low + width * i for i in range(bins + 1)]
+    # El máximo cae en el último intervalo (cerrado por la derecha)
+    cuts = [bisect.bisect_left(sorted_values, edge) for edge in edges[1:bins]]
+    bounds = [0, *cuts, len(sorted_values)]
+    counts = [bounds[k + 1] - bounds[k] for k in range(bins)]
+    return {'edges': [round(e, 4) for e in edges], 'counts': counts}
+
+
+def gatherer(positions: Sequence[int]) -> Callable[[Sequence[Any]], Tuple[Any, ...]]:
+    """
+    `itemgetter` sobre `positions` que siempre devuelve una tupla (también
+    con 0 o 1 posiciones). Recoge los valores en C, sin un bucle de Python.
+    """
+    if not positions:
+        return lambda seq: ()
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda seq: (seq[position],)
+    return itemgetter(*positions)
+
+
+class ColumnStore:
+    """
+    Copia columnar de Pokemon.
+
+    Attributes:
+        pokedex_id, height, weight: Columnas numéricas (`array`).
+        types_count: Cantidad de tipos por fila.
+        primary, secondary: Código del tipo por slot (NO_TYPE si no tiene).
+        names: Nombres (para el filtro por subcadena).
+        type_names: Tabla de códigos -> nombre de tipo.
+        version: Versión del dataset con la que se cargó.
+
+    Precalculado en `load` (ver `_precompute`):
+        type_rows: Por código de tipo, las filas que lo tienen en algún slot.
+        type_bmi_rows, type_bmi: Por código de tipo, las filas con altura
+            mayor que 0 y su IMC, en el mismo orden.
+        bmi: IMC de cada fila (NaN si no tiene altura).
+        order, sorted_values: Por columna numérica, las filas ordenadas por
+            valor y esos valores.
+        rank: Por columna numérica, la posición de cada fila en `order`.
+
+    Para cada uno de esos tramos guarda además un `gatherer` que lee de una
+    máscara de selección las posiciones del tramo.
+    """
+
+    def __init__(self) -> None:
+        self.pokedex_id = array('q')
+        self.height = array('d')
+        self.weight = array('d')
+        self.types_count = array('B')
+        self.primary = array('h')
+        self.secondary = array('h')
+        self.names: List[str] = []
+        self.type_names: List[str] = []
+        self.version: Optional[int] = None
+        self.type_rows: List[array] = []
+        self.type_bmi_rows: List[array] = []
+        self.type_bmi: List[array] = []
+        self.bmi = array('d')
+        self.order: Dict[str, array] = {}
+        self.sorted_values: Dict[str, array] = {}
+        self.rank: Dict[str, array] = {}
+        self._totals: Dict[str, Any] = {}
+        self._type_gather: List[Callable] = []
+        self._bmi_gather: List[Callable] = []
+        self._order_gather: Dict[str, Callable] = {}
+
+    def __len__(self) -> int:
+        return len(self.pokedex_id)
+
+    @classmethod
+    def load(cls) -> 'ColumnStore':
+        """Lee la tabla en una sola consulta por bloques y arma las columnas."""
+        store = cls()
+        store.version = result_cache.dataset_version()
+        codes: Dict[str, int] = {}
+
+        def code(name: str) -> int:
+            if name not in codes:
+                codes[name] = len(store.type_names)
+                store.type_names.append(name)
+            return codes[name]
+
+        rows = (
+            Pokemon.objects.order_by('pokedex_id')
+            .values_list('pokedex_id', 'name', 'types', 'height', 'weight')
+            .iterator(chunk_size=LOAD_CHUNK_SIZE)
+        )
+        for pokedex_id, name, types_csv, height, weight in rows:
+            type_list = split_types(types_csv)
+            store.pokedex_id.append(pokedex_id)
+            store.names.append(name)
+            store.height.append(height)
+            store.weight.append(weight)
+            store.types_count.append(min(len(type_list), 255))
+            store.primary.append(code(type_list[0]) if type_list else NO_TYPE)
+            store.secondary.append(code(type_list[1]) if len(type_list) > 1 else NO_TYPE)
+        store._precompute()
+        return store
+
+    def _precompute(self) -> None:
+        """Tramos por tipo, columnas ordenadas y agregados del dataset completo."""
+        type_rows = [array('l') for _ in self.type_names]
+        bmi_rows = [array('l') for _ in self.type_names]
+        bmi_values = [array('d') for _ in self.type_names]
+        bmi_column = array('d')
+        for i, (weight, height, primary, secondary) in enumerate(
+            zip(self.weight, self.height, self.primary, self.secondary)
+        ):
+            # DB: peso en Hg (/10 -> kg) y altura en Dm (/10 -> m); sin altura no hay IMC
+            height_m = height / 10
+            bmi = (weight / 10) / (height_m * height_m) if height_m > 0 else None
+            bmi_column.append(math.nan if bmi is None else bmi)
+            for code in (primary, secondary):
+                if code != NO_TYPE:
+                    type_rows[code].append(i)
+                    if bmi is not None:
+                        bmi_rows[code].append(i)
+                        bmi_values[code].append(bmi)
+        self.type_rows, self.type_bmi_rows, self.type_bmi = type_rows, bmi_rows, bmi_values
+        self.bmi = bmi_column
+
+        for column in NUMERIC_COLUMNS:
+            data = getattr(self, column)
+            order = self.order[column] = array('l', sorted(range(len(self)), key=data.__getitem__))
+            self.sorted_values[column] = array('d', sorted(data))
+            rank = self.rank[column] = array('l', bytes(order.itemsize * len(order)))
+            for position, row in enumerate(order):
+                rank[row] = position
+            self._order_gather[column] = gatherer(self.order[column])
+        self._type_gather = [gatherer(rows) for rows in self.type_rows]
+        self._bmi_gather = [gatherer(rows) for rows in self.type_bmi_rows]
+
+        self._totals = {
+            'types': [len(rows) for rows in self.type_rows],
+            'bmi': [(sum(values), len(values)) for values in self.type_bmi],
+        }
+
+    # --- Filtros ---
+
+    def select(
+        self,
+        name: str = '',
+        type_name: str = '',
+        weight_range: Sequence[Optional[float]] = (None, None),
+        height_range: Sequence[Optional[float]] = (None, None),
+        inclusive: bool = False,
+    ) -> Sequence[int]:
+        """
+        Índices de las filas que cumplen los filtros (mismas unidades y
+        semántica de rangos que PokemonQuery: Hg, Dm, estricto o inclusivo),
+        sin repetidos y en cualquier orden.
+
+        El tipo y cada rango son tramos ya calculados (el rango, con dos
+        `bisect`); se parte del más corto y se descartan sus filas que no
+        estén en los demás: para el tipo, según su máscara; para un rango,
+        según si el `rank` de la fila cae en el corte. Nunca se recorre todo
+        el almacén, salvo con el filtro por nombre y sin ningún otro filtro.
+        """
+        # (filas del tramo, filtro que deja de otras filas solo las del tramo)
+        parts: List[Tuple[Sequence[int], Callable[[Sequence[int]], Sequence[int]]]] = []
+        if type_name:
+            if type_name not in self.type_names:
+                return []
+            rows = self.type_rows[self.type_names.index(type_name)]
+            parts.append((rows, partial(self._keep_marked, rows)))
+        for column, (low, high) in (('weight', weight_range), ('height', height_range)):
+            if low is not None or high is not None:
+                span = self._range_span(column, low, high, inclusive)
+                parts.append((self.order[column][span.start:span.stop], partial(self._keep_ranked, column, span)))
+
+        if not parts:
+            indices: Sequence[int] = range(len(self))
+        else:
+            parts.sort(key=lambda part: len(part[0]))
+            indices = parts[0][0]
+            for _, keep in parts[1:]:
+                indices = keep(indices)
+
+        if name:
+            needle = name.lower()
+            names = self.names
+            indices = [i for i in indices if needle in names[i]]
+
+        return indices
+
+    def _range_span(self, column: str, low: Optional[float], high: Optional[float], inclusive: bool) -> range:
+        """
+        Posiciones de `order[column]` con el valor dentro del rango. Estricto:
+        del primer valor > low (`bisect_right`) al último < high
+        (`bisect_left`); inclusivo, al revés.
+        """
+        values = self.sorted_values[column]
+        start, stop = 0, len(values)
+        if low is not None:
+            start = (bisect.bisect_left if inclusive else bisect.bisect_right)(values, low)
+        if high is not None:
+            stop = (bisect.bisect_right if inclusive else bisect.bisect_left)(values, high)
+        return range(start, max(start, stop))
+
+    def _keep_marked(self, rows: Sequence[int], indices: Sequence[int]) -> List[int]:
+        """Las filas de `indices` que también están en `rows`."""
+        if not indices:
+            return []
+        return list(compress(indices, gatherer(indices)(self._mark(rows))))
+
+    def _keep_ranked(self, column: str, span: range, indices: Sequence[int]) -> List[int]:
+        """Las filas de `indices` cuya posición en `order[column]` cae en `span`."""
+        positions = gatherer(indices)(self.rank[column])
+        return [row for row, position in zip(indices, positions) if position in span]
+
+    # --- Agregados ---
+
+    def _mark(self, rows: Iterable[int]) -> bytearray:
+        """Máscara con un 1 en cada fila de `rows`."""
+        mask = bytearray(len(self))
+        for i in rows:
+            mask[i] = 1
+        return mask
+
+    def _selection(self, indices: Sequence[int]) -> Selection:
+        """
+        Cómo recorrer `indices` (sin repetidos, como los devuelve `select`):
+        (None, None) si cubre todo el almacén; (None, filas en orden) si son
+        pocas y conviene leerlas una a una; (máscara, None) en otro caso.
+        """
+        if len(indices) == len(self):
+            return None, None
+        if len(indices) * DIRECT_SCAN_RATIO < len(self):
+            return None, sorted(indices)
+        return self._mark(indices), None
+
+    def _type_counts(self, selection: Selection) -> List[int]:
+        mask, rows = selection
+        if rows is not None:
+            gather = gatherer(rows)
+            found = Counter(chain(gather(self.primary), gather(self.secondary)))
+            return [found[code] for code in range(len(self.type_names))]
+        if mask is None:
+            return self._totals['types']
+        return [sum(gather(mask)) for gather in self._type_gather]
+
+    def _sorted_column(self, column: str, selection: Selection) -> Sequence[float]:
+        """Valores de la columna en las filas seleccionadas, ya ordenados."""
+        mask, rows = selection
+        if rows is not None:
+            return sorted(gatherer(rows)(getattr(self, column)))
+        if mask is None:
+            return self.sorted_values[column]
+        return list(compress(self.sorted_values[column], self._order_gather[column](mask)))
+
+    def _bmi_totals(self, selection: Selection) -> List[Tuple[float, int]]:
+        """(suma, cantidad) del IMC por código de tipo."""
+        mask, rows = selection
+        if rows is not None:
+            values: List[List[float]] = [[] for _ in self.type_names]
+            for i in rows:
+                bmi = self.bmi[i]
+                if math.isnan(bmi):
+                    continue
+                for code in (self.primary[i], self.secondary[i]):
+                    if code != NO_TYPE:
+                        values[code].append(bmi)
+            return [(sum(selected), len(selected)) for selected in values]
+        if mask is None:
+            return self._totals['bmi']
+        totals = []
+        for gather, values in zip(self._bmi_gather, self.type_bmi):
+            selected = list(compress(values, gather(mask)))
+            totals.append((sum(selected), len(selected)))
+        return totals
+
+    def type_distribution(self, indices: Sequence[int]) -> Dict[str, int]:
+        """Cantidad de Pokémon por tipo (un Pokémon dual cuenta en ambos)."""
+        return self._type_distribution(self._selection(indices))
+
+    def _type_distribution(self, selection: Selection) -> Dict[str, int]:
+        counts = self._type_counts(selection)
+        ranked = sorted(range(len(counts)), key=lambda c: (-counts[c], self.type_names[c]))
+        return {self.type_names[c]: counts[c] for c in ranked if counts[c]}
+
+    def ratio_by_type(self, indices: Sequence[int]) -> Dict[str, Dict[str, float]]:
+        """
+        Índice de masa tipo IMC (kg / m²) promedio por tipo.
+
+        DB: peso en Hg (/10 -> kg) y altura en Dm (/10 -> m). Las filas con
+        altura 0 se omiten.
+        """
+        return self._ratio_by_type(self._selection(indices))
+
+    def _ratio_by_type(self, selection: Selection) -> Dict[str, Dict[str, float]]:
+        totals = self._bmi_totals(selection)
+        return {
+            self.type_names[code]: {'mean_bmi': round(total / count, 2), 'count': count}
+            for code, (total, count) in sorted(enumerate(totals), key=lambda item: self.type_names[item[0]])
+            if count
+        }
+
+    def column_stats(
+        self, column: str, indices: Sequence[int], bins: int = 10,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    ) -> Dict[str, Any]:
+        """Mínimo, máximo, media, percentiles e histograma de 'height' o 'weight'."""
+        return self._column_stats(column, self._selection(indices), bins, percentiles)
+
+    def _column_stats(self, column: str, selection: Selection, bins: int,
+                      percentiles: Sequence[float]) -> Dict[str, Any]:
+        values = self._sorted_column(column, selection)
+        if not values:
+            return {'count': 0}
+        return {
+            'count': len(values),
+            'min': values[0],
+            'max': values[-1],
+            'mean': round(sum(values) / len(values), 4),
+            'percentiles': {str(p): round(percentile(values, p), 4) for p in percentiles},
+            'histogram': histogram(values, bins),
+        }
+
+    def summary(self, indices: Sequence[int], bins: int = 10,
+                percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """Reporte completo para el endpoint /stats/."""
+        selection = self._selection(indices)
+        return {
+            'count': len(indices),
+            'types': self._type_distribution(selection),
+            'weight_hg': self._column_stats('weight', selection, bins, percentiles),
+            'height_dm': self._column_stats('height', selection, bins, percentiles),
+            'bmi_by_type': self._ratio_by_type(selection),
+        }
+
+
+_store: Optional[ColumnStore] = None
+_lock = threading.Lock()
+
+
+def get_store() -> ColumnStore:
+    """
+    Almacén vigente. Se recarga si la versión del dataset cambió desde la
+    última carga (cualquier escritura en Pokemon, incluida la sincronización).
+
+    Con POKEDEX_ANALYTICS_BACKGROUND_REFRESH la recarga se encarga a
+    JobRunner (una sola a la vez) y se devuelve el almacén anterior; solo la
+    primera carga del proceso es síncrona.
+    """
+    global _store
+    version = result_cache.dataset_version()
+    store = _store
+    if store is not None and store.version == version:
+        return store
+    if store is not None and settings.POKEDEX_ANALYTICS_BACKGROUND_REFRESH:
+        runner.submit(REFRESH_JOB, lambda job: refresh().version)
+        return store
+    with _lock:
+        if _store is None or _store.version != version:
+            _store = ColumnStore.load()
+        return _store
+
+
+def refresh() -> ColumnStore:
+    """Fuerza la recarga (ej: al terminar una sincronización)."""
+    global _store
+    with _lock:
+        _store = ColumnStore.load()
+        return _store
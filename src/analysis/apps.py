@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AnalysisConfig(AppConfig):
     name = 'analysis'
+
+    def ready(self):
+        # Registro de receptores de señales (relación de tipos, etc.)
+        from . import signals  # noqa: F401
+
+        # SQLite borra los triggers de FTS5 y de DatasetVersion si una migración
+        # reconstruye la tabla analysis_pokemon: se reinstalan (idempotente) tras cada migrate.
+        post_migrate.connect(signals.ensure_search_index, sender=self)
+        post_migrate.connect(signals.ensure_version_triggers, sender=self)
@@ -0,0 +1,415 @@
+"""
+Benchmarks de consultas, del dashboard y de la sincronización sobre datos sintéticos.
+
+Las funciones de este módulo trabajan sobre la base de datos activa; el
+comando `manage.py benchmark` se encarga de ejecutarlas dentro de una base
+aislada (creada y destruida al vuelo) para no tocar los datos reales. Por
+lo mismo reemplaza el alias `results` por una LocMemCache privada
+(`isolated_caches`): en producción ese alias es una FileBasedCache
+compartida con los workers y las suites la vacían en cada medición.
+
+Cada suite devuelve {variante: {'median_ms', 'p99_ms', 'min_ms', 'rows'}};
+`report` le agrega metadatos (commit, motor de DB) y `compare` la contrasta
+con un reporte anterior para detectar regresiones entre commits.
+"""
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Max, Min
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import analytics, result_cache, search
+from .models import Pokemon, PokemonType, SyncCheckpoint, Type
+from .pagination import encode_token
+from .query import PokemonQuery
+from .services import PokeService
+from .stub_api import StubPokeAPI
+
+# Catálogo de tipos usado para generar datos (mismo que ofrece el dashboard)
+TYPE_NAMES = [
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug",
+    "ghost", "steel", "fire", "water", "grass", "electric", "psychic",
+    "ice", "dragon", "dark", "fairy",
+]
+
+SEED_BATCH_SIZE = 5000
+
+# Ubicación de la LocMemCache privada que reemplaza a 'results' durante un benchmark
+BENCHMARK_CACHE_LOCATION = 'pokedex-benchmark-results'
+
+
+def isolated_caches() -> Dict[str, Dict[str, Any]]:
+    """
+    CACHES con el alias `results` en una LocMemCache privada de este proceso.
+
+    Conserva TIMEOUT y OPTIONS del alias real para medir el mismo LRU.
+    Pensado para `override_settings(CACHES=...)`, que al salir restaura el
+    alias original.
+    """
+    caches_setting = {alias: dict(conf) for alias, conf in settings.CACHES.items()}
+    results = caches_setting.get(result_cache.CACHE_ALIAS, {})
+    caches_setting[result_cache.CACHE_ALIAS] = {
+        **{key: results[key] for key in ('TIMEOUT', 'OPTIONS') if key in results},
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': BENCHMARK_CACHE_LOCATION,
+    }
+    return caches_setting
+
+
+def synthetic_types(pokedex_id: int) -> List[str]:
+    """Tipos deterministas para un id: uno primario y, en ids pares, un secundario."""
+    primary = TYPE_NAMES[pokedex_id % len(TYPE_NAMES)]
+    if pokedex_id % 2:
+        return [primary]
+    return [primary, TYPE_NAMES[(pokedex_id * 7 + 3) % len(TYPE_NAMES)]]
+
+
+def seed(rows: int) -> None:
+    """
+    Inserta `rows` Pokémon sintéticos con sus slots normalizados.
+
+    Se insertan por lotes y sin pasar por save(), así que los slots se
+    construyen aquí directamente en lugar de vía la señal post_save.
+    """
+    Type.objects.bulk_create([Type(name=name) for name in TYPE_NAMES], ignore_conflicts=True)
+    type_ids = dict(Type.objects.values_list('name', 'id'))
+
+    for start in range(1, rows + 1, SEED_BATCH_SIZE):
+        ids = range(start, min(start + SEED_BATCH_SIZE, rows + 1))
+        with transaction.atomic():
+            Pokemon.objects.bulk_create([
+                Pokemon(
+                    pokedex_id=i,
+                    name=f"pokemon-{i}",
+                    types=", ".join(synthetic_types(i)),
+                    height=i % 200 + 1,
+                    weight=i % 9000 + 1,
+                    types_count=len(synthetic_types(i)),
+                    name_reversed=f"pokemon-{i}"[::-1],
+                )
+                for i in ids
+            ])
+            pks = dict(Pokemon.objects.filter(pokedex_id__in=ids).values_list('pokedex_id', 'pk'))
+            PokemonType.objects.bulk_create([
+                PokemonType(pokemon_id=pks[i], type_id=type_ids[name], slot=slot)
+                for i in ids
+                for slot, name in enumerate(synthetic_types(i), start=1)
+            ])
+
+
+def measure(func: Callable[[], object], repeat: int,
+            setup: Optional[Callable[[], object]] = None) -> Dict[str, float]:
+    """
+    Ejecuta `func` `repeat` veces y devuelve mediana (p50), p99 y mínimo en
+    milisegundos. `setup` corre antes de cada repetición, fuera de la medición.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p99_ms': round(analytics.percentile(timings, 99), 3),
+        'min_ms': round(timings[0], 3),
+    }
+
+
+def types_suite(repeat: int = 5, type_name: str = 'dragon') -> Dict[str, Dict[str, float]]:
+    """
+    Compara el filtro por tipo antiguo (LIKE sobre el CSV) con la relación indexada.
+
+    Returns:
+        {'icontains': {...}, 'relation': {...}} con tiempos y filas encontradas.
+    """
+    variants = {
+        'icontains': lambda: list(Pokemon.objects.filter(types__icontains=type_name).values_list('pk', flat=True)),
+        'relation': lambda: list(Pokemon.objects.filter(slots__type__name=type_name).values_list('pk', flat=True)),
+    }
+    results = {}
+    for label, query in variants.items():
+        results[label] = measure(query, repeat)
+        results[label]['rows'] = len(query())
+    return results
+
+
+def analytics_suite(repeat: int = 5, min_weight_hg: float = 1000) -> Dict[str, Dict[str, float]]:
+    """
+    Compara los agregados del almacén columnar (analysis/analytics.py) con
+    las consultas equivalentes del ORM: distribución por tipo, min/max/media
+    de peso y altura e IMC medio por tipo, sobre Pokémon de más de
+    `min_weight_hg`. Los percentiles e histogramas no tienen equivalente
+    portable en el ORM y solo se miden del lado columnar. 'select' mide solo
+    el filtro por rango del almacén (dos `bisect` y un corte).
+    """
+    def orm():
+        qs = Pokemon.objects.filter(weight__gt=min_weight_hg)
+        slots = PokemonType.objects.filter(pokemon__weight__gt=min_weight_hg)
+        height_m = F('pokemon__height') / 10.0
+        return (
+            dict(slots.values_list('type__name').annotate(n=Count('id'))),
+            qs.aggregate(Min('weight'), Max('weight'), Avg('weight'), Min('height'), Max('height'), Avg('height')),
+            list(slots.filter(pokemon__height__gt=0).values('type__name').annotate(
+                bmi=Avg(F('pokemon__weight') / 10.0 / (height_m * height_m))
+            )),
+        )
+
+    def columnar():
+        store = analytics.get_store()
+        return store.summary(store.select(weight_range=(min_weight_hg, None)))
+
+    results = {
+        'load': measure(analytics.refresh, 1),
+        'orm': measure(orm, repeat),
+        'columnar': measure(columnar, repeat),
+        'select': measure(lambda: analytics.get_store().select(weight_range=(min_weight_hg, None)), repeat),
+    }
+    rows = analytics.get_store().select(weight_range=(min_weight_hg, None))
+    for stats in results.values():
+        stats['rows'] = len(rows)
+    return results
+
+
+def search_suite(repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Búsqueda por nombre: prefijo (índice de `name` y lista ordenada en memoria),
+    subcadena con FTS5 frente a `icontains`, y coincidencia aproximada con el
+    índice de trigramas.
+    """
+    rows = Pokemon.objects.count()
+    prefix = f"pokemon-{rows // 2}"[:-1]   # ej: 'pokemon-5000' -> ~11 coincidencias
+    substring = f"n-{rows // 3}"
+    typo = f"pokmon-{rows // 4}"
+
+    # Construcción de los índices en memoria fuera de la medición
+    search.get_index()
+    search.get_prefix_index()
+    variants = {
+        'prefix': lambda: list(search.prefix_matches(prefix, 10).values_list('pk', flat=True)),
+        'icontains': lambda: list(Pokemon.objects.filter(name__icontains=substring).values_list('pk', flat=True)),
+        'fts5': lambda: list(search.filter_name(Pokemon.objects.all(), substring).values_list('pk', flat=True)),
+        'autocomplete': lambda: search.autocomplete(prefix, 10),
+        'fuzzy': lambda: search.fuzzy(typo, 10),
+    }
+    results = {}
+    for label, query in variants.items():
+        results[label] = measure(query, repeat)
+        results[label]['rows'] = len(query())
+    return results
+
+
+def dashboard_scenarios(rows: int) -> Dict[str, Dict[str, str]]:
+    """Combinaciones representativas de filtros y orden para pokedex_view."""
+    middle = rows // 2
+    return {
+        'default': {},
+        'name': {'name': f"mon-{middle // 10}"},
+        'type': {'type': 'dragon'},
+        'weight_range': {'min_weight': '100', 'max_weight': '500', 'range_mode': 'inclusive'},
+        'sort_weight_desc': {'sort': 'weight', 'direction': 'desc'},
+        'sort_transformed': {'sort': 'transformed', 'limit': '10'},
+        'combined': {'type': 'fire', 'min_height': '500', 'sort': 'height', 'direction': 'desc', 'limit': '25'},
+        'deep_page': {'cursor': encode_token('pokedex_id:asc', 'next', middle, middle)},
+    }
+
+
+def dashboard_suite(repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Peticiones completas a pokedex_view con el cliente de pruebas (URL,
+    vista, consultas y template). Cada escenario se mide sin caché de
+    resultados; 'cached' repite 'default' con la caché caliente.
+
+    'fragment' y 'fragment_cached' miden lo mismo que 'sort_weight_desc' y
+    'cached' pero contra /table/, el fragmento que pide el dashboard por
+    AJAX al ordenar o filtrar.
+    """
+    client = Client()
+
+    def request(params, name='home'):
+        response = client.get(reverse(name), params)
+        if response.status_code != 200:
+            raise RuntimeError(f"{name} respondió {response.status_code} para {params}")
+        return response
+
+    results = {}
+    scenarios = dashboard_scenarios(Pokemon.objects.count())
+    for label, params in scenarios.items():
+        results[label] = measure(lambda: request(params), repeat, setup=result_cache.clear)
+        results[label]['rows'] = PokemonQuery.from_params(params).filtered().count()
+
+    request({})
+    results['cached'] = measure(lambda: request({}), repeat)
+    results['cached']['rows'] = results['default']['rows']
+
+    sort_params = scenarios['sort_weight_desc']
+    results['fragment'] = measure(lambda: request(sort_params, 'table'), repeat, setup=result_cache.clear)
+    results['fragment']['rows'] = results['sort_weight_desc']['rows']
+    request({}, 'table')
+    results['fragment_cached'] = measure(lambda: request({}, 'table'), repeat)
+    results['fragment_cached']['rows'] = results['default']['rows']
+    return results
+
+
+def sync_suite(repeat: int = 3, count: int = 500, latency_ms: float = 20.0,
+               concurrency: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Sincronización completa e incremental contra un StubPokeAPI local que
+    agrega `latency_ms` a cada respuesta. Parte de una tabla vacía: cada
+    repetición de 'full' borra los Pokémon y el checkpoint antes de medir.
+
+    Args:
+        count: Especies que expone el stub (y POKEDEX_TARGET_SIZE).
+        latency_ms: Latencia inyectada por petición.
+        concurrency: Peticiones de detalle simultáneas (None = settings).
+    """
+    def reset():
+        Pokemon.objects.all().delete()
+        SyncCheckpoint.objects.all().delete()
+
+    with StubPokeAPI(count=count, latency=latency_ms / 1000) as api, override_settings(
+        POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=count, POKEAPI_RATE_LIMIT=0,
+        POKEAPI_CACHE_PATH='', POKEAPI_OFFLINE=False,
+    ):
+        results = {
+            'full': measure(lambda: PokeService.sync_data(concurrency=concurrency), repeat, setup=reset),
+            # Tras la última corrida completa: todas las respuestas son 304
+            'incremental': measure(lambda: PokeService.sync_data(concurrency=concurrency, mode='incremental'), repeat),
+        }
+
+    for stats in results.values():
+        stats['rows'] = Pokemon.objects.count()
+    return results
+
+
+SUITES: Dict[str, Callable[..., Dict[str, Dict[str, float]]]] = {
+    'types': types_suite,
+    'analytics': analytics_suite,
+    'search': search_suite,
+    'dashboard': dashboard_suite,
+    'sync': sync_suite,
+}
+
+# Suites que generan sus propios datos (no usan `seed`)
+UNSEEDED_SUITES = {'sync'}
+
+
+# Mezcla de rutas de la prueba de carga: dashboard con filtros, API, búsqueda y estáticos
+LOAD_TEST_PATHS = (
+    '/',
+    '/?type=fire&sort=weight&direction=desc',
+    '/?name=char&limit=10',
+    '/api/pokemon/?limit=50&fields=name,types',
+    '/autocomplete/?q=pi',
+    '/static/analysis/style.css',
+)
+
+
+def load_test(base_url: str, paths=LOAD_TEST_PATHS, total: int = 1000,
+              concurrency: int = 16, timeout: float = 30.0) -> Dict[str, Dict[str, float]]:
+    """
+    Prueba de carga contra un servidor en marcha (runserver, gunicorn...).
+
+    Reparte `total` peticiones entre `paths` (en rotación) con `concurrency`
+    hilos, cada uno con su propia sesión keep-alive.
+
+    Returns:
+        Por ruta y en total ('all'): p50/p99/mín en ms, errores (no 2xx/3xx o
+        excepción) y peticiones por segundo.
+    """
+    base_url = base_url.rstrip('/')
+    local = threading.local()
+
+    def hit(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        try:
+            ok = session.get(base_url + path, timeout=timeout).status_code < 400
+        except requests.RequestException:
+            ok = False
+        return path, (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(hit, range(total)))
+    elapsed = time.perf_counter() - start
+
+    def summarize(rows):
+        timings = sorted(ms for _, ms, _ in rows)
+        return {
+            'median_ms': round(statistics.median(timings), 3),
+            'p99_ms': round(analytics.percentile(timings, 99), 3),
+            'min_ms': round(timings[0], 3),
+            'errors': sum(1 for *_, ok in rows if not ok),
+            'rows': len(rows),
+            'rps': round(len(rows) / elapsed, 1),
+        }
+
+    results = {path: summarize([row for row in samples if row[0] == path]) for path in paths}
+    results['all'] = summarize(samples)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def report(suite: str, rows: int, repeat: int, results: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Resultado de una corrida con los metadatos necesarios para compararla con otra."""
+    return {
+        'suite': suite,
+        'rows': rows,
+        'repeat': repeat,
+        'commit': _git_commit(),
+        'created': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> Dict[str, Dict[str, Any]]:
+    """
+    Contrasta la mediana de cada variante con la de un reporte anterior.
+
+    Args:
+        tolerance: Aumento relativo admitido (0.2 = hasta 20% más lento).
+
+    Returns:
+        {variante: {'baseline_ms', 'current_ms', 'ratio', 'regressed'}} para
+        las variantes presentes en ambos reportes.
+    """
+    comparison = {}
+    for label, stats in current['results'].items():
+        before = baseline.get('results', {}).get(label)
+        if not before or not before.get('median_ms'):
+            continue
+        ratio = stats['median_ms'] / before['median_ms']
+        comparison[label] = {
+            'baseline_ms': before['median_ms'],
+            'current_ms': stats['median_ms'],
+            'ratio': round(ratio, 3),
+            'regressed': ratio > 1 + tolerance,
+        }
+    return comparison
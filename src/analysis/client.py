@@ -0,0 +1,264 @@
+"""
+Capa de resiliencia del cliente HTTP de PokeAPI.
+
+`RetryingSession` envuelve cualquier objeto con método `get` (igual que
+ThrottledSession o CachingSession) y reintenta los errores transitorios
+(excepciones de red y estados 429 / 5xx) con backoff exponencial y jitter
+completo. Si la respuesta trae `Retry-After`, esa espera tiene prioridad
+sobre el backoff calculado.
+
+`CircuitBreaker` cuenta los errores consecutivos hacia la API. Al llegar al
+umbral se abre y, durante el enfriamiento, toda petición falla de inmediato
+con CircuitOpenError en lugar de esperar su propio timeout. Pasado ese
+tiempo deja pasar una sola petición de prueba: si responde, se cierra; si
+falla, vuelve a abrirse.
+
+`mount_pool` dimensiona el pool de conexiones de una `requests.Session`
+para que cada worker de la ingesta reutilice su conexión keep-alive.
+"""
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Estados HTTP que se consideran transitorios y se reintentan
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Estados del circuit breaker
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.RequestException):
+    """La petición no se envió porque el circuit breaker está abierto."""
+
+
+def mount_pool(session: requests.Session, size: int) -> requests.Session:
+    """
+    Monta en `session` adaptadores HTTP/HTTPS con `size` conexiones por host.
+
+    El adaptador por defecto de requests guarda 10 conexiones por host; con
+    más workers que eso, las conexiones sobrantes se cierran tras cada uso y
+    se pierde el keep-alive. Los reintentos de urllib3 quedan desactivados:
+    de eso se encarga RetryingSession.
+    """
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, size), max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Segundos de espera indicados por una cabecera `Retry-After`.
+
+    Acepta tanto segundos ('120') como una fecha HTTP. Devuelve None si la
+    cabecera falta o no se puede interpretar.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[float] = None) -> float:
+    """
+    Espera antes del reintento número `attempt` (0 = primer reintento).
+
+    Sin `retry_after` usa jitter completo: un valor uniforme entre 0 y
+    min(cap, base * 2**attempt), para que los workers no reintenten todos
+    a la vez. Con `retry_after` se respeta lo pedido por el servidor,
+    acotado a `cap`.
+    """
+    if retry_after is not None:
+        return min(cap, retry_after)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker compartido por todos los workers de una sincronización.
+
+    Attributes:
+        threshold (int): Errores consecutivos que lo abren. Un valor <= 0
+            lo desactiva.
+        cooldown (float): Segundos que permanece abierto antes de admitir
+            una petición de prueba.
+    """
+
+    def __init__(self, threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """Segundos que faltan para que admita la siguiente petición (0 si ya la admite)."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (self._clock() - self._opened_at))
+
+    def before_request(self) -> None:
+        """
+        Reserva el paso para una petición.
+
+        Raises:
+            CircuitOpenError: Si está abierto, o si otra petición de prueba
+                ya está en curso.
+        """
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self._state = HALF_OPEN
+                return
+            raise CircuitOpenError("Circuit breaker abierto: PokeAPI no responde.")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit breaker abierto tras {self._failures} errores consecutivos.")
+                    if metrics.enabled():
+                        metrics.BREAKER_OPENED.inc()
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+
+class RetryingSession:
+    """
+    Envoltorio que reintenta los errores transitorios de cada `get`.
+
+    Se coloca debajo de la caché de respuestas (un acierto de caché no
+    necesita reintentos) y encima del limitador, de modo que cada reintento
+    consume su propio turno. Agotados los intentos devuelve la última
+    respuesta (el llamador decide con `raise_for_status`) o relanza la
+    última excepción.
+
+    Attributes:
+        retries (int): Reintentos por petición (0 = un solo intento).
+        backoff (float): Base en segundos del backoff exponencial.
+        max_delay (float): Tope en segundos de cada espera.
+        breaker (CircuitBreaker): Breaker compartido, opcional.
+    """
+
+    def __init__(self, inner, retries: int, backoff: float, max_delay: float,
+                 breaker: Optional[CircuitBreaker] = None, endpoint: str = 'detail',
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.inner = inner
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.breaker = breaker
+        self.endpoint = endpoint
+        self._sleep = sleep
+
+    def get(self, url: str, **kwargs):
+        attempt = 0
+        while True:
+            if self.breaker:
+                self.breaker.before_request()
+
+            retry_after = None
+            try:
+                response = self.inner.get(url, **kwargs)
+            except CircuitOpenError:
+                raise
+            except requests.RequestException as e:
+                # Todo error cuenta para el breaker; si no, una petición de
+                # prueba fallida lo dejaría en HALF_OPEN para siempre
+                self._record(False)
+                if not isinstance(e, (requests.ConnectionError, requests.Timeout)) or attempt >= self.retries:
+                    raise
+                reason = type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self._record(True)
+                    return response
+                self._record(False)
+                if attempt >= self.retries:
+                    return response
+                reason = f"http_{response.status_code}"
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+            delay = backoff_delay(attempt, self.backoff, self.max_delay, retry_after)
+            logger.info(f"Reintentando {url} en {delay:.2f}s ({reason}, reintento {attempt + 1}/{self.retries})")
+            if metrics.enabled():
+                metrics.FETCH_RETRIES.inc(endpoint=self.endpoint, reason=reason)
+            self._sleep(delay)
+            attempt += 1
+
+    def _record(self, ok: bool) -> None:
+        if not self.breaker:
+            return
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+
+class Resilience:
+    """
+    Política de reintentos de una corrida: un breaker compartido y una
+    fábrica de RetryingSession con los parámetros de settings.
+    """
+
+    def __init__(self, retries: int, backoff: float, max_delay: float, breaker: CircuitBreaker) -> None:
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.breaker = breaker
+
+    @classmethod
+    def from_settings(cls) -> 'Resilience':
+        """
+        Settings:
+            POKEAPI_RETRIES: Reintentos por petición.
+            POKEAPI_BACKOFF_BASE: Base del backoff exponencial (segundos).
+            POKEAPI_BACKOFF_MAX: Tope de cada espera, incluida Retry-After.
+            POKEAPI_BREAKER_THRESHOLD: Errores consecutivos que abren el breaker.
+            POKEAPI_BREAKER_COOLDOWN: Segundos que el breaker permanece abierto.
+        """
+        breaker = CircuitBreaker(settings.POKEAPI_BREAKER_THRESHOLD, settings.POKEAPI_BREAKER_COOLDOWN)
+        return cls(settings.POKEAPI_RETRIES, settings.POKEAPI_BACKOFF_BASE, settings.POKEAPI_BACKOFF_MAX, breaker)
+
+    def wrap(self, inner, endpoint: str = 'detail') -> RetryingSession:
+        return RetryingSession(inner, self.retries, self.backoff, self.max_delay, self.breaker, endpoint)
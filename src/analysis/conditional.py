@@ -0,0 +1,85 @@
+"""
+Caché HTTP de las respuestas de lectura: ETag/304, Cache-Control y gzip.
+
+El ETag de una respuesta es un hash de la versión del dataset (la misma de
+analysis/result_cache.py) y de los parámetros ya normalizados de la
+consulta. La versión sale de la memoria del proceso, así que un
+`If-None-Match` vigente se responde con 304 sin tocar la DB ni el template.
+
+La versión vive en la tabla DatasetVersion y la incrementan triggers de la
+base de datos, de modo que el ETag es el mismo en todos los workers y cambia
+con cualquier escritura, también las hechas fuera de este proceso (cron,
+`import_pokemon`, SQL directo); esas se notan como mucho
+POKEDEX_DATASET_VERSION_TTL segundos después. Un despliegue nuevo conserva los ETag
+mientras el dataset no cambie.
+
+`Cache-Control` se fija con POKEDEX_HTTP_MAX_AGE: con 0 (por defecto) el
+navegador o el proxy pueden guardar la respuesta pero la revalidan en cada
+uso, lo que con el ETag cuesta un 304 vacío.
+"""
+import hashlib
+import json
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware as BaseGZipMiddleware
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from . import result_cache
+
+# Tipos de contenido que no se comprimen: gzip retiene bytes y demoraría cada evento
+UNCOMPRESSED_TYPES = ('text/event-stream',)
+
+
+def dataset_etag(scope: str, *params: Any, version: Optional[int] = None) -> str:
+    """
+    ETag (sin comillas) para `scope` con los parámetros normalizados dados.
+
+    Args:
+        scope: Nombre de la vista o representación (ej: 'home', 'api').
+        *params: Valores serializables en JSON que determinan la respuesta.
+        version: Versión de los datos con los que se responde, si no es la
+            vigente (ej: el almacén columnar mientras se recarga).
+    """
+    if version is None:
+        version = result_cache.dataset_version()
+    payload = json.dumps([scope, version, *params], separators=(',', ':'))
+    return f"{scope}-{hashlib.sha1(payload.encode()).hexdigest()[:24]}"
+
+
+def dataset_cached(etag_func: Callable[..., Optional[str]], vary: tuple = ()):
+    """
+    Decorador de vistas de lectura: GET condicional y Cache-Control.
+
+    Args:
+        etag_func: Recibe los argumentos de la vista y devuelve el ETag, o
+            None si la petición no es cacheable (ej: parámetros inválidos).
+        vary: Cabeceras de la petición que cambian la representación
+            (ej: 'Accept' en la API).
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304) and response.has_header('ETag'):
+                patch_cache_control(
+                    response, public=True, max_age=settings.POKEDEX_HTTP_MAX_AGE, must_revalidate=True,
+                )
+                if vary:
+                    patch_vary_headers(response, vary)
+            return response
+        return wrapper
+    return decorator
+
+
+class GZipMiddleware(BaseGZipMiddleware):
+    """GZipMiddleware de Django salvo para los streams SSE (`/sync-events/`)."""
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith(UNCOMPRESSED_TYPES):
+            return response
+        return super().process_response(request, response)
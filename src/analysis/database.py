@@ -0,0 +1,64 @@
+"""
+Ajustes específicos de cada motor de base de datos (POKEDEX_DB_ENGINE).
+
+SQLite: pragmas aplicados a cada conexión nueva (señal connection_created).
+
+* journal_mode=WAL: los lectores no se bloquean mientras la sincronización
+  escribe (y viceversa); solo se serializan las escrituras entre sí.
+* synchronous=NORMAL: con WAL es seguro ante caídas del proceso y evita un
+  fsync por transacción (se puede perder la última transacción ante un
+  corte de energía, nunca corromper la base).
+* cache_size / mmap_size: más páginas en memoria y lecturas por mmap.
+* temp_store=MEMORY: tablas temporales (ORDER BY sin índice, DISTINCT) en RAM.
+
+La espera ante bloqueos (busy timeout) y el modo de transacción IMMEDIATE
+se configuran en DATABASES['default']['OPTIONS'].
+
+PostgreSQL: la migración 0008 activa `pg_trgm` y crea un índice GIN de
+trigramas sobre `UPPER(name)`, la expresión que genera `name__icontains`
+(el filtro por subcadena fuera de SQLite, donde no hay FTS5). Los rangos de
+peso/altura y el filtro por tipo ya usan índices B-tree comunes a ambos
+motores (ver Meta de Pokemon y PokemonType).
+"""
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+# Índices GIN de trigramas que crea la migración 0008 (solo PostgreSQL)
+TRIGRAM_INDEXES = ('pokemon_name_trgm_idx',)
+
+# Pragmas que se leen de vuelta con `current_pragmas`
+PRAGMA_NAMES = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+
+def sqlite_pragmas() -> List[Tuple[str, object]]:
+    """Pragmas a aplicar, en orden, según la configuración (POKEDEX_SQLITE_*)."""
+    return [
+        ('journal_mode', settings.POKEDEX_SQLITE_JOURNAL_MODE),
+        ('synchronous', settings.POKEDEX_SQLITE_SYNCHRONOUS),
+        ('cache_size', settings.POKEDEX_SQLITE_CACHE_SIZE),
+        ('mmap_size', settings.POKEDEX_SQLITE_MMAP_SIZE),
+        ('temp_store', 'memory'),
+    ]
+
+
+def apply_pragmas(connection) -> None:
+    """Aplica los pragmas a una conexión SQLite; otros motores se ignoran."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas():
+            # Los pragmas no admiten parámetros; los valores vienen de settings
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def current_pragmas(connection) -> Dict[str, object]:
+    """Valores vigentes en la conexión (para diagnóstico y tests)."""
+    if connection.vendor != 'sqlite':
+        return {}
+    values = {}
+    with connection.cursor() as cursor:
+        for name in PRAGMA_NAMES:
+            cursor.execute(f"PRAGMA {name}")
+            values[name] = cursor.fetchone()[0]
+    return values
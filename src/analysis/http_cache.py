@@ -0,0 +1,339 @@
+"""
+Caché de respuestas HTTP para el cliente de PokeAPI.
+
+Se compone de dos almacenes intercambiables:
+
+* DiskCache: almacén en disco (SQLite) direccionado por contenido. Cada
+  cuerpo JSON se comprime con zlib y se guarda una sola vez bajo su SHA-256;
+  las URLs apuntan a ese digest. Aplica TTL y expulsión LRU por tamaño.
+* SnapshotStore: archivo de solo lectura (JSON, opcionalmente .gz) con un
+  volcado {url: entrada}, pensado para sincronizar sin red (CI / desarrollo).
+
+CachingSession envuelve cualquier objeto con un método `get` compatible con
+requests (un `requests.Session` o el propio módulo `requests`) y decide si
+servir desde caché, desde el snapshot o ir a la red.
+"""
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from django.conf import settings
+
+
+class CacheMiss(requests.ConnectionError):
+    """
+    Petición sin respuesta disponible en modo offline.
+
+    Hereda de requests.RequestException para que el servicio la trate como
+    cualquier otro fallo de red (aislado por item).
+    """
+
+
+class CachedResponse:
+    """Respuesta mínima con la interfaz que consume PokeService."""
+
+    def __init__(self, url: str, status_code: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers
+        self.from_cache = True
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} para {self.url}", response=self)
+
+
+class CacheEntry:
+    """Entrada almacenada: cuerpo JSON crudo, validadores y antigüedad."""
+
+    def __init__(self, url: str, body: bytes, etag: str = '', last_modified: str = '',
+                 stored_at: float = 0.0) -> None:
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return ttl <= 0 or (time.time() - self.stored_at) < ttl
+
+    def to_response(self, request_headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """Construye la respuesta, respetando If-None-Match como lo haría el servidor."""
+        headers = {'ETag': self.etag, 'Last-Modified': self.last_modified}
+        if self.etag and (request_headers or {}).get('If-None-Match') == self.etag:
+            return CachedResponse(self.url, 304, b'', headers)
+        return CachedResponse(self.url, 200, self.body, headers)
+
+
+class DiskCache:
+    """
+    Almacén persistente de respuestas en un archivo SQLite.
+
+    Attributes:
+        path (str): Ruta del archivo SQLite.
+        ttl (float): Segundos durante los que una entrada se considera fresca (0 = sin vencimiento).
+        max_bytes (int): Tamaño máximo de los cuerpos comprimidos; al superarlo
+            se expulsan las URLs usadas hace más tiempo (LRU).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            digest TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            url TEXT PRIMARY KEY,
+            digest TEXT NOT NULL REFERENCES blobs(digest),
+            etag TEXT NOT NULL DEFAULT '',
+            last_modified TEXT NOT NULL DEFAULT '',
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+        CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+    """
+
+    def __init__(self, path: str, ttl: float = 0, max_bytes: int = 0) -> None:
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Devuelve la entrada de `url` (fresca o no) y la marca como usada."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.body, e.etag, e.last_modified, e.stored_at "
+                "FROM entries e JOIN blobs b ON b.digest = e.digest WHERE e.url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+
+        body, etag, last_modified, stored_at = row
+        return CacheEntry(url, zlib.decompress(body), etag, last_modified, stored_at)
+
+    def set(self, url: str, body: bytes, etag: str = '', last_modified: str = '') -> None:
+        """Guarda (o reemplaza) la respuesta de `url` y aplica la cota de tamaño."""
+        digest = hashlib.sha256(body).hexdigest()
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            previous = self._conn.execute("SELECT digest FROM entries WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (digest, body, size) VALUES (?, ?, ?)",
+                (digest, compressed, len(compressed)),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (url, digest, etag, last_modified, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, etag or '', last_modified or '', now, now),
+            )
+            if previous and previous[0] != digest:
+                self._drop_if_orphan(previous[0])
+            self._evict()
+            self._conn.execute("COMMIT")
+
+    def touch(self, url: str) -> None:
+        """Renueva el TTL de una entrada revalidada con un 304."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM blobs")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            blobs, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        return {'entries': entries, 'blobs': blobs, 'bytes': size}
+
+    def iter_entries(self) -> Iterator[CacheEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT e.url, b.body, e.etag, e.last_modified, e.stored_at "
+                "FROM entries e JOIN blobs b ON b.digest = e.digest ORDER BY e.url"
+            ).fetchall()
+        for url, body, etag, last_modified, stored_at in rows:
+            yield CacheEntry(url, zlib.decompress(body), etag, last_modified, stored_at)
+
+    def _drop_if_orphan(self, digest: str) -> None:
+        """Borra un blob que ya no referencia ninguna URL. Requiere el lock tomado."""
+        self._conn.execute(
+            "DELETE FROM blobs WHERE digest = ? AND NOT EXISTS "
+            "(SELECT 1 FROM entries WHERE entries.digest = blobs.digest)",
+            (digest,),
+        )
+
+    def _evict(self) -> None:
+        """Expulsa URLs por LRU hasta volver bajo max_bytes. Requiere el lock tomado."""
+        if self.max_bytes <= 0:
+            return
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT url, digest FROM entries ORDER BY accessed_at ASC, rowid ASC LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            url, digest = oldest
+            self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._drop_if_orphan(digest)
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def export_snapshot(self, path: str) -> int:
+        """Vuelca todas las entradas a un snapshot JSON (gzip si termina en .gz)."""
+        return write_snapshot(path, self.iter_entries())
+
+
+class SnapshotStore:
+    """Snapshot de solo lectura cargado en memoria desde un archivo JSON / JSON.gz."""
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        opener = gzip.open if self.path.endswith('.gz') else open
+        with opener(self.path, 'rt', encoding='utf-8') as fh:
+            data = json.load(fh)
+        self._entries = data.get('entries', {})
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        item = self._entries.get(url)
+        if item is None:
+            return None
+        body = json.dumps(item['body'], separators=(',', ':')).encode()
+        return CacheEntry(url, body, item.get('etag', ''), item.get('last_modified', ''))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def write_snapshot(path: str, entries) -> int:
+    """Escribe un snapshot con las entradas dadas y devuelve cuántas se guardaron."""
+    payload: Dict[str, Any] = {'version': 1, 'entries': {}}
+    for entry in entries:
+        payload['entries'][entry.url] = {
+            'body': json.loads(entry.body),
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+        }
+
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as fh:
+        json.dump(payload, fh, separators=(',', ':'))
+    return len(payload['entries'])
+
+
+class CachingSession:
+    """
+    Envoltorio de `get` con caché de respuestas.
+
+    Orden de resolución:
+        1. Entrada fresca en DiskCache (o cualquier entrada en modo offline).
+        2. En modo offline: SnapshotStore; si tampoco está, CacheMiss.
+        3. Red, revalidando con el ETag de la entrada vencida si existe.
+    """
+
+    def __init__(self, inner, cache: Optional[DiskCache] = None,
+                 snapshot: Optional[SnapshotStore] = None, offline: bool = False) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.snapshot = snapshot
+        self.offline = offline
+
+    def get(self, url: str, timeout: Optional[float] = None,
+            headers: Optional[Dict[str, str]] = None, **kwargs):
+        entry = self.cache.get(url) if self.cache else None
+        if entry and (self.offline or entry.is_fresh(self.cache.ttl)):
+            return entry.to_response(headers)
+
+        if self.offline:
+            snap = self.snapshot.get(url) if self.snapshot else None
+            if snap is None:
+                raise CacheMiss(f"Sin respuesta en caché para {url} (modo offline)")
+            return snap.to_response(headers)
+
+        # Revalidación de una entrada vencida con su propio ETag
+        request_headers = dict(headers or {})
+        if entry and entry.etag and 'If-None-Match' not in request_headers:
+            request_headers['If-None-Match'] = entry.etag
+
+        if request_headers:
+            kwargs['headers'] = request_headers
+        response = self.inner.get(url, timeout=timeout, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self.cache.touch(url)
+            if 'If-None-Match' not in (headers or {}):
+                return entry.to_response()
+        elif response.status_code == 200 and self.cache:
+            self.cache.set(
+                url, response.content,
+                response.headers.get('ETag', ''), response.headers.get('Last-Modified', ''),
+            )
+        return response
+
+
+class CacheLayer:
+    """Configuración compartida de caché para todas las sesiones de una sincronización."""
+
+    def __init__(self, cache: Optional[DiskCache] = None,
+                 snapshot: Optional[SnapshotStore] = None, offline: bool = False) -> None:
+        self.cache = cache
+        self.snapshot = snapshot
+        self.offline = offline
+
+    def wrap(self, inner) -> CachingSession:
+        return CachingSession(inner, self.cache, self.snapshot, self.offline)
+
+    def close(self) -> None:
+        if self.cache:
+            self.cache.close()
+
+    @classmethod
+    def from_settings(cls) -> Optional['CacheLayer']:
+        """
+        Construye la capa según settings, o None si la caché está desactivada.
+
+        Settings:
+            POKEAPI_CACHE_PATH: Archivo SQLite de la caché ('' la desactiva).
+            POKEAPI_CACHE_TTL: Segundos de frescura de cada entrada.
+            POKEAPI_CACHE_MAX_BYTES: Cota de tamaño (bytes comprimidos).
+            POKEAPI_OFFLINE: Si es True nunca se accede a la red.
+            POKEAPI_SNAPSHOT_PATH: Snapshot usado como respaldo en modo offline.
+        """
+        cache_path = settings.POKEAPI_CACHE_PATH
+        snapshot_path = settings.POKEAPI_SNAPSHOT_PATH
+        offline = settings.POKEAPI_OFFLINE
+
+        if not cache_path and not offline:
+            return None
+
+        cache = None
+        if cache_path:
+            cache = DiskCache(cache_path, settings.POKEAPI_CACHE_TTL, settings.POKEAPI_CACHE_MAX_BYTES)
+        snapshot = SnapshotStore(snapshot_path) if (offline and snapshot_path) else None
+        return cls(cache, snapshot, offline)
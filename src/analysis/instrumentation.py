@@ -0,0 +1,157 @@
+"""
+Instrumentación por petición: dónde se va el tiempo de cada vista.
+
+MetricsMiddleware separa la duración de cada petición en tres fases:
+
+* db: tiempo dentro de las consultas SQL (`connection.execute_wrapper`).
+* template: render de templates, sin las consultas que dispare el propio
+  render (ej: un QuerySet perezoso), que cuentan como db.
+* view: el resto (lógica de la vista, middlewares y serialización).
+
+Las fases se publican en la cabecera `Server-Timing` (visible en las
+DevTools del navegador) y en los histogramas de analysis/metrics.py.
+
+Para medir el render, TEMPLATES usa `TimedDjangoTemplates`: el backend de
+Django de siempre cuyos templates avisan a la petición en curso. Sin una
+petición instrumentada activa el costo es una lectura de ContextVar.
+
+Con POKEDEX_METRICS_ENABLED=False el middleware se descarta al arrancar
+(MiddlewareNotUsed) y no agrega trabajo por petición.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.template.backends.django import DjangoTemplates
+
+from . import metrics
+
+_current: ContextVar[Optional['RequestTimings']] = ContextVar('pokedex_request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Acumulador de tiempos (en segundos) de una petición.
+
+    Attributes:
+        db (float): Tiempo total en consultas SQL.
+        queries (int): Cantidad de consultas.
+        template (float): Render de templates sin sus consultas.
+        total (float): Duración de la petición completa.
+    """
+
+    def __init__(self) -> None:
+        self.db = 0.0
+        self.queries = 0
+        self.template = 0.0
+        self.total = 0.0
+        self._template_depth = 0
+        self._template_db = 0.0
+
+    @property
+    def view(self) -> float:
+        return max(self.total - self.db - self.template, 0.0)
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """Wrapper para `connection.execute_wrapper`: cronometra cada consulta."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.db += elapsed
+            self.queries += 1
+            if self._template_depth:
+                self._template_db += elapsed
+
+    @contextmanager
+    def rendering(self) -> Iterator[None]:
+        """Mide un render; los renders anidados solo cuentan una vez."""
+        self._template_depth += 1
+        start = time.perf_counter()
+        db_before = self._template_db
+        try:
+            yield
+        finally:
+            self._template_depth -= 1
+            if not self._template_depth:
+                self.template += (time.perf_counter() - start) - (self._template_db - db_before)
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera Server-Timing (duraciones en ms)."""
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'view;dur={self.view * 1000:.2f}',
+            f'template;dur={self.template * 1000:.2f}',
+            f'total;dur={self.total * 1000:.2f}',
+        ])
+
+
+def current() -> Optional[RequestTimings]:
+    """Tiempos de la petición instrumentada en curso (None fuera de una)."""
+    return _current.get()
+
+
+class TimedTemplate:
+    """Envoltorio de un template del backend que mide su render."""
+
+    def __init__(self, template) -> None:
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return self.template.render(context, request)
+        with timings.rendering():
+            return self.template.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Backend DjangoTemplates cuyos templates reportan su tiempo de render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class MetricsMiddleware:
+    """
+    Registra duración por fase, consultas y estado de cada petición.
+
+    Las respuestas en streaming (API, SSE) solo miden hasta que la vista
+    devuelve el generador, no el envío del cuerpo.
+    """
+
+    def __init__(self, get_response) -> None:
+        if not metrics.enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timings.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            timings.total = time.perf_counter() - start
+            _current.reset(token)
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        for phase in ('total', 'db', 'view', 'template'):
+            metrics.REQUEST_DURATION.observe(getattr(timings, phase), view=view, phase=phase)
+        metrics.REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        metrics.DB_QUERIES.inc(timings.queries, view=view)
+
+        response['Server-Timing'] = timings.server_timing()
+        return response
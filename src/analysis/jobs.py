@@ -0,0 +1,160 @@
+"""
+Ejecutor de tareas en segundo plano dentro del propio proceso (sin Redis/Celery).
+
+Cada tarea corre en un hilo daemon. Las tareas se identifican por nombre y
+se deduplican: mientras una tarea 'sync' esté activa, volver a pedirla
+devuelve la misma instancia en lugar de lanzar otra en paralelo.
+"""
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections, connections
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Job:
+    """
+    Estado observable de una tarea en segundo plano.
+
+    Attributes:
+        id (str): Identificador único de la ejecución.
+        name (str): Nombre lógico usado para deduplicar (ej: 'sync').
+        status (str): 'pending' | 'running' | 'done' | 'failed'.
+        progress (dict): Contadores publicados por la propia tarea.
+        result (Any): Valor devuelto por la tarea al terminar.
+        error (str): Mensaje de la excepción si la tarea falló.
+
+    Además mantiene un registro de eventos (solo anexado) que los clientes
+    leen con un cursor, por ejemplo el stream SSE de /sync-events/.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = PENDING
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error = ''
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def update(self, **counters: Any) -> None:
+        """Publica contadores de avance (llamado desde el hilo de la tarea)."""
+        with self._lock:
+            self.progress.update(counters)
+            self._events.append({'type': 'progress', 'data': dict(self.progress)})
+
+    def publish(self, event_type: str, data: Any) -> None:
+        """Anexa un evento al registro de la tarea."""
+        with self._lock:
+            self._events.append({'type': event_type, 'data': data})
+
+    def events_since(self, cursor: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Eventos publicados a partir de la posición `cursor`.
+
+        Returns:
+            Tupla (eventos nuevos, la tarea ya terminó). El indicador se lee
+            antes que los eventos, así que si es True la lista está completa.
+        """
+        finished = self.finished
+        with self._lock:
+            return self._events[cursor:], finished
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Bloquea hasta que la tarea termine. Devuelve False si vence el timeout."""
+        return self._finished.wait(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Vista serializable a JSON del estado actual."""
+        with self._lock:
+            return {
+                'id': self.id,
+                'name': self.name,
+                'status': self.status,
+                'progress': dict(self.progress),
+                'error': self.error,
+                'elapsed': round((self.finished_at or time.time()) - self.created_at, 3),
+            }
+
+
+class JobRunner:
+    """
+    Registro de tareas con deduplicación por nombre.
+
+    Es seguro entre hilos de un mismo proceso. Con varios procesos (ej:
+    workers de gunicorn) cada uno tiene su propio registro, por eso
+    gunicorn.conf.py arranca un solo worker por defecto.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, target: Callable[[Job], Any]) -> Tuple[Job, bool]:
+        """
+        Lanza `target(job)` en un hilo, salvo que ya exista una tarea activa
+        con el mismo nombre.
+
+        Returns:
+            Tupla (job, creado). `creado` es False si se reutilizó una tarea en curso.
+        """
+        with self._lock:
+            current = self._jobs.get(name)
+            if current is not None and current.active:
+                return current, False
+
+            job = Job(name)
+            self._jobs[name] = job
+
+        thread = threading.Thread(target=self._run, args=(job, target), name=f"job-{name}", daemon=True)
+        thread.start()
+        return job, True
+
+    def get(self, name: str) -> Optional[Job]:
+        """Última tarea registrada con ese nombre (activa o terminada)."""
+        with self._lock:
+            return self._jobs.get(name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+
+    def _run(self, job: Job, target: Callable[[Job], Any]) -> None:
+        close_old_connections()
+        job.status = RUNNING
+        try:
+            job.result = target(job)
+            job.status = DONE
+        except Exception as e:
+            logger.exception(f"La tarea '{job.name}' falló")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            # Las conexiones de Django son por hilo: se liberan al terminar
+            connections.close_all()
+            job._finished.set()
+
+
+runner = JobRunner()
@@ -0,0 +1,96 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from analysis import benchmarks
+
+# Filas por defecto: la suite 'sync' hace una petición HTTP por Pokémon
+DEFAULT_ROWS = 100000
+DEFAULT_SYNC_ROWS = 500
+
+
+class Command(BaseCommand):
+    """
+    Mide consultas, el dashboard y la sincronización sobre una base sintética aislada.
+
+    La base se crea con el mismo mecanismo que usan los tests (prefijo test_)
+    y se destruye al terminar, así que los datos reales no se modifican. El
+    alias `results` de CACHES se reemplaza por una LocMemCache privada
+    durante la corrida, para no vaciar la caché que comparten los workers.
+
+    Ejemplos:
+        python manage.py benchmark --suite types --rows 100000
+        python manage.py benchmark --suite dashboard --rows 10000 --output base.json
+        python manage.py benchmark --suite dashboard --rows 10000 --compare base.json
+        python manage.py benchmark --suite sync --rows 500 --latency 20
+    """
+    help = "Ejecuta un benchmark de consultas sobre una base de datos sintética aislada."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--suite', choices=sorted(benchmarks.SUITES), default='types')
+        parser.add_argument(
+            '--rows', type=int, default=None,
+            help=f"Pokémon sintéticos a generar ({DEFAULT_ROWS}; en 'sync', especies del stub: {DEFAULT_SYNC_ROWS}).",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por consulta.")
+        parser.add_argument('--latency', type=float, default=20.0, help="Latencia por petición del stub en ms (suite 'sync').")
+        parser.add_argument('--output', default='', help="Guarda el reporte en JSON ('-' = stdout).")
+        parser.add_argument('--compare', default='', help="Reporte JSON anterior contra el que comparar las medianas.")
+        parser.add_argument('--tolerance', type=float, default=0.2, help="Aumento relativo admitido antes de fallar (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        suite = options['suite']
+        unseeded = suite in benchmarks.UNSEEDED_SUITES
+        rows = options['rows'] or (DEFAULT_SYNC_ROWS if unseeded else DEFAULT_ROWS)
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer el reporte base: {e}")
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Sin DEBUG: Django no acumula cada consulta en connection.queries
+            with override_settings(DEBUG=False, CACHES=benchmarks.isolated_caches()):
+                if unseeded:
+                    results = benchmarks.sync_suite(options['repeat'], count=rows, latency_ms=options['latency'])
+                else:
+                    self.stdout.write(f"Generando {rows} filas sintéticas...")
+                    benchmarks.seed(rows)
+                    results = benchmarks.SUITES[suite](repeat=options['repeat'])
+                report = benchmarks.report(suite, rows, options['repeat'], results)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        for label, stats in results.items():
+            self.stdout.write(
+                f"{label:<16} median={stats['median_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms "
+                f"min={stats['min_ms']:.3f}ms rows={stats['rows']}"
+            )
+
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Reporte guardado en {options['output']}")
+
+        if baseline is not None:
+            self._compare(report, baseline, options['tolerance'])
+
+    def _compare(self, report, baseline, tolerance):
+        comparison = benchmarks.compare(report, baseline, tolerance)
+        self.stdout.write(f"Comparación con {baseline.get('commit') or 'reporte base'}:")
+        for label, row in comparison.items():
+            line = f"{label:<16} {row['baseline_ms']:.3f}ms -> {row['current_ms']:.3f}ms (x{row['ratio']:.2f})"
+            self.stdout.write(self.style.ERROR(line) if row['regressed'] else line)
+
+        regressed = [label for label, row in comparison.items() if row['regressed']]
+        if regressed:
+            raise CommandError(f"Regresión de más del {tolerance:.0%} en: {', '.join(regressed)}")
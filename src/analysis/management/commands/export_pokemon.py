@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis import dataset
+
+
+class Command(BaseCommand):
+    """
+    Exporta la tabla Pokemon a un snapshot (ver analysis/dataset.py).
+
+    Ejemplos:
+        python manage.py export_pokemon fixtures/pokedex.pkcol
+        python manage.py export_pokemon fixtures/pokedex.ndjson.gz
+        python manage.py export_pokemon dump.txt --format csv
+    """
+    help = "Exporta los Pokémon a NDJSON, CSV o formato columnar binario."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo de destino (.ndjson, .csv, .pkcol; .gz opcional en texto).")
+        parser.add_argument('--format', choices=dataset.FORMATS, default=None,
+                            help="Formato explícito (por defecto se deduce de la extensión).")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            count = dataset.dump(options['path'], options['format'])
+        except (dataset.DatasetError, OSError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} Pokémon exportados a {options['path']} en {elapsed:.2f}s"
+        ))
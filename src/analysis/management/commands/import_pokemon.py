@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis import dataset
+
+
+class Command(BaseCommand):
+    """
+    Importa un snapshot de Pokemon (ver analysis/dataset.py).
+
+    Las filas se insertan por lotes dentro de una única transacción: si el
+    archivo tiene un registro inválido no se importa nada.
+
+    Ejemplos:
+        python manage.py import_pokemon fixtures/pokedex.pkcol
+        python manage.py import_pokemon dump.csv.gz --replace --batch-size 2000
+    """
+    help = "Importa Pokémon desde NDJSON, CSV o formato columnar binario (upsert por pokedex_id)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Snapshot a importar (.ndjson, .csv, .pkcol; .gz opcional en texto).")
+        parser.add_argument('--format', choices=dataset.FORMATS, default=None,
+                            help="Formato explícito (por defecto se deduce de la extensión).")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Filas por lote (por defecto POKEAPI_BATCH_SIZE).")
+        parser.add_argument('--replace', action='store_true',
+                            help="Borra los Pokémon existentes antes de importar.")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            count = dataset.load(
+                options['path'], options['format'], batch_size=options['batch_size'], replace=options['replace'],
+            )
+        except (dataset.DatasetError, OSError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} Pokémon importados desde {options['path']} en {elapsed:.2f}s"
+        ))
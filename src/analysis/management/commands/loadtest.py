@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from analysis import benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Prueba de carga HTTP contra un servidor ya levantado.
+
+    A diferencia de `benchmark`, no crea una base aislada: mide el servidor
+    tal como está desplegado (modo de servicio, workers, estáticos).
+
+    Ejemplos:
+        python manage.py loadtest --url http://127.0.0.1:8000 --requests 2000 --concurrency 16
+        python manage.py loadtest --url http://127.0.0.1:8000 --output gunicorn.json
+    """
+    help = "Mide latencia y throughput de un servidor en marcha con peticiones concurrentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="URL base del servidor.")
+        parser.add_argument('--requests', type=int, default=1000, help="Peticiones totales.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Clientes simultáneos.")
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="Ruta a pedir (repetible); por defecto una mezcla representativa.")
+        parser.add_argument('--output', default='', help="Guarda el reporte en JSON ('-' = stdout).")
+
+    def handle(self, *args, **options):
+        paths = tuple(options['paths'] or benchmarks.LOAD_TEST_PATHS)
+        results = benchmarks.load_test(options['url'], paths, options['requests'], options['concurrency'])
+
+        for label, stats in results.items():
+            self.stdout.write(
+                f"{label:<45} median={stats['median_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+                f"rps={stats['rps']:.1f} errors={stats['errors']}"
+            )
+
+        report = {'url': options['url'], 'concurrency': options['concurrency'], 'results': results}
+        if options['output'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Reporte guardado en {options['output']}")
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.http_cache import DiskCache
+
+
+class Command(BaseCommand):
+    """
+    Administración de la caché de respuestas de PokeAPI (POKEAPI_CACHE_PATH).
+
+    Ejemplos:
+        python manage.py pokeapi_cache --stats
+        python manage.py pokeapi_cache --export-snapshot fixtures/pokeapi.json.gz
+        python manage.py pokeapi_cache --clear
+    """
+    help = "Muestra, limpia o exporta a snapshot la caché de respuestas de PokeAPI."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help="Muestra entradas, blobs y bytes usados.")
+        parser.add_argument('--clear', action='store_true', help="Vacía la caché.")
+        parser.add_argument('--export-snapshot', metavar='PATH',
+                            help="Vuelca la caché a un snapshot JSON (.gz opcional) para POKEAPI_SNAPSHOT_PATH.")
+
+    def handle(self, *args, **options):
+        if not settings.POKEAPI_CACHE_PATH:
+            raise CommandError("POKEAPI_CACHE_PATH no está configurado.")
+
+        cache = DiskCache(settings.POKEAPI_CACHE_PATH)
+        try:
+            if options['export_snapshot']:
+                count = cache.export_snapshot(options['export_snapshot'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"Snapshot con {count} respuestas escrito en {options['export_snapshot']}"
+                ))
+            if options['clear']:
+                cache.clear()
+                self.stdout.write(self.style.SUCCESS("Caché vaciada."))
+            if options['stats'] or not (options['clear'] or options['export_snapshot']):
+                stats = cache.stats()
+                self.stdout.write(
+                    f"entries={stats['entries']} blobs={stats['blobs']} bytes={stats['bytes']}"
+                )
+        finally:
+            cache.close()
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis import result_cache, warmup
+from analysis.services import SYNC_MODES, PokeService
+
+
+class Command(BaseCommand):
+    """
+    Sincroniza el catálogo con PokeAPI fuera del ciclo de peticiones.
+
+    Pensado para cron o un timer de systemd: con POKEDEX_SYNC_ON_VISIT=False
+    la ingesta deja de depender del primer visitante. Al terminar muestra el
+    delta de la corrida (insertados / actualizados / sin cambios / fallidos).
+    Si el alias `results` es compartido (modo producción), además precalienta
+    la caché de resultados del dashboard; con LocMemCache el paso se omite
+    porque las entradas morirían con este proceso. El código de salida es 1
+    si algún detalle no se pudo obtener.
+
+    Ejemplos:
+        python manage.py sync_pokedex
+        python manage.py sync_pokedex --mode full --concurrency 16 --page-size 100
+        python manage.py sync_pokedex --dry-run
+
+        # crontab: refresco incremental cada noche
+        0 3 * * * cd /app/src && python manage.py sync_pokedex --mode incremental
+    """
+    help = "Sincroniza la Pokédex con PokeAPI (full o incremental) y reporta el delta."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=SYNC_MODES, default='incremental',
+                            help="'full' completa el catálogo hasta POKEDEX_TARGET_SIZE; "
+                                 "'incremental' (por defecto) refresca lo existente con peticiones condicionales.")
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help="Peticiones de detalle simultáneas (por defecto POKEAPI_CONCURRENCY).")
+        parser.add_argument('--page-size', type=int, default=None,
+                            help="Items por página del listado (por defecto POKEAPI_PAGE_SIZE).")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Filas por lote de escritura (por defecto POKEAPI_BATCH_SIZE).")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Descarga y compara sin escribir en la base de datos.")
+        parser.add_argument('--no-warm', action='store_true',
+                            help="No precalentar la caché de resultados al terminar (solo aplica "
+                                 "si el alias 'results' es compartido).")
+
+    def handle(self, *args, **options):
+        for option in ('concurrency', 'page_size', 'batch_size'):
+            if options[option] is not None and options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} debe ser mayor que 0.")
+
+        start = time.perf_counter()
+        report = PokeService.sync_data(
+            concurrency=options['concurrency'],
+            mode=options['mode'],
+            batch_size=options['batch_size'],
+            page_size=options['page_size'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - start
+
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Sincronización {options['mode']} en {elapsed:.2f}s: "
+            f"{report.inserted} insertados, {report.updated} actualizados, "
+            f"{report.unchanged} sin cambios, {report.failed} fallidos"
+        ))
+        if report.recovered:
+            self.stdout.write(f"{report.recovered} detalles recuperados en pasadas diferidas")
+
+        if not options['dry_run'] and not options['no_warm']:
+            if result_cache.is_shared():
+                timings = warmup.warm_results()
+                self.stdout.write(f"Caché de resultados precalentada: {len(timings)} consultas en {sum(timings.values()):.2f}ms")
+            else:
+                self.stdout.write("Precalentado omitido: el alias 'results' es local a este proceso")
+
+        if report.failed:
+            raise CommandError(f"{report.failed} detalles no se pudieron obtener de PokeAPI.")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis import warmup
+
+
+class Command(BaseCommand):
+    """
+    Chequeo de arranque: DB accesible, migraciones aplicadas y manifest de
+    estáticos presente. Sin --check-only además precalienta este proceso y
+    muestra cuánto tardó cada paso.
+
+    Ejemplos:
+        python manage.py warmup --check-only
+        python manage.py warmup
+    """
+    help = "Verifica que el servidor puede arrancar y precalienta cachés e índices."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check-only', action='store_true', help="Solo verifica, sin precalentar.")
+
+    def handle(self, *args, **options):
+        problems = warmup.check()
+        if problems:
+            raise CommandError("No se puede servir:\n  - " + "\n  - ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Chequeo de arranque OK."))
+
+        if options['check_only']:
+            return
+        for step, ms in warmup.warm().items():
+            self.stdout.write(f"{step:<14} {ms:.2f}ms")
@@ -0,0 +1,189 @@
+"""
+Métricas en memoria del proceso, expuestas en formato de texto de Prometheus.
+
+Un registro mínimo (contadores e histogramas con etiquetas) sin
+dependencias nuevas. Los histogramas son acumulativos, como espera
+Prometheus: las ventanas móviles se calculan del lado del servidor con
+`rate()` / `histogram_quantile()`.
+
+Lo alimentan la instrumentación de peticiones (analysis/instrumentation.py)
+y el cliente de PokeAPI (services.MeteredSession). Se activa con
+POKEDEX_METRICS_ENABLED.
+"""
+import math
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from django.conf import settings
+
+# Límites superiores (segundos) de los buckets de duración
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def enabled() -> bool:
+    return settings.POKEDEX_METRICS_ENABLED
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{%s}' % ','.join(f'{key}="{value}"' for key, value in escaped)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Contador monótono con etiquetas."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in values]
+
+
+class Histogram:
+    """
+    Histograma con buckets fijos por combinación de etiquetas.
+
+    Por serie guarda el conteo de cada bucket (no acumulado), la suma y el
+    total; la exposición los acumula al formatear.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DURATION_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _labels(labels)
+        # Índice del primer bucket con límite >= value (len(buckets) = +Inf)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [conteos por bucket..., +Inf, suma, total]
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            return series[-1] if series else 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        lines = []
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), values):
+                cumulative += count
+                bucket_labels = labels + (('le', _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(round(values[-2], 6))}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {values[-1]}")
+        return lines
+
+
+class Registry:
+    """Colección de métricas del proceso."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, buckets))
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        """Exposición en formato de texto de Prometheus (versión 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# --- Peticiones HTTP (MetricsMiddleware) ---
+REQUEST_DURATION = REGISTRY.histogram(
+    'pokedex_request_duration_seconds',
+    "Duración de las peticiones por vista y fase (total, db, view, template).",
+)
+REQUESTS = REGISTRY.counter('pokedex_requests_total', "Peticiones atendidas por vista, método y estado HTTP.")
+DB_QUERIES = REGISTRY.counter('pokedex_db_queries_total', "Consultas SQL ejecutadas por vista.")
+
+# --- Cliente de PokeAPI (PokeService) ---
+FETCH_DURATION = REGISTRY.histogram(
+    'pokeapi_fetch_duration_seconds', "Latencia de las peticiones a PokeAPI por endpoint ('list' o 'detail').",
+)
+FETCH_ERRORS = REGISTRY.counter(
+    'pokeapi_fetch_errors_total', "Peticiones a PokeAPI fallidas por endpoint y motivo (excepción o estado HTTP).",
+)
+FETCH_RETRIES = REGISTRY.counter(
+    'pokeapi_fetch_retries_total', "Reintentos de peticiones a PokeAPI por endpoint y motivo.",
+)
+BREAKER_OPENED = REGISTRY.counter(
+    'pokeapi_breaker_opened_total', "Veces que el circuit breaker del cliente de PokeAPI se abrió.",
+)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def reset() -> None:
+    REGISTRY.reset()
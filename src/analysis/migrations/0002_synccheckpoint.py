@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_url', models.CharField(blank=True, max_length=500)),
+                ('offset', models.PositiveIntegerField(default=0)),
+                ('last_pokedex_id', models.IntegerField(blank=True, null=True)),
+                ('completed', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
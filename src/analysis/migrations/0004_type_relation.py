@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0003_pokemon_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Type',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PokemonType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('pokemon', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='analysis.pokemon')),
+                ('type', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='analysis.type')),
+            ],
+            options={
+                'ordering': ['slot'],
+                'indexes': [models.Index(fields=['type', 'pokemon'], name='pokemontype_type_pokemon_idx')],
+                'constraints': [models.UniqueConstraint(fields=('pokemon', 'slot'), name='unique_pokemon_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:05
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def split_types(types_csv):
+    return [t.strip() for t in (types_csv or '').split(',') if t.strip()]
+
+
+def populate_slots(apps, schema_editor):
+    """Construye Type / PokemonType a partir del CSV existente en Pokemon.types."""
+    Pokemon = apps.get_model('analysis', 'Pokemon')
+    Type = apps.get_model('analysis', 'Type')
+    PokemonType = apps.get_model('analysis', 'PokemonType')
+
+    type_ids = {}
+    batch = []
+
+    def flush():
+        PokemonType.objects.bulk_create(batch)
+        batch.clear()
+
+    for pk, types_csv in Pokemon.objects.values_list('pk', 'types').iterator(chunk_size=BATCH_SIZE):
+        for slot, name in enumerate(split_types(types_csv), start=1):
+            if name not in type_ids:
+                type_ids[name] = Type.objects.get_or_create(name=name)[0].pk
+            batch.append(PokemonType(pokemon_id=pk, type_id=type_ids[name], slot=slot))
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+
+def clear_slots(apps, schema_editor):
+    apps.get_model('analysis', 'PokemonType').objects.all().delete()
+    apps.get_model('analysis', 'Type').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0004_type_relation'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_slots, clear_slots),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def populate_derived(apps, schema_editor):
+    """Calcula types_count y name_reversed para las filas existentes."""
+    Pokemon = apps.get_model('analysis', 'Pokemon')
+    batch = []
+    for pokemon in Pokemon.objects.only('pk', 'name', 'types').iterator(chunk_size=BATCH_SIZE):
+        pokemon.types_count = len([t for t in (pokemon.types or '').split(',') if t.strip()])
+        pokemon.name_reversed = (pokemon.name or '')[::-1]
+        batch.append(pokemon)
+        if len(batch) >= BATCH_SIZE:
+            Pokemon.objects.bulk_update(batch, ['types_count', 'name_reversed'])
+            batch.clear()
+    if batch:
+        Pokemon.objects.bulk_update(batch, ['types_count', 'name_reversed'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0005_populate_type_relation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pokemon',
+            name='name_reversed',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='pokemon',
+            name='types_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_derived, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['name'], name='pokemon_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['weight', 'height'], name='pokemon_weight_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['height', 'weight'], name='pokemon_height_weight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['types_count', 'pokedex_id'], name='pokemon_types_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pokemon',
+            index=models.Index(fields=['name_reversed'], name='pokemon_name_reversed_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+import sqlite3
+
+from django.db import migrations
+
+# Tabla FTS5 (tokenizador trigram) sobre analysis_pokemon y los triggers que
+# la mantienen. Copia fija del esquema: analysis/search.py lo reinstala tras
+# cada `migrate` con sus propias sentencias, que deben producir lo mismo.
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS analysis_pokemon_fts USING fts5(
+        name, content='analysis_pokemon', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS analysis_pokemon_fts_ai AFTER INSERT ON analysis_pokemon BEGIN
+        INSERT INTO analysis_pokemon_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analysis_pokemon_fts_ad AFTER DELETE ON analysis_pokemon BEGIN
+        INSERT INTO analysis_pokemon_fts(analysis_pokemon_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS analysis_pokemon_fts_au AFTER UPDATE OF name ON analysis_pokemon BEGIN
+        INSERT INTO analysis_pokemon_fts(analysis_pokemon_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO analysis_pokemon_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    "INSERT INTO analysis_pokemon_fts(analysis_pokemon_fts) VALUES ('rebuild')",
+]
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS analysis_pokemon_fts_ai",
+    "DROP TRIGGER IF EXISTS analysis_pokemon_fts_ad",
+    "DROP TRIGGER IF EXISTS analysis_pokemon_fts_au",
+    "DROP TABLE IF EXISTS analysis_pokemon_fts",
+]
+
+
+def install(apps, schema_editor):
+    """Solo SQLite 3.34+ compilado con FTS5 (el tokenizador trigram es de 3.34)."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or sqlite3.sqlite_version_info < (3, 34):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        if not any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall()):
+            return
+        for sql in FTS_SCHEMA:
+            cursor.execute(sql)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in FTS_DROP:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0006_pokemon_derived_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Índice GIN de trigramas sobre UPPER(name), la expresión que genera
+# `name__icontains` en PostgreSQL. En SQLite la subcadena la cubre FTS5 (0007).
+TRIGRAM_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS pokemon_name_trgm_idx ON analysis_pokemon "
+    "USING gin (UPPER(name) gin_trgm_ops)",
+]
+# La extensión se conserva: otras bases o esquemas pueden depender de ella
+TRIGRAM_DROP = [
+    "DROP INDEX IF EXISTS pokemon_name_trgm_idx",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0007_pokemon_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(TRIGRAM_SQL), _run(TRIGRAM_DROP)),
+    ]
@@ -0,0 +1,81 @@
+from django.db import migrations, models
+
+# El valor nuevo es el mayor entre version + 1 y la hora actual en microsegundos:
+# si una transacción se revierte, la siguiente escritura no repite su versión.
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS pokemon_dataset_version_{suffix} AFTER {event} ON analysis_pokemon
+    BEGIN
+        INSERT INTO analysis_datasetversion (id, version)
+        VALUES (1, CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER))
+        ON CONFLICT (id) DO UPDATE SET version = MAX(version + 1, excluded.version);
+    END
+    """
+    for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+]
+SQLITE_DROP = [f"DROP TRIGGER IF EXISTS pokemon_dataset_version_{suffix}" for suffix in ('ai', 'au', 'ad')]
+
+# En PostgreSQL basta un trigger por sentencia (un bulk upsert es un solo incremento)
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION analysis_bump_dataset_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO analysis_datasetversion (id, version)
+        VALUES (1, (extract(epoch FROM clock_timestamp()) * 1000000)::bigint)
+        ON CONFLICT (id) DO UPDATE
+            SET version = GREATEST(analysis_datasetversion.version + 1, excluded.version);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS pokemon_dataset_version ON analysis_pokemon",
+    """
+    CREATE TRIGGER pokemon_dataset_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON analysis_pokemon
+    FOR EACH STATEMENT EXECUTE FUNCTION analysis_bump_dataset_version()
+    """,
+]
+POSTGRES_DROP = [
+    "DROP TRIGGER IF EXISTS pokemon_dataset_version ON analysis_pokemon",
+    "DROP FUNCTION IF EXISTS analysis_bump_dataset_version()",
+]
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def install_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_TRIGGERS)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_TRIGGERS)
+
+
+def drop_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_DROP)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0008_postgres_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(install_triggers, drop_triggers),
+    ]
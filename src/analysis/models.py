@@ -1,5 +1,36 @@
+from typing import Dict, List
 from django.db import models
 
+from . import result_cache
+
+
+class PokemonQuerySet(models.QuerySet):
+    """
+    Las escrituras masivas no disparan señales: estas variantes invalidan la
+    caché de resultados del dashboard (analysis/result_cache.py) al terminar.
+    """
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        result_cache.invalidate()
+        return objs
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        result_cache.invalidate()
+        return rows
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        result_cache.invalidate()
+        return rows
+
+    def delete(self):
+        deleted = super().delete()
+        result_cache.invalidate()
+        return deleted
+
+
 class Pokemon(models.Model):
     """
     Representa un espécimen Pokémon almacenado para análisis local.
@@ -10,12 +41,179 @@ class Pokemon(models.Model):
         types (str): Cadena de texto con los tipos separados por coma (ej: 'grass, poison').
         height (float): Altura en decímetros.
         weight (float): Peso en hectogramos.
+        etag (str): Validador ETag de la última respuesta 'detail' de PokeAPI.
+        last_modified (str): Cabecera Last-Modified de la última respuesta 'detail'.
+        content_hash (str): SHA-256 de las columnas de negocio (detecta cambios reales).
+        types_count (int): Cantidad de tipos (derivado de `types`).
+        name_reversed (str): Nombre invertido, clave de orden de la columna 'transformed'.
+
+    El CSV `types` se conserva como copia desnormalizada para presentación;
+    los filtros usan la relación indexada `slots` (ver PokemonType).
+    Las columnas derivadas se recalculan en save() y en la ingesta por lotes
+    (ver `refresh_derived`), así el dashboard ordena por ellas en SQL.
     """
     pokedex_id = models.IntegerField(unique=True)
     name = models.CharField(max_length=100)
     types = models.CharField(max_length=200)
     height = models.FloatField()
     weight = models.FloatField()
+    etag = models.CharField(max_length=200, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    types_count = models.PositiveSmallIntegerField(default=0)
+    name_reversed = models.CharField(max_length=100, blank=True, default='')
+
+    objects = PokemonQuerySet.as_manager()
+
+    class Meta:
+        # Combinaciones de filtro/orden que expone el dashboard
+        indexes = [
+            models.Index(fields=['name'], name='pokemon_name_idx'),
+            models.Index(fields=['weight', 'height'], name='pokemon_weight_height_idx'),
+            models.Index(fields=['height', 'weight'], name='pokemon_height_weight_idx'),
+            models.Index(fields=['types_count', 'pokedex_id'], name='pokemon_types_count_idx'),
+            models.Index(fields=['name_reversed'], name='pokemon_name_reversed_idx'),
+        ]
+
+    def refresh_derived(self) -> None:
+        """Recalcula las columnas derivadas a partir de `name` y `types`."""
+        self.types_count = len(split_types(self.types))
+        self.name_reversed = (self.name or '')[::-1]
+
+    def save(self, *args, **kwargs) -> None:
+        self.refresh_derived()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'name', 'types'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'types_count', 'name_reversed'}
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return str(self.name)
+
+
+def split_types(types_csv: str) -> List[str]:
+    """Convierte el CSV de tipos ('grass, poison') en la lista ordenada por slot."""
+    return [t.strip() for t in (types_csv or '').split(',') if t.strip()]
+
+
+class Type(models.Model):
+    """
+    Catálogo de tipos elementales (ej: 'grass', 'fire').
+
+    Attributes:
+        name (str): Nombre del tipo en minúsculas, único.
+    """
+    name = models.CharField(max_length=30, unique=True)
+
+    def __str__(self) -> str:
+        return str(self.name)
+
+
+class PokemonType(models.Model):
+    """
+    Tabla de unión Pokemon <-> Type con el orden (slot) que entrega PokeAPI.
+
+    El índice compuesto (type, pokemon) resuelve el filtro por tipo del
+    dashboard con una búsqueda indexada en lugar de un LIKE '%x%' sobre el CSV.
+    La restricción única (pokemon, slot) cubre las búsquedas por Pokémon, por
+    eso ninguna de las dos FK crea su índice individual.
+
+    Attributes:
+        pokemon (Pokemon): Especie.
+        type (Type): Tipo asignado.
+        slot (int): Posición del tipo (1 = primario, 2 = secundario).
+    """
+    pokemon = models.ForeignKey(Pokemon, on_delete=models.CASCADE, related_name='slots', db_index=False)
+    type = models.ForeignKey(Type, on_delete=models.CASCADE, related_name='slots', db_index=False)
+    slot = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['pokemon', 'slot'], name='unique_pokemon_slot'),
+        ]
+        indexes = [
+            models.Index(fields=['type', 'pokemon'], name='pokemontype_type_pokemon_idx'),
+        ]
+        ordering = ['slot']
+
+    @classmethod
+    def replace_for(cls, types_by_pk: Dict[int, str]) -> None:
+        """
+        Reemplaza los slots de varios Pokémon a partir de su CSV de tipos.
+
+        Cuesta un número constante de consultas sin importar cuántos Pokémon
+        se reciban: alta de tipos nuevos, lectura de ids, borrado e inserción.
+
+        Args:
+            types_by_pk: {pk de Pokemon: CSV de tipos}.
+        """
+        if not types_by_pk:
+            return
+
+        parsed = {pk: split_types(csv) for pk, csv in types_by_pk.items()}
+        names = {name for type_names in parsed.values() for name in type_names}
+
+        Type.objects.bulk_create([Type(name=name) for name in names], ignore_conflicts=True)
+        type_ids = dict(Type.objects.filter(name__in=names).values_list('name', 'id'))
+
+        cls.objects.filter(pokemon_id__in=list(parsed)).delete()
+        cls.objects.bulk_create([
+            cls(pokemon_id=pk, type_id=type_ids[name], slot=slot)
+            for pk, type_names in parsed.items()
+            for slot, name in enumerate(type_names, start=1)
+        ])
+
+    def __str__(self) -> str:
+        return f"{self.pokemon_id}:{self.slot}={self.type_id}"
+
+
+class SyncCheckpoint(models.Model):
+    """
+    Punto de reanudación de la sincronización paginada con PokeAPI.
+
+    Es una tabla de una sola fila (pk=1). Se actualiza al terminar de
+    persistir cada página, de modo que una sincronización interrumpida
+    continúa desde la última página confirmada en lugar de empezar de cero.
+
+    Attributes:
+        next_url (str): Enlace 'next' de PokeAPI pendiente de procesar ('' si no hay).
+        offset (int): Cantidad de items del listado ya procesados.
+        last_pokedex_id (int): Mayor pokedex_id persistido en la última página.
+        completed (bool): Indica si la última corrida alcanzó el objetivo o el final del listado.
+        updated_at (datetime): Momento de la última actualización.
+    """
+    next_url = models.CharField(max_length=500, blank=True)
+    offset = models.PositiveIntegerField(default=0)
+    last_pokedex_id = models.IntegerField(null=True, blank=True)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def load(cls) -> 'SyncCheckpoint':
+        """Devuelve la fila única de checkpoint, creándola si no existe."""
+        checkpoint, _ = cls.objects.get_or_create(pk=1)
+        return checkpoint
+
+    def __str__(self) -> str:
+        return f"offset={self.offset} next={self.next_url or '-'}"
+
+
+class DatasetVersion(models.Model):
+    """
+    Versión del contenido de la tabla Pokemon, común a todos los procesos.
+
+    Es una tabla de una sola fila (pk=1) que mantienen triggers de la base de
+    datos (migración 0009): cualquier INSERT, UPDATE o DELETE sobre Pokemon la
+    incrementa, venga del ORM, de SQL crudo o de otro proceso. La caché de
+    resultados, los ETag y los índices en memoria se validan contra ella (ver
+    analysis/result_cache.py).
+
+    Attributes:
+        version (int): Valor monótono; nunca se reutiliza aunque una
+            transacción se revierta, porque parte de la hora actual en
+            microsegundos.
+    """
+    version = models.BigIntegerField()
+
+    def __str__(self) -> str:
+        return f"v{self.version}"
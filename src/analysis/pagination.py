@@ -0,0 +1,119 @@
+"""
+Paginación por clave (keyset) para el dashboard.
+
+En lugar de OFFSET, cada página se pide con un token opaco que guarda la
+clave de orden de la última (o primera) fila vista. La consulta siguiente
+filtra con `(columna, pokedex_id) > (valor, id)` y se apoya en los índices
+de orden, así que el costo de una página profunda es O(limit) y no O(tabla).
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from django.db.models import Q, QuerySet
+
+# Desempate único: garantiza un orden total aunque la columna se repita
+TIEBREAKER = 'pokedex_id'
+
+FORWARD = 'next'
+BACKWARD = 'prev'
+
+
+def encode_token(signature: str, direction: str, value: Any, pokedex_id: int) -> str:
+    """Serializa la posición de corte en un token apto para la URL."""
+    payload = json.dumps({'s': signature, 'd': direction, 'k': [value, pokedex_id]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_token(token: str, signature: str) -> Optional[dict]:
+    """
+    Devuelve el contenido del token o None si está corrupto o pertenece a
+    otro criterio de orden (ej: el usuario cambió la columna de orden).
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, pokedex_id = data['k']
+        if data['s'] != signature or data['d'] not in (FORWARD, BACKWARD):
+            return None
+        return {'direction': data['d'], 'value': value, 'pokedex_id': int(pokedex_id)}
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """Resultado de una página: filas y tokens para navegar."""
+    items: List[Any]
+    next_token: str = ''
+    prev_token: str = ''
+
+
+class KeysetPaginator:
+    """
+    Pagina un QuerySet ordenado por `field` (+ pokedex_id como desempate).
+
+    Args:
+        queryset: Consulta ya filtrada (sin orden; lo impone el paginador).
+        field: Columna de orden.
+        descending: Orden descendente.
+        limit: Filas por página.
+    """
+
+    def __init__(self, queryset: QuerySet, field: str, descending: bool, limit: int) -> None:
+        self.queryset = queryset
+        self.field = field
+        self.descending = descending
+        self.limit = limit
+        self.signature = f"{field}:{'desc' if descending else 'asc'}"
+
+    def _ordered(self, reverse: bool) -> QuerySet:
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return self.queryset.order_by(f"{prefix}{self.field}", f"{prefix}{TIEBREAKER}")
+
+    def _after(self, qs: QuerySet, value: Any, pokedex_id: int, reverse: bool) -> QuerySet:
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return qs.filter(
+            Q(**{f"{self.field}__{lookup}": value})
+            | Q(**{self.field: value, f"{TIEBREAKER}__{lookup}": pokedex_id})
+        )
+
+    def _token(self, direction: str, obj: Any) -> str:
+        return encode_token(self.signature, direction, getattr(obj, self.field), getattr(obj, TIEBREAKER))
+
+    def page(self, token: str = '') -> KeysetPage:
+        """
+        Materializa como máximo `limit` + 1 filas (la extra solo indica si hay más).
+
+        Un token inválido o de otro orden se ignora y se devuelve la primera
+        página, igual que el resto de los filtros mal formados de la vista.
+        """
+        cursor = decode_token(token, self.signature)
+        backward = cursor is not None and cursor['direction'] == BACKWARD
+
+        qs = self._ordered(reverse=backward)
+        if cursor is not None:
+            qs = self._after(qs, cursor['value'], cursor['pokedex_id'], reverse=backward)
+
+        rows = list(qs[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if backward:
+            rows.reverse()
+
+        page = KeysetPage(items=rows)
+        if not rows:
+            return page
+
+        # Hacia adelante: hay siguiente si sobró una fila; hay anterior si vinimos de un token.
+        # Hacia atrás: al revés.
+        if (has_more and not backward) or backward:
+            page.next_token = self._token(FORWARD, rows[-1])
+        if (has_more and backward) or (cursor is not None and not backward):
+            page.prev_token = self._token(BACKWARD, rows[0])
+        return page
@@ -0,0 +1,262 @@
+"""
+Especificación de consulta compartida por el dashboard y la API JSON.
+
+`PokemonQuery` concentra el parseo de los query params (con la misma
+coerción silenciosa de siempre: un input inválido se ignora) y la
+construcción del QuerySet filtrado y ordenado.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from django.db.models import QuerySet
+
+from . import search
+from .models import Pokemon, split_types
+
+# Límites de filas que ofrece el selector del dashboard
+DASHBOARD_LIMITS = (10, 25, 50)
+DEFAULT_LIMIT = 50
+
+# Criterios de orden públicos -> columna SQL (todas respaldadas por índice)
+SORT_FIELDS = {
+    'pokedex_id': 'pokedex_id',
+    'name': 'name',
+    'weight': 'weight',
+    'height': 'height',
+    'types_count': 'types_count',
+    'transformed': 'name_reversed',
+}
+
+
+# Campos exportables por la API: columnas que necesita y cómo se calcula el valor
+FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any], 'PokemonQuery'], Any]]] = {
+    'pokedex_id': (('pokedex_id',), lambda row, q: row['pokedex_id']),
+    'name': (('name',), lambda row, q: row['name']),
+    'types': (('types',), lambda row, q: split_types(row['types'])),
+    'types_count': (('types_count',), lambda row, q: row['types_count']),
+    'height': (('height',), lambda row, q: row['height']),
+    'weight': (('weight',), lambda row, q: row['weight']),
+    'height_cm': (('height',), lambda row, q: int(row['height'] * 10)),
+    'weight_kg': (('weight',), lambda row, q: round(row['weight'] / 10, 2)),
+    'transformed': (('name', 'name_reversed'), lambda row, q: row['name_reversed'] if q.inverts_name else row['name']),
+}
+
+
+def parse_fields(raw: str) -> List[str]:
+    """
+    Lista de campos pedida con `?fields=a,b` (vacío = todos, en el orden de FIELDS).
+
+    Raises:
+        ValueError: Si algún campo no existe.
+    """
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    if not fields:
+        return list(FIELDS)
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}. Disponibles: {', '.join(FIELDS)}")
+    return list(dict.fromkeys(fields))
+
+
+def _parse_number(value: str, multiply: float = 1, divide: float = 1) -> Optional[float]:
+    """
+    Convierte un input numérico del usuario a la unidad de la DB.
+
+    Returns:
+        El valor convertido, o None si está vacío o no es numérico (el filtro se ignora).
+    """
+    if not value:
+        return None
+    try:
+        return float(value) * multiply / divide
+    except ValueError:
+        return None
+
+
+def _clean(params: Mapping[str, str], key: str, default: str = '') -> str:
+    value = params.get(key, default).strip()
+    # El template puede devolver 'None' literal en los inputs vacíos
+    return '' if value == 'None' else value
+
+
+@dataclass(frozen=True)
+class PokemonQuery:
+    """
+    Filtros, orden y corte de una consulta sobre Pokemon.
+
+    Los inputs numéricos se guardan tal como llegaron (para repintarlos en
+    el formulario) y se exponen ya convertidos a la unidad de la DB.
+
+    Attributes:
+        name (str): Subcadena del nombre (insensible a mayúsculas).
+        type (str): Tipo exacto ('' o 'all' = sin filtro).
+        min_weight / max_weight (str): Rango de peso en Kg.
+        min_height / max_height (str): Rango de altura en Cm.
+        range_mode (str): 'strict' (>, <) o 'inclusive' (>=, <=).
+        sort (str): Criterio de orden solicitado.
+        direction (str): 'asc' | 'desc'.
+        transform_func (str): Transformación del nombre ('invert' por defecto).
+        limit (int | None): Filas por página (None = sin límite).
+        cursor (str): Token de paginación por clave.
+    """
+    name: str = ''
+    type: str = ''
+    min_weight: str = ''
+    max_weight: str = ''
+    min_height: str = ''
+    max_height: str = ''
+    range_mode: str = 'strict'
+    sort: str = 'pokedex_id'
+    direction: str = 'asc'
+    transform_func: str = 'invert'
+    limit: Optional[int] = DEFAULT_LIMIT
+    cursor: str = ''
+
+    @classmethod
+    def from_params(
+        cls,
+        params: Mapping[str, str],
+        limits: Optional[Sequence[int]] = DASHBOARD_LIMITS,
+        default_limit: Optional[int] = DEFAULT_LIMIT,
+    ) -> 'PokemonQuery':
+        """
+        Construye la consulta a partir de request.GET.
+
+        Args:
+            params: Query params.
+            limits: Valores de `limit` aceptados; None acepta cualquier entero positivo.
+            default_limit: Límite si falta o es inválido (None = sin límite).
+        """
+        try:
+            limit = int(params.get('limit', ''))
+            if limits is not None and limit not in limits: limit = default_limit
+            elif limit <= 0: limit = default_limit
+        except ValueError:
+            limit = default_limit
+
+        return cls(
+            name=params.get('name', '').strip(),
+            type=params.get('type', '').strip(),
+            min_weight=_clean(params, 'min_weight'),
+            max_weight=_clean(params, 'max_weight'),
+            min_height=_clean(params, 'min_height'),
+            max_height=_clean(params, 'max_height'),
+            range_mode=params.get('range_mode', 'strict'),
+            sort=params.get('sort', 'pokedex_id'),
+            direction=params.get('direction', 'asc'),
+            transform_func=params.get('transform_func', 'invert'),
+            limit=limit,
+            cursor=_clean(params, 'cursor'),
+        )
+
+    # --- Valores normalizados ---
+
+    @property
+    def type_filter(self) -> str:
+        return self.type.lower() if self.type != 'all' else ''
+
+    @property
+    def inclusive(self) -> bool:
+        return self.range_mode == 'inclusive'
+
+    @property
+    def descending(self) -> bool:
+        return self.direction == 'desc'
+
+    @property
+    def inverts_name(self) -> bool:
+        return self.transform_func == 'invert'
+
+    @property
+    def sort_field(self) -> str:
+        """Columna de orden; 'transformed' sin inversión ordena por el nombre."""
+        if self.sort == 'transformed' and not self.inverts_name:
+            return 'name'
+        return SORT_FIELDS.get(self.sort, 'pokedex_id')
+
+    @property
+    def weight_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Rango de peso en Hg (Input KG -> DB HG, 1 kg = 10 hg)."""
+        return _parse_number(self.min_weight, multiply=10), _parse_number(self.max_weight, multiply=10)
+
+    @property
+    def height_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Rango de altura en Dm (Input CM -> DB DM, 10 cm = 1 dm)."""
+        return _parse_number(self.min_height, divide=10), _parse_number(self.max_height, divide=10)
+
+    @property
+    def matches_sync_stream(self) -> bool:
+        """
+        True si las filas que emite /sync-events/ (sin filtrar, en orden de
+        Pokédex y con el nombre invertido) se pueden agregar tal cual al final
+        de esta vista: sin filtros, orden por defecto y primera página.
+        """
+        return (
+            not self.name and not self.type_filter
+            and self.weight_range == (None, None) and self.height_range == (None, None)
+            and self.sort_field == 'pokedex_id' and not self.descending
+            and self.inverts_name and not self.cursor
+        )
+
+    def cache_params(self) -> Tuple[Any, ...]:
+        """Tupla canónica: dos consultas equivalentes producen la misma."""
+        return (
+            self.name.lower(), self.type_filter, *self.weight_range, *self.height_range,
+            self.inclusive, self.sort_field, self.descending, self.limit, self.inverts_name, self.cursor,
+        )
+
+    def form_state(self) -> Dict[str, Any]:
+        """Estado de los filtros para repintar el formulario del dashboard."""
+        return {
+            'name': self.name,
+            'type': self.type,
+            'min_weight': self.min_weight,
+            'max_weight': self.max_weight,
+            'min_height': self.min_height,
+            'max_height': self.max_height,
+            'range_mode': self.range_mode,
+            'current_sort': self.sort,
+            'current_dir': self.direction,
+            'transform_func': self.transform_func,
+        }
+
+    # --- QuerySets ---
+
+    def filtered(self) -> QuerySet:
+        """QuerySet con todos los filtros aplicados y sin orden."""
+        qs = Pokemon.objects.all()
+
+        if self.name:
+            # Subcadena del nombre: índice FTS5 trigram si está disponible (ver search.py)
+            qs = search.filter_name(qs, self.name)
+
+        if self.type_filter:
+            # Búsqueda exacta sobre la relación normalizada (índice type+pokemon)
+            qs = qs.filter(slots__type__name=self.type_filter)
+
+        lookups = ('gte', 'lte') if self.inclusive else ('gt', 'lt')
+        for field, bounds in (('weight', self.weight_range), ('height', self.height_range)):
+            for lookup, bound in zip(lookups, bounds):
+                if bound is not None:
+                    qs = qs.filter(**{f"{field}__{lookup}": bound})
+        return qs
+
+    def ordered(self) -> QuerySet:
+        """QuerySet filtrado con orden total (columna + pokedex_id como desempate)."""
+        prefix = '-' if self.descending else ''
+        return self.filtered().order_by(f"{prefix}{self.sort_field}", f"{prefix}pokedex_id")
+
+    def rows(self, fields: Sequence[str], chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Itera las filas como diccionarios con solo los campos pedidos.
+
+        Lee únicamente las columnas necesarias (`values()`) y con
+        `iterator(chunk_size)`, así que nunca se materializa el resultado
+        completo. Respeta `limit` si está definido; el cursor no aplica.
+        """
+        columns = list(dict.fromkeys(column for field in fields for column in FIELDS[field][0]))
+        qs = self.ordered().values(*columns)
+        if self.limit:
+            qs = qs[:self.limit]
+        for row in qs.iterator(chunk_size=chunk_size):
+            yield {field: FIELDS[field][1](row, self) for field in fields}
@@ -0,0 +1,227 @@
+"""
+Caché de resultados del dashboard (pokedex_view).
+
+Las claves combinan una versión del dataset con los parámetros de consulta
+normalizados. La versión vive en la base de datos (fila única de
+DatasetVersion) y la incrementan triggers sobre Pokemon, así que cualquier
+escritura la cambia, venga de este proceso, de otro worker, de un comando
+de manage.py o de SQL crudo. Las entradas anteriores dejan de ser
+alcanzables y el backend las expulsa por LRU (LocMemCache por defecto,
+alias `results` en CACHES). La corrección no depende de ese backend: solo
+las entradas viven en él.
+
+Leer la versión de la DB cuesta una consulta por clave primaria, así que el
+proceso la memoriza durante POKEDEX_DATASET_VERSION_TTL segundos: un acierto
+de caché, un 304 o una tecla del autocompletado no tocan la DB. Una
+escritura del propio proceso descarta el valor memorizado al instante
+(`invalidate`); la de otro proceso se ve como mucho TTL segundos después.
+Dentro de una petición HTTP la versión no cambia (DatasetVersionMiddleware).
+
+Un valor leído dentro de una transacción puede incluir escrituras propias
+que luego se reviertan; por eso solo vale mientras sigan abiertos los mismos
+savepoints (ver `_transaction_state`).
+"""
+import hashlib
+import json
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+
+CACHE_ALIAS = 'results'
+
+# Triggers de SQLite que incrementan la versión (mismas sentencias que la
+# migración 0009). SQLite los borra junto con la tabla si una migración
+# posterior reconstruye analysis_pokemon; `install_version_triggers` los repone.
+VERSION_TABLE = 'analysis_datasetversion'
+SQLITE_VERSION_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS pokemon_dataset_version_{suffix} AFTER {event} ON analysis_pokemon
+    BEGIN
+        INSERT INTO {VERSION_TABLE} (id, version)
+        VALUES (1, CAST((julianday('now') - 2440587.5) * 86400000000 AS INTEGER))
+        ON CONFLICT (id) DO UPDATE SET version = MAX(version + 1, excluded.version);
+    END
+    """
+    for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+]
+
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+# Versión leída en la petición en curso (None fuera de una petición)
+_request_scope: ContextVar[Optional[Dict[str, int]]] = ContextVar('pokedex_dataset_version', default=None)
+
+# Última versión leída de la DB por este proceso: valor, instante (time.monotonic)
+# y estado de transacción de la lectura. `generation` sube con cada `invalidate`
+# para que una lectura en curso no memorice un valor anterior a una escritura.
+_memo: Dict[str, Any] = {'version': None, 'read_at': 0.0, 'state': (), 'generation': 0}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _read_version() -> int:
+    from .models import DatasetVersion
+
+    version = DatasetVersion.objects.filter(pk=1).values_list('version', flat=True).first()
+    if version is None:
+        # Tabla vacía (base recién creada o vaciada): se inicializa con la hora,
+        # nunca con un valor que una entrada antigua pudiera tener
+        row, _ = DatasetVersion.objects.get_or_create(pk=1, defaults={'version': time.time_ns() // 1000})
+        version = row.version
+    return version
+
+
+def _transaction_state() -> Optional[Tuple[Optional[str], ...]]:
+    """
+    Savepoints abiertos en la conexión: () en autocommit (solo datos
+    confirmados, válido para todo el proceso). Los ids de savepoint no se
+    repiten en una conexión, así que si el savepoint de la lectura se
+    revierte el estado ya no coincide. Sin ningún savepoint dentro de una
+    transacción devuelve None: ese valor no se memoriza.
+    """
+    if not connection.in_atomic_block:
+        return ()
+    state = tuple(connection.savepoint_ids)
+    return state if any(state) else None
+
+
+def _memoized(state) -> Optional[int]:
+    with _lock:
+        if (
+            _memo['version'] is not None
+            and _memo['state'] == state
+            and time.monotonic() - _memo['read_at'] < settings.POKEDEX_DATASET_VERSION_TTL
+        ):
+            return _memo['version']
+    return None
+
+
+def dataset_version() -> int:
+    """Versión vigente del dataset (ver DatasetVersion)."""
+    scope = _request_scope.get()
+    if scope is not None and 'version' in scope:
+        return scope['version']
+
+    state = _transaction_state()
+    version = _memoized(state) if state is not None else None
+    if version is None:
+        with _lock:
+            generation = _memo['generation']
+        read_at = time.monotonic()
+        version = _read_version()
+        if state is not None:
+            with _lock:
+                if _memo['generation'] == generation:
+                    _memo.update(version=version, read_at=read_at, state=state)
+
+    if scope is not None:
+        scope['version'] = version
+    return version
+
+
+def install_version_triggers(conn) -> bool:
+    """
+    Repone (idempotente) los triggers de versión en SQLite. En PostgreSQL un
+    ALTER TABLE no los borra y no hace falta.
+
+    Returns:
+        True si los triggers quedaron instalados.
+    """
+    if conn.vendor != 'sqlite' or VERSION_TABLE not in conn.introspection.table_names():
+        return False
+    with conn.cursor() as cursor:
+        for statement in SQLITE_VERSION_TRIGGERS:
+            cursor.execute(statement)
+    return True
+
+
+def _forget_version() -> None:
+    with _lock:
+        _memo['version'] = None
+        _memo['generation'] += 1
+    scope = _request_scope.get()
+    if scope is not None:
+        scope.pop('version', None)
+
+
+def invalidate() -> None:
+    """
+    Punto único de invalidación tras una escritura en Pokemon hecha por este
+    proceso. Los triggers ya incrementaron la versión en la base de datos;
+    aquí solo se descarta la versión memorizada (del proceso y de la
+    petición en curso), ahora y al confirmar la transacción.
+    """
+    _forget_version()
+    transaction.on_commit(_forget_version)
+
+
+class DatasetVersionMiddleware:
+    """Fija la versión del dataset durante cada petición (se lee a lo sumo una vez)."""
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request_scope.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _request_scope.reset(token)
+
+
+def is_shared() -> bool:
+    """
+    True si otros procesos leen las mismas entradas (ej: FileBasedCache en
+    modo producción). Con LocMemCache cada proceso tiene su propia copia.
+    """
+    return not isinstance(_cache(), LocMemCache)
+
+
+def clear() -> None:
+    """Vacía el alias `results` (las entradas; la versión vive en la DB)."""
+    _cache().clear()
+
+
+def make_key(params: Tuple[Any, ...]) -> str:
+    """Clave de caché para una tupla canónica de parámetros."""
+    digest = hashlib.sha1(json.dumps(params, separators=(',', ':')).encode()).hexdigest()
+    return f"pokedex:v{dataset_version()}:{digest}"
+
+
+def lookup(key: str) -> Optional[Dict[str, Any]]:
+    """Devuelve el resultado cacheado (o None) y actualiza los contadores."""
+    result = _cache().get(key)
+    with _lock:
+        _counters['hits' if result is not None else 'misses'] += 1
+    return result
+
+
+def store(key: str, result: Dict[str, Any]) -> None:
+    """Guarda un resultado con el TIMEOUT configurado para el alias `results`."""
+    _cache().set(key, result)
+
+
+def stats() -> Dict[str, Any]:
+    """Contadores de aciertos/fallos de este proceso y versión vigente."""
+    with _lock:
+        hits, misses = _counters['hits'], _counters['misses']
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+        'version': dataset_version(),
+    }
+
+
+def reset_stats() -> None:
+    with _lock:
+        _counters['hits'] = _counters['misses'] = 0
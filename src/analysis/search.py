@@ -0,0 +1,375 @@
+"""
+Búsqueda de Pokémon por nombre.
+
+Tres niveles, de más barato a más tolerante:
+
+1.  Prefijo: rango sobre el índice B-tree de `name` (`name >= q AND name < q'`).
+2.  Subcadena: tabla virtual FTS5 con tokenizador trigram
+    (`analysis_pokemon_fts`), mantenida por triggers de SQLite, que indexa
+    lo mismo que un `icontains` (3 caracteres o más).
+3.  Aproximada: índice de trigramas en memoria con similitud de Jaccard
+    para tolerar errores de tipeo (ej: 'charzard' -> 'charizard').
+
+El autocompletado usa un cuarto índice, también en memoria: los nombres
+ordenados, recorridos con `bisect` sin tocar la DB en cada tecla.
+
+Fuera de SQLite (o sin FTS5) el nivel 2 degrada a `name__icontains`; en
+PostgreSQL lo resuelve el índice GIN de trigramas (ver analysis/database.py).
+"""
+import bisect
+import math
+import sqlite3
+import threading
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Type, TypeVar
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.db.models.expressions import RawSQL
+
+from . import result_cache
+from .models import Pokemon
+
+FTS_TABLE = 'analysis_pokemon_fts'
+# El tokenizador trigram no indexa consultas de menos de 3 caracteres
+FTS_MIN_LENGTH = 3
+FUZZY_THRESHOLD = 0.3
+LOAD_CHUNK_SIZE = 2000
+
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, content='analysis_pokemon', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON analysis_pokemon BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON analysis_pokemon BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name ON analysis_pokemon BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END""",
+]
+FTS_TRIGGERS = (f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au")
+
+# fts_enabled() por base de datos (alias, NAME): la tabla solo aparece o
+# desaparece con install_fts / drop_fts, que descartan el valor guardado
+_fts_state: Dict[Tuple[str, str], bool] = {}
+_fts_lock = threading.Lock()
+
+
+# --- FTS5 (SQLite) ---
+
+def install_fts(conn=connection) -> bool:
+    """
+    Crea (si faltan) la tabla FTS5 y sus triggers y la reconstruye cuando
+    hubo que crear algo. Es idempotente: se llama desde la migración y tras
+    cada `migrate`, porque SQLite elimina los triggers cuando Django
+    reconstruye la tabla `analysis_pokemon` en una migración posterior.
+
+    Returns:
+        True si la búsqueda FTS5 quedó disponible.
+    """
+    if not fts_supported(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)", [FTS_TABLE, *FTS_TRIGGERS]
+        )
+        if len(cursor.fetchall()) == 1 + len(FTS_TRIGGERS):
+            return True
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _forget_fts(conn)
+    return True
+
+
+def fts_supported(conn=connection) -> bool:
+    """SQLite con FTS5 y tokenizador trigram (3.34 o superior)."""
+    if conn.vendor != 'sqlite' or sqlite3.sqlite_version_info < (3, 34):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def drop_fts(conn=connection) -> None:
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for trigger in FTS_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _forget_fts(conn)
+
+
+def _fts_key(conn) -> Tuple[str, str]:
+    return conn.alias, str(conn.settings_dict['NAME'])
+
+
+def _forget_fts(conn) -> None:
+    with _fts_lock:
+        _fts_state.pop(_fts_key(conn), None)
+
+
+def fts_enabled(conn=connection) -> bool:
+    """
+    True si existe la tabla FTS5. Se consulta sqlite_master una vez por base
+    de datos y proceso; `filter_name` lo llama en cada búsqueda.
+    """
+    if conn.vendor != 'sqlite':
+        return False
+    key = _fts_key(conn)
+    with _fts_lock:
+        enabled = _fts_state.get(key)
+    if enabled is None:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            enabled = cursor.fetchone() is not None
+        with _fts_lock:
+            _fts_state[key] = enabled
+    return enabled
+
+
+def _fts_phrase(text: str) -> str:
+    """Frase FTS5 literal: comillas dobles y las internas duplicadas."""
+    return '"%s"' % text.replace('"', '""')
+
+
+def filter_name(qs: QuerySet, name: str) -> QuerySet:
+    """
+    Aplica el filtro por subcadena del nombre (misma semántica que
+    `name__icontains`) usando el índice FTS5 cuando es posible.
+    """
+    if len(name) >= FTS_MIN_LENGTH and fts_enabled():
+        return qs.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_fts_phrase(name)]
+        ))
+    return qs.filter(name__icontains=name)
+
+
+def prefix_matches(prefix: str, limit: int = 10) -> QuerySet:
+    """
+    Pokémon cuyo nombre empieza por `prefix`, por orden alfabético.
+
+    Se expresa como rango para que SQLite use el índice de `name` (un LIKE
+    'x%' con ESCAPE no siempre lo aprovecha). Los nombres se guardan en minúsculas.
+    """
+    prefix = prefix.lower()
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Pokemon.objects.filter(name__gte=prefix, name__lt=upper).order_by('name')[:limit]
+
+
+# --- Índice de trigramas en memoria ---
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas al estilo pg_trgm: cada palabra con 2 espacios delante y 1 detrás."""
+    grams = set()
+    for word in text.lower().replace('-', ' ').split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass
+class FuzzyMatch:
+    pk: int
+    pokedex_id: int
+    name: str
+    score: float
+
+
+class TrigramIndex:
+    """
+    Índice invertido trigrama -> filas, para ranking por similitud.
+
+    Attributes:
+        pks, pokedex_ids: Columnas por fila (`array`).
+        names: Nombre por fila.
+        sizes: Cantidad de trigramas distintos por fila.
+        postings: trigrama -> posiciones de fila (`array`).
+        version: Versión del dataset con la que se construyó.
+    """
+
+    def __init__(self) -> None:
+        self.pks = array('q')
+        self.pokedex_ids = array('q')
+        self.names: List[str] = []
+        self.sizes = array('H')
+        self.postings: Dict[str, array] = defaultdict(lambda: array('I'))
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.pks)
+
+    @classmethod
+    def build(cls) -> 'TrigramIndex':
+        index = cls()
+        index.version = result_cache.dataset_version()
+        rows = Pokemon.objects.values_list('pk', 'pokedex_id', 'name').iterator(chunk_size=LOAD_CHUNK_SIZE)
+        for position, (pk, pokedex_id, name) in enumerate(rows):
+            grams = trigrams(name)
+            index.pks.append(pk)
+            index.pokedex_ids.append(pokedex_id)
+            index.names.append(name)
+            index.sizes.append(min(len(grams), 65535))
+            for gram in grams:
+                index.postings[gram].append(position)
+        index.postings = dict(index.postings)
+        return index
+
+    def search(self, text: str, limit: int = 10, threshold: float = FUZZY_THRESHOLD) -> List[FuzzyMatch]:
+        """
+        Nombres más parecidos a `text` (similitud de Jaccard sobre trigramas),
+        de mayor a menor, descartando los que no superan `threshold`.
+        """
+        grams = trigrams(text)
+        if not grams:
+            return []
+
+        # Con similitud >= t un candidato comparte al menos ceil(t * |q|)
+        # trigramas con la consulta: el resto se descarta sin calcular el puntaje.
+        # Counter.update cuenta las listas de posiciones en C.
+        needed = max(1, math.ceil(threshold * len(grams)))
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for position, common in shared.items():
+            if common < needed:
+                continue
+            score = common / (len(grams) + self.sizes[position] - common)
+            if score >= threshold:
+                scored.append((score, position))
+        scored.sort(key=lambda item: (-item[0], self.names[item[1]]))
+
+        return [
+            FuzzyMatch(self.pks[p], self.pokedex_ids[p], self.names[p], round(score, 3))
+            for score, p in scored[:limit]
+        ]
+
+
+# --- Índice de prefijos en memoria (autocompletado) ---
+
+class PrefixIndex:
+    """
+    Nombres ordenados alfabéticamente con sus columnas alineadas.
+
+    Los nombres que empiezan por un prefijo forman un tramo contiguo de la
+    lista: `bisect` encuentra el inicio en O(log n) y se leen solo `limit` filas.
+
+    Attributes:
+        names: Nombres ordenados.
+        pokedex_ids: Número de Pokédex por fila (`array`).
+        version: Versión del dataset con la que se construyó.
+    """
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.pokedex_ids = array('q')
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def build(cls) -> 'PrefixIndex':
+        index = cls()
+        index.version = result_cache.dataset_version()
+        rows = Pokemon.objects.order_by('name', 'pokedex_id').values_list('name', 'pokedex_id')
+        for name, pokedex_id in rows.iterator(chunk_size=LOAD_CHUNK_SIZE):
+            index.names.append(name)
+            index.pokedex_ids.append(pokedex_id)
+        return index
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        """Hasta `limit` nombres que empiezan por `prefix`, en orden alfabético."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        results = []
+        position = bisect.bisect_left(self.names, prefix)
+        while position < len(self.names) and len(results) < limit and self.names[position].startswith(prefix):
+            results.append({'pokedex_id': self.pokedex_ids[position], 'name': self.names[position]})
+            position += 1
+        return results
+
+
+# --- Índices vigentes ---
+
+IndexT = TypeVar('IndexT', TrigramIndex, PrefixIndex)
+
+_indexes: Dict[type, object] = {}
+_lock = threading.Lock()
+
+
+def _current(cls: Type[IndexT]) -> IndexT:
+    """
+    Índice de la clase pedida; se reconstruye si cambió la versión del dataset.
+
+    La versión sale de la memoria del proceso (ver result_cache): una tecla del
+    autocompletado no consulta la DB salvo cuando vence
+    POKEDEX_DATASET_VERSION_TTL, y entonces es una lectura por clave primaria.
+    """
+    version = result_cache.dataset_version()
+    index = _indexes.get(cls)
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        index = _indexes.get(cls)
+        if index is None or index.version != version:
+            index = _indexes[cls] = cls.build()
+        return index
+
+
+def get_index() -> TrigramIndex:
+    return _current(TrigramIndex)
+
+
+def get_prefix_index() -> PrefixIndex:
+    return _current(PrefixIndex)
+
+
+def autocomplete(prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+    return get_prefix_index().complete(prefix, limit)
+
+
+def fuzzy(text: str, limit: int = 10) -> List[FuzzyMatch]:
+    return get_index().search(text, limit=limit)
+
+
+def search(text: str, limit: int = 10) -> List[Dict[str, object]]:
+    """
+    Resultados combinados y sin duplicados: primero prefijos, luego
+    subcadenas (FTS5) y por último coincidencias aproximadas.
+    """
+    text = text.strip().lower()
+    if not text:
+        return []
+
+    results: List[Dict[str, object]] = []
+    seen = set()
+
+    def add(pk, pokedex_id, name, match, score):
+        if pk not in seen and len(results) < limit:
+            seen.add(pk)
+            results.append({'pokedex_id': pokedex_id, 'name': name, 'match': match, 'score': score})
+
+    for pk, pokedex_id, name in prefix_matches(text, limit).values_list('pk', 'pokedex_id', 'name'):
+        add(pk, pokedex_id, name, 'prefix', 1.0)
+
+    if len(results) < limit:
+        substring = filter_name(Pokemon.objects.all(), text).order_by('name')
+        for pk, pokedex_id, name in substring.values_list('pk', 'pokedex_id', 'name')[:limit * 2]:
+            add(pk, pokedex_id, name, 'substring', 1.0)
+
+    if len(results) < limit:
+        for match in fuzzy(text, limit * 2):
+            add(match.pk, match.pokedex_id, match.name, 'fuzzy', match.score)
+
+    return results
@@ -1,72 +1,599 @@
-# src/analysis/services.py
 import requests
+import hashlib
+import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
 from django.conf import settings
-from .models import Pokemon
+from django.db import transaction
+from . import metrics
+from .client import Resilience, mount_pool
+from .http_cache import CacheLayer
+from .models import Pokemon, PokemonType, SyncCheckpoint
 
 logger = logging.getLogger(__name__)
 
+# Columnas que un upsert refresca cuando el pokedex_id ya existe
+UPSERT_FIELDS = [
+    'name', 'types', 'height', 'weight', 'etag', 'last_modified', 'content_hash',
+    'types_count', 'name_reversed',
+]
+
+# Columnas de negocio que alimentan el content_hash
+CONTENT_FIELDS = ('name', 'types', 'height', 'weight')
+
+# Modos de sincronización soportados por PokeService.sync_data
+SYNC_MODES = ('full', 'incremental')
+
+# Marcador devuelto por _fetch_detail cuando la API responde 304 Not Modified
+NOT_MODIFIED = object()
+
+# Marcador de un detalle fallido que se reintentará en la pasada diferida
+DEFERRED = object()
+
+
+@dataclass
+class SyncReport:
+    """
+    Resumen de una corrida de sincronización.
+
+    Attributes:
+        inserted (int): Especies nuevas persistidas.
+        updated (int): Filas existentes reescritas.
+        unchanged (int): Especies sin cambios (304 o mismo content_hash).
+        failed (int): Detalles que no se pudieron obtener (ni siquiera en
+            la pasada diferida).
+        recovered (int): Detalles que fallaron en su página y se obtuvieron
+            en la pasada diferida (ya contados como insertados, etc.).
+        total (int): Especies que la corrida espera procesar.
+    """
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    recovered: int = 0
+    total: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.inserted + self.updated + self.unchanged + self.failed
+
+    def as_dict(self) -> Dict[str, int]:
+        data = asdict(self)
+        data['processed'] = self.processed
+        return data
+
+
+class RateLimiter:
+    """
+    Limitador de peticiones por host (intervalo mínimo entre llamadas).
+
+    Es seguro entre hilos: cada worker reserva su "turno" bajo un lock y
+    luego duerme fuera de él, de modo que el ritmo global hacia un mismo
+    host nunca supera `rate` peticiones por segundo.
+
+    Attributes:
+        rate (float): Peticiones por segundo permitidas por host. Un valor
+            <= 0 desactiva el límite.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Bloquea al hilo llamador hasta que el host de `url` admita otra petición."""
+        if not self._interval:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ThrottledSession:
+    """
+    Envoltorio que aplica un RateLimiter antes de delegar cada `get`.
+
+    Se coloca debajo de la caché de respuestas para que solo las peticiones
+    que realmente salen a la red consuman turnos del limitador.
+    """
+
+    def __init__(self, inner, limiter: RateLimiter) -> None:
+        self.inner = inner
+        self.limiter = limiter
+
+    def get(self, url: str, **kwargs):
+        self.limiter.wait(url)
+        return self.inner.get(url, **kwargs)
+
+
+class MeteredSession:
+    """
+    Envoltorio que registra latencia y errores de cada `get` en
+    analysis/metrics.py, etiquetados por endpoint ('list' o 'detail').
+
+    Se coloca justo encima de la sesión real: no mide la espera del
+    limitador ni las respuestas servidas desde la caché.
+    """
+
+    def __init__(self, inner, endpoint: str) -> None:
+        self.inner = inner
+        self.endpoint = endpoint
+
+    def get(self, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.inner.get(url, **kwargs)
+        except requests.RequestException as e:
+            metrics.FETCH_ERRORS.inc(endpoint=self.endpoint, reason=type(e).__name__)
+            raise
+        finally:
+            metrics.FETCH_DURATION.observe(time.perf_counter() - start, endpoint=self.endpoint)
+        if not response.ok:
+            metrics.FETCH_ERRORS.inc(endpoint=self.endpoint, reason=f"http_{response.status_code}")
+        return response
+
+
 class PokeService:
     """
-    Fachada para la comunicación con la API externa (PokeAPI) y 
+    Fachada para la comunicación con la API externa (PokeAPI) y
     la persistencia de datos en el sistema local.
     """
-    
+
     @staticmethod
-    def sync_data() -> None:
+    def sync_data(concurrency: Optional[int] = None, mode: str = 'full',
+                  progress: Optional[Callable[[SyncReport], None]] = None,
+                  on_persist: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                  batch_size: Optional[int] = None, page_size: Optional[int] = None,
+                  dry_run: bool = False) -> SyncReport:
         """
-        Verifica el estado de la base de datos local y realiza una carga inicial
-        de datos si existen menos de 50 registros.
-        
+        Sincroniza el catálogo local con PokeAPI hasta POKEDEX_TARGET_SIZE registros.
+
         Logica de Negocio:
-            1. Verifica conteo en DB (Cheap query).
-            2. Si faltan datos, consume endpoint 'list' de PokeAPI.
-            3. Itera y consume endpoint 'detail' por cada item.
-            4. Persiste usando 'get_or_create' para evitar duplicados.
-        
+            1. Modo 'full': verifica conteo en DB (Cheap query) contra el
+               objetivo y no hace nada si ya se alcanzó. Modo 'incremental':
+               recorre siempre el catálogo para refrescarlo.
+            2. Recorre el endpoint 'list' de PokeAPI página a página siguiendo
+               los enlaces 'next' (ver iter_pages). El modo 'full' retoma
+               desde el SyncCheckpoint si una corrida anterior quedó a medias.
+            3. Por cada página consume el endpoint 'detail' de sus items en
+               paralelo, usando un pool de hilos acotado (POKEAPI_CONCURRENCY)
+               y un limitador de peticiones por host (POKEAPI_RATE_LIMIT).
+               Si POKEAPI_CACHE_PATH / POKEAPI_OFFLINE están activos, las
+               peticiones pasan por la caché de respuestas (ver http_cache).
+               En modo 'incremental' las peticiones son condicionales
+               (If-None-Match / If-Modified-Since) con los validadores
+               guardados en cada Pokemon. La latencia y los errores de cada
+               petición que sale a la red se registran en analysis/metrics.py.
+               Los errores transitorios se reintentan con backoff y un
+               circuit breaker corta la corrida si la API deja de responder
+               (ver analysis/client.py).
+            4. Persiste por lotes con upsert sobre 'pokedex_id' (ver
+               persist_batch). En modo 'incremental' solo se reescriben las
+               filas cuyo content_hash cambió. La escritura ocurre en el hilo
+               llamador (una sola conexión a DB).
+            5. Registra el checkpoint al cerrar cada página (modo 'full'). Nunca
+               avanza más allá de una página con detalles sin persistir.
+            6. Los detalles que fallaron se encolan y se vuelven a pedir al
+               final, hasta POKEAPI_DEFERRED_ROUNDS pasadas, esperando antes
+               de cada una a que el circuit breaker admita peticiones.
+
+        Solo una página (POKEAPI_PAGE_SIZE items) vive en memoria a la vez,
+        por lo que el consumo es constante sin importar el tamaño de la Pokedex.
+
+        Args:
+            concurrency: Número máximo de peticiones de detalle simultáneas.
+                Si es None se usa settings.POKEAPI_CONCURRENCY; 1 equivale
+                al recorrido secuencial.
+            mode: 'full' (carga inicial reanudable) o 'incremental'
+                (refresco condicional del catálogo existente).
+            progress: Callback opcional invocado con el SyncReport parcial
+                al cerrar cada página (usado por la tarea en segundo plano).
+            on_persist: Callback opcional invocado con los registros de cada
+                lote justo después de confirmarlo en la base de datos.
+            batch_size: Filas por lote; por defecto POKEAPI_BATCH_SIZE.
+            page_size: Items por página del listado; por defecto POKEAPI_PAGE_SIZE.
+            dry_run: Si es True se descarga y clasifica todo igual, pero no
+                se escribe nada (ni filas ni checkpoint).
+
+        Returns:
+            SyncReport con los conteos de insertados, actualizados, sin
+            cambios, fallidos y recuperados.
+
         Raises:
-            Maneja internamente requests.RequestException para asegurar 
+            ValueError: Si `mode` no es un modo soportado.
+            Maneja internamente requests.RequestException para asegurar
             que la vista no colapse ante fallos de red.
         """
+        if mode not in SYNC_MODES:
+            raise ValueError(f"Modo de sincronización desconocido: {mode}")
 
-        if Pokemon.objects.count() >= 50:
-            return
+        incremental = (mode == 'incremental')
+        report = SyncReport()
+        target: int = settings.POKEDEX_TARGET_SIZE
+
+        if not incremental and Pokemon.objects.count() >= target:
+            return report
 
         # Leemos la URL dinámicamente desde settings (.env)
         api_url: str = settings.POKEAPI_URL
+        workers = max(1, concurrency or settings.POKEAPI_CONCURRENCY)
+        first_page = f"{api_url}?limit={page_size or settings.POKEAPI_PAGE_SIZE}"
+
+        # Reanudación: si una corrida anterior quedó a medias se continúa desde
+        # su 'next'. Si terminó (completed) y aun así faltan filas, se recorre
+        # el listado desde el principio.
+        checkpoint = SyncCheckpoint.load()
+        if incremental or checkpoint.completed or not checkpoint.next_url:
+            checkpoint.offset = 0
+            start_url = first_page
+        else:
+            start_url = checkpoint.next_url
+
+        report.total = max(0, target - checkpoint.offset)
+
+        print(f"--- Iniciando Sincronización ({mode}) con {start_url} ---")
+
+        limiter = RateLimiter(settings.POKEAPI_RATE_LIMIT)
+        pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        cache_layer = CacheLayer.from_settings()
+        resilience = Resilience.from_settings()
+        deferred: List[Dict[str, Any]] = []
+
+        # Posición del listado y primera página con detalles sin persistir: el
+        # checkpoint nunca avanza más allá de esa página
+        offset, page_url, last_id = checkpoint.offset, start_url, checkpoint.last_pokedex_id
+        gap: Optional[Tuple[int, str]] = None
+
+        def cached(inner):
+            return cache_layer.wrap(inner) if cache_layer else inner
+
+        def metered(inner, endpoint):
+            return MeteredSession(inner, endpoint) if metrics.enabled() else inner
 
-        print(f"--- Iniciando Sincronización con {api_url} ---")
-        
         try:
-            # Usamos la variable api_url en lugar de la constante fija
-            response = requests.get(f"{api_url}?limit=50", timeout=10)
-            response.raise_for_status()
-            results = response.json().get('results', [])
-
-            # Usar Session mejora rendimiento en múltiples peticiones al mismo host
-            with requests.Session() as session:
-                for item in results:
-                    try:
-                        detail_resp = session.get(item['url'], timeout=5)
-                        detail_resp.raise_for_status()
-                        detail = detail_resp.json()
-
-                        # Procesar tipos
-                        types_list = [t['type']['name'] for t in detail['types']]
-                        types_str = ", ".join(types_list)
-
-                        Pokemon.objects.get_or_create(
-                            pokedex_id=detail['id'],
-                            defaults={
-                                'name': detail['name'],
-                                'types': types_str,
-                                'height': detail['height'],
-                                'weight': detail['weight']
-                            }
+            # Usar Session mejora rendimiento en múltiples peticiones al mismo host;
+            # el pool se dimensiona para que cada worker conserve su conexión
+            with requests.Session() as http:
+                mount_pool(http, workers)
+                session = cached(resilience.wrap(ThrottledSession(metered(http, 'detail'), limiter)))
+                mapper = pool.map if pool else map
+                pages = PokeService.iter_pages(
+                    start_url, target - checkpoint.offset,
+                    session=cached(resilience.wrap(metered(requests, 'list'), endpoint='list')),
+                )
+
+                try:
+                    for results, next_url in pages:
+                        known = PokeService._known_validators(results)
+                        failed_before, deferred_before = report.failed, len(deferred)
+
+                        def fetch(item: Dict[str, Any]) -> Any:
+                            validators = known.get(PokeService._id_from_url(item['url'])) if incremental else None
+                            record = PokeService._fetch_detail(session, item, validators)
+                            if record is None and settings.POKEAPI_DEFERRED_ROUNDS > 0:
+                                deferred.append(item)
+                                return DEFERRED
+                            return record
+
+                        page_last_id = PokeService._persist_all(
+                            mapper(fetch, results), report, known, skip_unchanged=incremental,
+                            batch_size=batch_size, on_persist=on_persist, dry_run=dry_run,
                         )
-                    except requests.RequestException as e:
-                        logger.error(f"Error obteniendo detalles de {item['name']}: {e}")
-                        continue # Saltamos al siguiente si uno falla
+                        if progress:
+                            progress(report)
+
+                        if gap is None and (report.failed > failed_before or len(deferred) > deferred_before):
+                            gap = (offset, page_url)
+                        offset += len(results)
+                        page_url = next_url or ''
+                        last_id = max(last_id or 0, page_last_id or 0) or None
+
+                        if gap is None and not (incremental or dry_run):
+                            PokeService._save_checkpoint(checkpoint, offset, page_url, last_id, target)
+                except requests.RequestException as e:
+                    # Listado cortado (ej: CircuitOpenError): lo ya listado se
+                    # completa igual con las pasadas diferidas
+                    logger.error(f"Error fatal conectando con PokeAPI: {e}")
+
+                # _retry_deferred espera a que el breaker vuelva a admitir peticiones
+                PokeService._retry_deferred(
+                    session, mapper, deferred, report, incremental,
+                    resilience.breaker, batch_size=batch_size, on_persist=on_persist, dry_run=dry_run,
+                )
+                if progress and deferred:
+                    progress(report)
+
+                # Con huecos, el checkpoint avanza solo si la pasada diferida los cubrió
+                if gap is not None and not (incremental or dry_run):
+                    if report.failed:
+                        PokeService._save_checkpoint(checkpoint, *gap, last_id, target, completed=False)
+                    else:
+                        PokeService._save_checkpoint(checkpoint, offset, page_url, last_id, target)
 
+        finally:
+            if pool:
+                pool.shutdown()
+            if cache_layer:
+                cache_layer.close()
+
+        return report
+
+    @staticmethod
+    def _save_checkpoint(checkpoint: SyncCheckpoint, offset: int, next_url: str,
+                         last_id: Optional[int], target: int, completed: Optional[bool] = None) -> None:
+        """
+        Registra la posición del listado hasta la que todo quedó persistido.
+
+        Args:
+            next_url: Página desde la que debe continuar la próxima corrida.
+            completed: Por defecto, True si se alcanzó el objetivo o el final
+                del listado.
+        """
+        checkpoint.offset = offset
+        checkpoint.next_url = next_url
+        checkpoint.last_pokedex_id = last_id
+        checkpoint.completed = (offset >= target or not next_url) if completed is None else completed
+        checkpoint.save()
+
+    @staticmethod
+    def _retry_deferred(session, mapper, items: List[Dict[str, Any]], report: SyncReport,
+                        incremental: bool, breaker, **persist_kwargs: Any) -> None:
+        """
+        Pasadas finales sobre los detalles que fallaron durante el recorrido.
+
+        Cada pasada espera a que el circuit breaker admita peticiones y pide
+        de nuevo los items pendientes; los que vuelven a fallar pasan a la
+        siguiente. En la última pasada un fallo cuenta como 'failed'.
+
+        Args:
+            items: Items del listado ({'name', 'url'}) que quedaron pendientes.
+            breaker: CircuitBreaker de la corrida.
+            **persist_kwargs: batch_size / on_persist / dry_run, igual que en _persist_all.
+        """
+        rounds = settings.POKEAPI_DEFERRED_ROUNDS
+        pending = list(items)
+        for round_number in range(1, rounds + 1):
+            if not pending:
+                return
+            wait = breaker.retry_in()
+            if wait:
+                time.sleep(wait)
+
+            last_round = round_number == rounds
+            retry = []
+            known = PokeService._known_validators(pending)
+            logger.info(f"Pasada diferida {round_number}/{rounds}: {len(pending)} detalles pendientes")
+
+            def fetch(item: Dict[str, Any]) -> Any:
+                validators = known.get(PokeService._id_from_url(item['url'])) if incremental else None
+                record = PokeService._fetch_detail(session, item, validators)
+                if record is None and not last_round:
+                    retry.append(item)
+                    return DEFERRED
+                return record
+
+            before = report.failed
+            PokeService._persist_all(
+                mapper(fetch, pending), report, known, skip_unchanged=incremental, **persist_kwargs,
+            )
+            report.recovered += len(pending) - len(retry) - (report.failed - before)
+            pending = retry
+
+    @staticmethod
+    def iter_pages(url: str, limit: int, session=None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Generador que recorre el listado paginado de PokeAPI.
+
+        Pide la siguiente página solo cuando el consumidor terminó con la
+        anterior, siguiendo el enlace 'next' de cada respuesta.
+
+        Args:
+            url: URL de la primera página a consumir.
+            limit: Máximo de items a entregar en total (recorta la última página).
+            session: Objeto con método `get` (sesión o CachingSession). Por
+                defecto se usa el módulo `requests`.
+
+        Yields:
+            Tupla (items de la página, enlace 'next' o None si es la última).
+        """
+        getter = (session or requests).get
+        remaining = limit
+        while url and remaining > 0:
+            response = getter(url, timeout=10)
+            response.raise_for_status()
+            payload = response.json()
+
+            results = payload.get('results', [])[:remaining]
+            remaining -= len(results)
+            url = payload.get('next')
+
+            yield results, url
+
+            if not results:
+                break
+
+    @staticmethod
+    def _id_from_url(url: str) -> Optional[int]:
+        """Extrae el pokedex_id del final de una URL de detalle ('.../pokemon/25/')."""
+        try:
+            return int(url.rstrip('/').rsplit('/', 1)[-1])
+        except (AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def _known_validators(results: List[Dict[str, Any]]) -> Dict[int, Dict[str, str]]:
+        """
+        Carga en una sola consulta los validadores HTTP y el content_hash de
+        las especies de una página que ya existen en la base de datos.
+        """
+        ids = [i for i in (PokeService._id_from_url(item.get('url')) for item in results) if i is not None]
+        rows = Pokemon.objects.filter(pokedex_id__in=ids).values(
+            'pokedex_id', 'etag', 'last_modified', 'content_hash'
+        )
+        return {row.pop('pokedex_id'): row for row in rows}
+
+    @staticmethod
+    def content_hash(record: Dict[str, Any]) -> str:
+        """Huella SHA-256 de las columnas de negocio de un registro normalizado."""
+        payload = json.dumps([record[field] for field in CONTENT_FIELDS], separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _fetch_detail(session, item: Dict[str, Any],
+                      validators: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Descarga y normaliza el detalle de un Pokémon.
+
+        Se ejecuta dentro de los workers del pool, por lo que no toca la base
+        de datos. Los errores de red se aíslan por item: se registran y se
+        devuelve None para que el resto de la carga continúe.
+
+        Args:
+            validators: 'etag' / 'last_modified' previos. Si se entregan, la
+                petición es condicional y un 304 devuelve NOT_MODIFIED.
+
+        Returns:
+            Diccionario con las columnas del modelo, NOT_MODIFIED o None.
+        """
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        try:
+            detail_resp = session.get(item['url'], timeout=5, headers=headers)
+            if headers and detail_resp.status_code == 304:
+                return NOT_MODIFIED
+            detail_resp.raise_for_status()
+            detail = detail_resp.json()
+
+            # Procesar tipos
+            types_list = [t['type']['name'] for t in detail['types']]
+
+            record = {
+                'pokedex_id': detail['id'],
+                'name': detail['name'],
+                'types': ", ".join(types_list),
+                'height': detail['height'],
+                'weight': detail['weight'],
+                'etag': detail_resp.headers.get('ETag', ''),
+                'last_modified': detail_resp.headers.get('Last-Modified', ''),
+            }
+            record['content_hash'] = PokeService.content_hash(record)
+            return record
         except requests.RequestException as e:
-            logger.error(f"Error fatal conectando con PokeAPI: {e}")
+            logger.error(f"Error obteniendo detalles de {item['name']}: {e}")
+            return None # Saltamos al siguiente si uno falla
+
+    @staticmethod
+    def _persist_all(records, report: Optional[SyncReport] = None,
+                     known: Optional[Dict[int, Dict[str, str]]] = None,
+                     skip_unchanged: bool = False,
+                     batch_size: Optional[int] = None,
+                     on_persist: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                     dry_run: bool = False) -> Optional[int]:
+        """
+        Clasifica los registros a medida que llegan del pool y persiste por
+        lotes de tamaño fijo (POKEAPI_BATCH_SIZE) los que deben escribirse.
+
+        Args:
+            records: Iterable de resultados de _fetch_detail.
+            report: SyncReport a actualizar con los conteos.
+            known: Validadores de las filas existentes (ver _known_validators),
+                usado para distinguir inserciones de actualizaciones.
+            skip_unchanged: Si es True no se reescriben filas con el mismo content_hash.
+            on_persist: Callback invocado con cada lote ya confirmado.
+            dry_run: Si es True solo se cuentan los registros, sin escribirlos.
+
+        Returns:
+            El mayor pokedex_id persistido, o None si no se escribió nada.
+        """
+        report = report if report is not None else SyncReport()
+        known = known or {}
+        size = max(1, batch_size or settings.POKEAPI_BATCH_SIZE)
+        batch = []
+        last_id = None
+
+        def flush() -> None:
+            if dry_run:
+                batch.clear()
+                return
+            PokeService.persist_batch(batch)
+            if on_persist:
+                on_persist(list(batch))
+            batch.clear()
+
+        for record in records:
+            if record is DEFERRED:
+                continue
+            if record is None:
+                report.failed += 1
+                continue
+            if record is NOT_MODIFIED:
+                report.unchanged += 1
+                continue
+
+            previous = known.get(record['pokedex_id'])
+            if previous is None:
+                report.inserted += 1
+            elif skip_unchanged and previous['content_hash'] == record['content_hash']:
+                report.unchanged += 1
+                continue
+            else:
+                report.updated += 1
+
+            batch.append(record)
+            last_id = max(last_id or 0, record['pokedex_id'])
+            if len(batch) >= size:
+                flush()
+        if batch:
+            flush()
+        return last_id
+
+    @staticmethod
+    def persist_batch(records: List[Dict[str, Any]]) -> None:
+        """
+        Inserta o actualiza (upsert) un lote de registros en una transacción.
+
+        Usa `bulk_create(update_conflicts=True)` sobre `pokedex_id`, por lo que
+        el costo es un número constante de sentencias por lote (en vez de un
+        SELECT + INSERT por fila) y una re-sincronización refresca nombre,
+        tipos, altura, peso y validadores de las filas ya existentes. En la
+        misma transacción se reconstruyen los slots de PokemonType del lote.
+
+        Args:
+            records: Diccionarios con las claves del modelo Pokemon.
+        """
+        objs = [Pokemon(**record) for record in records]
+        for obj in objs:
+            obj.refresh_derived()
+        with transaction.atomic():
+            Pokemon.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['pokedex_id'],
+                update_fields=UPSERT_FIELDS,
+            )
+
+            # Relación normalizada de tipos (bulk_create no dispara señales)
+            pks = dict(
+                Pokemon.objects.filter(pokedex_id__in=[r['pokedex_id'] for r in records])
+                .values_list('pokedex_id', 'pk')
+            )
+            PokemonType.replace_for({pks[r['pokedex_id']]: r['types'] for r in records})
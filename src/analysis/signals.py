@@ -0,0 +1,48 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import database, result_cache
+from .models import Pokemon, PokemonType
+
+
+@receiver(post_save, sender=Pokemon)
+def sync_type_slots(sender, instance: Pokemon, **kwargs) -> None:
+    """
+    Mantiene la relación Pokemon <-> Type alineada con el CSV `types` cuando
+    una fila se guarda individualmente (admin, shell, tests).
+
+    La carga masiva (PokeService.persist_batch) no dispara señales y
+    reconstruye los slots por lote.
+    """
+    if kwargs.get('raw'):
+        return
+    PokemonType.replace_for({instance.pk: instance.types})
+
+
+@receiver(post_save, sender=Pokemon)
+@receiver(post_delete, sender=Pokemon)
+def invalidate_results(sender, **kwargs) -> None:
+    """Cualquier alta, edición o baja individual invalida la caché del dashboard."""
+    result_cache.invalidate()
+
+
+def ensure_search_index(sender, using='default', **kwargs) -> None:
+    """Receptor de post_migrate: garantiza la tabla FTS5 y sus triggers."""
+    from django.db import connections
+    from .search import install_fts
+
+    install_fts(connections[using])
+
+
+def ensure_version_triggers(sender, using='default', **kwargs) -> None:
+    """Receptor de post_migrate: garantiza los triggers de DatasetVersion."""
+    from django.db import connections
+
+    result_cache.install_version_triggers(connections[using])
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs) -> None:
+    """WAL y pragmas de rendimiento en cada conexión nueva (ver database.py)."""
+    database.apply_pragmas(connection)
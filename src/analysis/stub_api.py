@@ -0,0 +1,175 @@
+"""
+Servidor HTTP local que imita los endpoints 'list' y 'detail' de PokeAPI.
+
+Permite probar la ingesta contra un socket real (sin mocks) e inyectar
+latencia o fallos por Pokémon para medir el comportamiento del servicio.
+Los fallos pueden ser permanentes (`failing_ids`, `failing_offsets`),
+transitorios (`flaky`: los primeros N pedidos de un Pokémon responden 503,
+opcionalmente con `Retry-After`) o una caída total (`down`).
+Lo usan los tests y la suite 'sync' de `manage.py benchmark`.
+Los detalles llevan ETag / Last-Modified y responden 304 a peticiones
+condicionales cuyo If-None-Match coincide.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BASE_PATH = '/api/v2/pokemon'
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+
+def make_detail(pokedex_id):
+    """Payload sintético con la misma forma que el detalle real de PokeAPI."""
+    types = [{'slot': 1, 'type': {'name': 'normal'}}]
+    if pokedex_id % 2 == 0:
+        types.append({'slot': 2, 'type': {'name': 'flying'}})
+    return {
+        'id': pokedex_id,
+        'name': f"pokemon-{pokedex_id}",
+        'types': types,
+        'height': pokedex_id,
+        'weight': pokedex_id * 10,
+    }
+
+
+class StubPokeAPI:
+    """
+    Servidor de prueba con ciclo de vida de context manager.
+
+    Uso:
+        with StubPokeAPI(count=20, latency=0.05) as api:
+            with override_settings(POKEAPI_URL=api.url):
+                PokeService.sync_data()
+    """
+
+    def __init__(self, count=20, latency=0.0, failing_ids=(), failing_offsets=(), validators=True,
+                 flaky=None, retry_after=None):
+        self.pokemon = {i: make_detail(i) for i in range(1, count + 1)}
+        self.latency = latency
+        self.failing_ids = set(failing_ids)
+        self.failing_offsets = set(failing_offsets)
+        self.validators = validators
+        self.flaky = dict(flaky or {})
+        self.retry_after = retry_after
+        self.down = False
+        self.hits = []
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{BASE_PATH}"
+
+    def detail_hits(self):
+        return [path for path in self.hits if path.rstrip('/') != BASE_PATH]
+
+    def list_hits(self):
+        return [path for path in self.hits if path.rstrip('/') == BASE_PATH]
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    # --- Respuestas ---
+
+    def _list_payload(self, query):
+        limit = int(query.get('limit', ['20'])[0])
+        offset = int(query.get('offset', ['0'])[0])
+        ids = sorted(self.pokemon)
+        page = ids[offset:offset + limit]
+        next_url = None
+        if offset + limit < len(ids):
+            next_url = f"{self.url}?offset={offset + limit}&limit={limit}"
+        return {
+            'count': len(ids),
+            'next': next_url,
+            'previous': None,
+            'results': [
+                {'name': self.pokemon[i]['name'], 'url': f"{self.url}/{i}/"}
+                for i in page
+            ],
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                with stub._lock:
+                    stub.hits.append(parts.path)
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if stub.down:
+                    return self._unavailable()
+
+                path = parts.path.rstrip('/')
+                if path == BASE_PATH:
+                    query = parse_qs(parts.query)
+                    if int(query.get('offset', ['0'])[0]) in stub.failing_offsets:
+                        return self._send(503, {'detail': 'Injected failure.'})
+                    return self._send(200, stub._list_payload(query))
+
+                try:
+                    pokedex_id = int(path.rsplit('/', 1)[-1])
+                except ValueError:
+                    return self._send(404, {'detail': 'Not found.'})
+
+                if pokedex_id in stub.failing_ids:
+                    return self._send(500, {'detail': 'Injected failure.'})
+                with stub._lock:
+                    pending = stub.flaky.get(pokedex_id, 0)
+                    if pending:
+                        stub.flaky[pokedex_id] = pending - 1
+                if pending:
+                    return self._unavailable()
+                if pokedex_id not in stub.pokemon:
+                    return self._send(404, {'detail': 'Not found.'})
+
+                payload = stub.pokemon[pokedex_id]
+                if not stub.validators:
+                    return self._send(200, payload)
+
+                etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    return self._send(304, None, {'ETag': etag})
+                return self._send(200, payload, {'ETag': etag, 'Last-Modified': LAST_MODIFIED})
+
+            def _unavailable(self):
+                headers = {'Retry-After': str(stub.retry_after)} if stub.retry_after is not None else None
+                return self._send(503, {'detail': 'Injected transient failure.'}, headers)
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,175 @@
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from .. import analytics, result_cache
+from ..benchmarks import analytics_suite, seed
+from ..jobs import runner
+from ..models import Pokemon
+from ..query import PokemonQuery
+
+
+class AggregateHelpersTest(SimpleTestCase):
+    def test_percentile_interpolates(self):
+        values = [10.0, 20.0, 30.0, 40.0]
+        self.assertEqual(analytics.percentile(values, 0), 10.0)
+        self.assertEqual(analytics.percentile(values, 50), 25.0)
+        self.assertEqual(analytics.percentile(values, 100), 40.0)
+        self.assertIsNone(analytics.percentile([], 50))
+
+    def test_histogram_includes_maximum_in_last_bin(self):
+        result = analytics.histogram([0.0, 1.0, 2.0, 3.0, 4.0], bins=2)
+        self.assertEqual(result['edges'], [0.0, 2.0, 4.0])
+        self.assertEqual(result['counts'], [2, 3])
+
+        self.assertEqual(analytics.histogram([5.0, 5.0], bins=3)['counts'], [2, 0, 0])
+
+    def test_gatherer_always_returns_a_tuple(self):
+        values = [10, 20, 30]
+        self.assertEqual(analytics.gatherer([])(values), ())
+        self.assertEqual(analytics.gatherer([1])(values), (20,))
+        self.assertEqual(analytics.gatherer([2, 0])(values), (30, 10))
+
+
+class ColumnStoreTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+        Pokemon.objects.create(pokedex_id=6, name="charizard", types="fire, flying", height=17, weight=905)
+        Pokemon.objects.create(pokedex_id=143, name="snorlax", types="normal", height=21, weight=4600)
+
+    def test_select_matches_orm_filters(self):
+        """Mismos filtros, mismas filas que PokemonQuery sobre la DB."""
+        store = analytics.get_store()
+        for params in (
+            '', 'type=fire', 'min_weight=8.5&range_mode=inclusive', 'max_height=100&name=CHAR', 'type=ice',
+            # Bordes exactos: estricto excluye el valor, inclusivo lo incluye
+            'min_weight=8.5', 'max_weight=90.5', 'max_weight=90.5&range_mode=inclusive',
+            'type=fire&min_height=0.6&max_weight=90.5&range_mode=inclusive', 'min_weight=100&max_weight=1',
+        ):
+            query = PokemonQuery.from_params(QueryDict(params))
+            indices = store.select(
+                name=query.name, type_name=query.type_filter, weight_range=query.weight_range,
+                height_range=query.height_range, inclusive=query.inclusive,
+            )
+            expected = sorted(query.filtered().values_list('pokedex_id', flat=True))
+            self.assertEqual(sorted(store.pokedex_id[i] for i in indices), expected, params)
+
+    def test_summary_aggregates(self):
+        store = analytics.get_store()
+        summary = store.summary(store.select(type_name='fire'))
+
+        self.assertEqual(summary['count'], 2)
+        self.assertEqual(summary['types'], {'fire': 2, 'flying': 1})
+        self.assertEqual((summary['weight_hg']['min'], summary['weight_hg']['max']), (85.0, 905.0))
+        # charmander: 8.5 kg / 0.6² = 23.61 ; charizard: 90.5 kg / 1.7² = 31.31
+        self.assertEqual(summary['bmi_by_type']['fire'], {'mean_bmi': 27.46, 'count': 2})
+
+    def test_precomputed_aggregates_match_a_row_by_row_scan(self):
+        """Con y sin filtros, los tramos precalculados dan lo mismo que recorrer las filas."""
+        Pokemon.objects.all().delete()
+        seed(200)
+        Pokemon.objects.create(pokedex_id=500, name="sin-altura", types="ground", height=0, weight=8)
+        store = analytics.get_store()
+        for indices in (
+            store.select(), store.select(type_name='fire'), store.select(weight_range=(500, None)),
+            store.select(type_name='fire', weight_range=(500, None), height_range=(None, 150)),
+            # Pocas filas (incluida la de altura 0): se leen una a una
+            range(len(store) - 5, len(store)), [],
+        ):
+            with self.subTest(rows=len(indices)):
+                summary = store.summary(indices, bins=7, percentiles=(10, 50))
+                self.assertEqual(summary, self._scan(store, indices, bins=7, percentiles=(10, 50)))
+
+    @staticmethod
+    def _scan(store, indices, bins, percentiles):
+        types, bmi = {}, {}
+        for i in indices:
+            height_m = store.height[i] / 10
+            for code in (store.primary[i], store.secondary[i]):
+                if code == analytics.NO_TYPE:
+                    continue
+                name = store.type_names[code]
+                types[name] = types.get(name, 0) + 1
+                if height_m > 0:
+                    total, count = bmi.get(name, (0.0, 0))
+                    bmi[name] = (total + (store.weight[i] / 10) / (height_m * height_m), count + 1)
+
+        def column(data):
+            values = sorted(data[i] for i in indices)
+            if not values:
+                return {'count': 0}
+            return {
+                'count': len(values), 'min': values[0], 'max': values[-1],
+                'mean': round(sum(values) / len(values), 4),
+                'percentiles': {str(p): round(analytics.percentile(values, p), 4) for p in percentiles},
+                'histogram': analytics.histogram(values, bins),
+            }
+
+        return {
+            'count': len(indices),
+            'types': dict(sorted(types.items(), key=lambda item: (-item[1], item[0]))),
+            'weight_hg': column(store.weight),
+            'height_dm': column(store.height),
+            'bmi_by_type': {
+                name: {'mean_bmi': round(total / count, 2), 'count': count}
+                for name, (total, count) in sorted(bmi.items())
+            },
+        }
+
+    def test_store_reloads_after_writes(self):
+        first = analytics.get_store()
+        self.assertIs(analytics.get_store(), first)
+
+        Pokemon.objects.create(pokedex_id=7, name="squirtle", types="water", height=5, weight=90)
+
+        second = analytics.get_store()
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second), 5)
+
+    def test_stats_endpoint(self):
+        data = self.client.get('/stats/', {'min_weight': 50, 'bins': 2, 'percentiles': '50'}).json()
+
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['weight_hg']['percentiles'], {'50.0': 2752.5})
+        self.assertEqual(data['weight_hg']['histogram']['counts'], [1, 1])
+
+    def test_benchmark_suite_runs(self):
+        Pokemon.objects.all().delete()
+        seed(300)
+        results = analytics_suite(repeat=3, min_weight_hg=100)
+        self.assertEqual(results['orm']['rows'], results['columnar']['rows'])
+        # El rango se resuelve con bisect sobre la columna ordenada, sin recorrer filas
+        self.assertEqual(len(analytics.get_store().select(weight_range=(100, None))), results['orm']['rows'])
+        self.assertLess(results['select']['median_ms'], results['orm']['median_ms'] / 10)
+
+
+@override_settings(POKEDEX_ANALYTICS_BACKGROUND_REFRESH=True)
+class BackgroundRefreshTest(TransactionTestCase):
+    """La recarga corre en otro hilo: necesita filas confirmadas."""
+
+    def setUp(self):
+        runner.clear()
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+        self.first = analytics.refresh()
+
+    def test_stale_store_is_served_while_reloading(self):
+        Pokemon.objects.create(pokedex_id=7, name="squirtle", types="water", height=5, weight=90)
+
+        self.assertIs(analytics.get_store(), self.first)
+        self.assertTrue(runner.get(analytics.REFRESH_JOB).wait(timeout=5))
+
+        store = analytics.get_store()
+        self.assertIsNot(store, self.first)
+        self.assertEqual(len(store), 2)
+
+    def test_stats_etag_follows_the_store_that_answers(self):
+        etag = self.client.get('/stats/')['ETag']
+        Pokemon.objects.create(pokedex_id=7, name="squirtle", types="water", height=5, weight=90)
+
+        # Mientras se recarga responde el almacén anterior, con su mismo ETag
+        self.assertEqual(self.client.get('/stats/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertTrue(runner.get(analytics.REFRESH_JOB).wait(timeout=5))
+
+        response = self.client.get('/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
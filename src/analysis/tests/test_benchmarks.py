@@ -0,0 +1,92 @@
+import json
+import tempfile
+
+from django.db import connection
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from .. import benchmarks, result_cache
+from ..models import Pokemon
+
+
+class MeasureTest(SimpleTestCase):
+    def test_measure_reports_percentiles_and_runs_setup(self):
+        calls = []
+        stats = benchmarks.measure(lambda: calls.append('run'), 4, setup=lambda: calls.append('setup'))
+
+        self.assertEqual(calls, ['setup', 'run'] * 4)
+        self.assertEqual(set(stats), {'median_ms', 'p99_ms', 'min_ms'})
+        self.assertLessEqual(stats['min_ms'], stats['median_ms'])
+        self.assertLessEqual(stats['median_ms'], stats['p99_ms'])
+
+
+class CompareTest(SimpleTestCase):
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = {'results': {'a': {'median_ms': 10.0}, 'b': {'median_ms': 10.0}, 'gone': {'median_ms': 1.0}}}
+        current = {'results': {'a': {'median_ms': 11.0}, 'b': {'median_ms': 13.0}, 'new': {'median_ms': 1.0}}}
+
+        comparison = benchmarks.compare(current, baseline, tolerance=0.2)
+
+        self.assertEqual(set(comparison), {'a', 'b'})
+        self.assertFalse(comparison['a']['regressed'])
+        self.assertTrue(comparison['b']['regressed'])
+        self.assertEqual(comparison['b']['ratio'], 1.3)
+
+
+class IsolatedCachesTest(TestCase):
+    def test_benchmark_does_not_touch_the_shared_results_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            shared = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'results': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': cache_dir,
+                    'OPTIONS': {'MAX_ENTRIES': 50},
+                },
+            }
+            with override_settings(CACHES=shared):
+                result_cache.store('pagina-servida', {'rows': 1})
+
+                isolated = benchmarks.isolated_caches()
+                self.assertEqual(isolated['results']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+                self.assertEqual(isolated['results']['OPTIONS'], {'MAX_ENTRIES': 50})
+                with override_settings(CACHES=isolated):
+                    result_cache.clear()
+                    self.assertFalse(result_cache.is_shared())
+
+                # Al salir vuelve el alias compartido, con su entrada intacta
+                self.assertTrue(result_cache.is_shared())
+                self.assertEqual(result_cache.lookup('pagina-servida'), {'rows': 1})
+
+
+class SuitesTest(TestCase):
+    def test_dashboard_suite_covers_every_scenario(self):
+        benchmarks.seed(300)
+        results = benchmarks.dashboard_suite(repeat=1)
+
+        self.assertEqual(set(results), {*benchmarks.dashboard_scenarios(300), 'cached', 'fragment', 'fragment_cached'})
+        self.assertEqual(results['default']['rows'], 300)
+        self.assertEqual(results['type']['rows'], Pokemon.objects.filter(slots__type__name='dragon').count())
+
+    def test_sync_suite_runs_against_local_stub(self):
+        results = benchmarks.sync_suite(repeat=1, count=12, latency_ms=0)
+
+        self.assertEqual(set(results), {'full', 'incremental'})
+        self.assertEqual(results['full']['rows'], 12)
+        self.assertEqual(Pokemon.objects.count(), 12)
+
+    def test_report_is_json_serializable(self):
+        report = benchmarks.report('types', 10, 1, {'relation': {'median_ms': 1.0, 'p99_ms': 1.0, 'min_ms': 1.0, 'rows': 1}})
+        self.assertEqual(json.loads(json.dumps(report))['results']['relation']['rows'], 1)
+        self.assertEqual(report['database'], connection.vendor)
+
+
+class LoadTestTest(LiveServerTestCase):
+    def test_load_test_reports_every_path(self):
+        Pokemon.objects.create(pokedex_id=25, name="pikachu", types="electric", height=4, weight=60)
+        paths = ('/autocomplete/?q=pi', '/no-existe/')
+
+        results = benchmarks.load_test(self.live_server_url, paths, total=6, concurrency=2)
+
+        self.assertEqual(set(results), {*paths, 'all'})
+        self.assertEqual(results['all']['rows'], 6)
+        self.assertEqual(results['/autocomplete/?q=pi']['errors'], 0)
+        self.assertEqual(results['/no-existe/']['errors'], 3)
@@ -0,0 +1,257 @@
+import time
+from email.utils import formatdate
+
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+from unittest.mock import Mock, patch
+from .. import metrics
+from ..client import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, RetryingSession,
+    backoff_delay, mount_pool, parse_retry_after,
+)
+from ..models import Pokemon, SyncCheckpoint
+from ..services import PokeService
+from ..stub_api import BASE_PATH, StubPokeAPI
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    """Devuelve (o lanza) los resultados en orden y registra cada llamada."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def response(status, headers=None):
+    return Mock(status_code=status, headers=headers or {})
+
+
+class BackoffTest(SimpleTestCase):
+    def test_full_jitter_stays_below_exponential_cap(self):
+        for attempt in range(6):
+            for _ in range(50):
+                self.assertLessEqual(backoff_delay(attempt, base=0.5, cap=4), min(4, 0.5 * 2 ** attempt))
+
+    def test_retry_after_wins_over_backoff_but_is_capped(self):
+        self.assertEqual(backoff_delay(0, base=10, cap=30, retry_after=2), 2)
+        self.assertEqual(backoff_delay(0, base=10, cap=30, retry_after=120), 30)
+
+    def test_parse_retry_after_accepts_seconds_and_http_dates(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 60, usegmt=True)), 60, delta=2)
+        self.assertIsNone(parse_retry_after('mañana'))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(threshold=3, cooldown=10, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_in(), 10)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+    def test_half_open_admits_a_single_probe(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        self.breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.before_request()
+
+    def test_failed_probe_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.before_request()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_in(), 10)
+
+    def test_zero_threshold_disables_breaker(self):
+        breaker = CircuitBreaker(threshold=0, cooldown=10)
+        for _ in range(100):
+            breaker.record_failure()
+        breaker.before_request()
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class RetryingSessionTest(SimpleTestCase):
+    def setUp(self):
+        self.sleeps = []
+
+    def _session(self, inner, retries=3, breaker=None):
+        return RetryingSession(inner, retries, backoff=1, max_delay=30, breaker=breaker, sleep=self.sleeps.append)
+
+    def test_retries_transient_errors_until_success(self):
+        inner = FakeSession(response(503), requests.ConnectionError("reset"), response(200))
+
+        self.assertEqual(self._session(inner).get('http://pokeapi.test/1/').status_code, 200)
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual(len(self.sleeps), 2)
+
+    def test_honors_retry_after(self):
+        inner = FakeSession(response(429, {'Retry-After': '7'}), response(200))
+
+        self._session(inner).get('http://pokeapi.test/1/')
+        self.assertEqual(self.sleeps, [7.0])
+
+    def test_gives_up_with_last_response_or_exception(self):
+        inner = FakeSession(*[response(500)] * 3)
+        self.assertEqual(self._session(inner, retries=2).get('http://pokeapi.test/1/').status_code, 500)
+        self.assertEqual(inner.calls, 3)
+
+        inner = FakeSession(requests.Timeout("lento"), requests.Timeout("lento"))
+        with self.assertRaises(requests.Timeout):
+            self._session(inner, retries=1).get('http://pokeapi.test/1/')
+
+    def test_client_errors_are_not_retried(self):
+        inner = FakeSession(response(404))
+        self.assertEqual(self._session(inner).get('http://pokeapi.test/1/').status_code, 404)
+        self.assertEqual(inner.calls, 1)
+
+    def test_open_breaker_stops_retrying(self):
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        inner = FakeSession(*[response(503)] * 5)
+
+        with self.assertRaises(CircuitOpenError):
+            self._session(inner, retries=4, breaker=breaker).get('http://pokeapi.test/1/')
+        self.assertEqual(inner.calls, 2)
+
+    def test_any_request_error_counts_for_the_breaker(self):
+        """Una petición de prueba que falla con un error no reintentable reabre el breaker."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        inner = FakeSession(requests.TooManyRedirects("bucle"))
+
+        with self.assertRaises(requests.TooManyRedirects):
+            self._session(inner, breaker=breaker).get('http://pokeapi.test/1/')
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_mount_pool_sizes_adapters(self):
+        with requests.Session() as session:
+            mount_pool(session, 16)
+            self.assertEqual(session.get_adapter('https://pokeapi.co/')._pool_maxsize, 16)
+            self.assertIs(session.get_adapter('http://127.0.0.1/'), session.get_adapter('https://pokeapi.co/'))
+
+
+@override_settings(POKEAPI_RATE_LIMIT=0, POKEAPI_BACKOFF_BASE=0.01, POKEDEX_TARGET_SIZE=10)
+class ResilientSyncTest(TestCase):
+    """Ingesta contra el stub con fallos inyectados."""
+
+    @override_settings(POKEAPI_BACKOFF_BASE=10, POKEDEX_METRICS_ENABLED=True)
+    def test_transient_failures_are_retried_honoring_retry_after(self):
+        metrics.reset()
+        with StubPokeAPI(count=10, flaky={2: 2, 5: 1}, retry_after=0) as api:
+            with override_settings(POKEAPI_URL=api.url):
+                start = time.perf_counter()
+                report = PokeService.sync_data()
+                elapsed = time.perf_counter() - start
+
+            self.assertEqual(len(api.detail_hits()), 13)
+
+        # Con backoff base de 10s, terminar rápido implica que se respetó Retry-After: 0
+        self.assertLess(elapsed, 5)
+        self.assertEqual(Pokemon.objects.count(), 10)
+        self.assertEqual((report.inserted, report.failed, report.recovered), (10, 0, 0))
+        self.assertEqual(metrics.FETCH_RETRIES.value(endpoint='detail', reason='http_503'), 3)
+
+    @override_settings(POKEAPI_RETRIES=1, POKEAPI_BREAKER_THRESHOLD=0, POKEAPI_DEFERRED_ROUNDS=2)
+    def test_deferred_rounds_converge_to_completeness(self):
+        """Un item que agota sus reintentos se recupera en una pasada diferida."""
+        with StubPokeAPI(count=10, flaky={4: 5}) as api:
+            with override_settings(POKEAPI_URL=api.url), self.assertLogs('analysis.services', level='ERROR'):
+                report = PokeService.sync_data()
+
+            self.assertEqual(api.detail_hits().count(f"{BASE_PATH}/4/"), 6)
+
+        self.assertTrue(Pokemon.objects.filter(pokedex_id=4).exists())
+        self.assertEqual((report.inserted, report.failed, report.recovered), (10, 0, 1))
+
+    @override_settings(POKEAPI_RETRIES=1, POKEAPI_BREAKER_THRESHOLD=0, POKEAPI_DEFERRED_ROUNDS=1)
+    def test_items_failing_every_round_are_reported(self):
+        with StubPokeAPI(count=10, failing_ids={7}) as api:
+            with override_settings(POKEAPI_URL=api.url), self.assertLogs('analysis.services', level='ERROR'):
+                report = PokeService.sync_data()
+
+        self.assertEqual((report.inserted, report.failed, report.recovered), (9, 1, 0))
+        self.assertEqual(report.processed, 10)
+
+    @override_settings(POKEAPI_RETRIES=2, POKEAPI_BREAKER_THRESHOLD=3, POKEAPI_BREAKER_COOLDOWN=0.2,
+                       POKEAPI_DEFERRED_ROUNDS=1, POKEDEX_TARGET_SIZE=30)
+    def test_breaker_fails_fast_when_the_api_is_down(self):
+        """Tras 3 errores seguidos el resto de los detalles no sale a la red."""
+        with StubPokeAPI(count=30, failing_ids=range(1, 31)) as api:
+            with override_settings(POKEAPI_URL=api.url), self.assertLogs('analysis.services', level='ERROR'):
+                start = time.perf_counter()
+                report = PokeService.sync_data(concurrency=1)
+                elapsed = time.perf_counter() - start
+
+            # 3 intentos hasta abrir + 1 petición de prueba en la pasada diferida
+            self.assertEqual(len(api.detail_hits()), 4)
+
+        self.assertLess(elapsed, 3)
+        self.assertEqual(report.failed, 30)
+        self.assertEqual(Pokemon.objects.count(), 0)
+
+    @override_settings(POKEAPI_RETRIES=0, POKEAPI_BREAKER_THRESHOLD=2, POKEAPI_BREAKER_COOLDOWN=0.2,
+                       POKEAPI_DEFERRED_ROUNDS=1)
+    def test_deferred_rounds_run_when_the_listing_is_cut(self):
+        """Si el breaker corta el listado, lo ya listado se completa en la pasada diferida."""
+        with StubPokeAPI(count=10, flaky={4: 1, 5: 1}) as api:
+            with override_settings(POKEAPI_URL=api.url), self.assertLogs('analysis.services', level='ERROR') as logs:
+                report = PokeService.sync_data(concurrency=1, page_size=5)
+
+            self.assertEqual(len(api.list_hits()), 1)
+
+        self.assertIn("Circuit breaker abierto", "\n".join(logs.output))
+        self.assertEqual(sorted(Pokemon.objects.values_list('pokedex_id', flat=True)), [1, 2, 3, 4, 5])
+        self.assertEqual((report.inserted, report.failed, report.recovered), (5, 0, 2))
+        checkpoint = SyncCheckpoint.load()
+        self.assertEqual(checkpoint.offset, 5)
+        self.assertFalse(checkpoint.completed)
+
+    @override_settings(POKEAPI_CONCURRENCY=12)
+    def test_session_pool_matches_concurrency(self):
+        with patch('analysis.services.mount_pool', wraps=mount_pool) as mount:
+            with StubPokeAPI(count=4) as api, override_settings(POKEAPI_URL=api.url):
+                PokeService.sync_data()
+
+        self.assertEqual(mount.call_args.args[1], 12)
+        self.assertEqual(Pokemon.objects.count(), 4)
@@ -0,0 +1,110 @@
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from .. import result_cache
+from ..conditional import GZipMiddleware
+from ..models import Pokemon
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=6, name="charizard", types="fire, flying", height=17, weight=905)
+
+    def test_repeated_request_is_304_without_queries(self):
+        for name in ('home', 'table', 'pokemon_api', 'stats'):
+            with self.subTest(name):
+                first = self.client.get(reverse(name), {'type': 'fire'})
+                self.assertEqual(first.status_code, 200)
+                etag = first['ETag']
+
+                with self.assertNumQueries(0):
+                    second = self.client.get(reverse(name), {'type': 'fire'}, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(second.status_code, 304)
+                self.assertEqual(second.content, b'')
+                self.assertEqual(second['ETag'], etag)
+
+    def test_304_does_not_depend_on_the_result_cache(self):
+        """El ETag se decide antes de la vista: con la caché de resultados vacía tampoco hay SQL."""
+        etag = self.client.get(reverse('home'), {'type': 'fire'})['ETag']
+        result_cache.clear()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'), {'type': 'fire'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_follows_params_and_dataset_version(self):
+        url = reverse('home')
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, {'ignored': '1'})['ETag'], etag)
+        self.assertNotEqual(self.client.get(url, {'sort': 'weight'})['ETag'], etag)
+        self.assertNotEqual(self.client.get(reverse('table'))['ETag'], etag)
+
+        Pokemon.objects.filter(pokedex_id=1).update(weight=70)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(POKEDEX_DATASET_VERSION_TTL=0)
+    def test_writes_outside_this_process_change_the_etag(self):
+        """Una escritura que no pasa por las señales de este proceso también invalida el 304."""
+        for name in ('home', 'table', 'pokemon_api', 'stats'):
+            with self.subTest(name):
+                etag = self.client.get(reverse(name))['ETag']
+
+                # SQL directo, como lo haría otro proceso o un cliente de la DB
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE analysis_pokemon SET weight = weight + 1 WHERE pokedex_id = %s", [6],
+                    )
+
+                response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_cache_control_and_vary(self):
+        response = self.client.get(reverse('home'))
+        self.assertEqual(
+            set(response['Cache-Control'].split(', ')), {'public', 'max-age=0', 'must-revalidate'},
+        )
+
+        with override_settings(POKEDEX_HTTP_MAX_AGE=60):
+            self.assertIn('max-age=60', self.client.get(reverse('home'))['Cache-Control'])
+
+        json_etag = self.client.get(reverse('pokemon_api'))['ETag']
+        response = self.client.get(reverse('pokemon_api'), HTTP_ACCEPT='application/x-ndjson')
+        self.assertIn('Accept', response['Vary'])
+        self.assertNotEqual(response['ETag'], json_etag)
+
+    def test_invalid_api_request_is_not_cached(self):
+        response = self.client.get(reverse('pokemon_api'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Cache-Control', response)
+
+    def test_gzip_keeps_conditional_get_working(self):
+        response = self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/'))
+
+        again = self.client.get(reverse('home'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+
+class GZipMiddlewareTest(TestCase):
+    def test_event_streams_are_not_compressed(self):
+        request = RequestFactory().get('/sync-events/', HTTP_ACCEPT_ENCODING='gzip')
+        middleware = GZipMiddleware(lambda r: None)
+
+        sse = middleware.process_response(
+            request, StreamingHttpResponse(iter([b'data: 1\n\n']), content_type='text/event-stream'),
+        )
+        ndjson = middleware.process_response(
+            request, StreamingHttpResponse(iter([b'{}\n']), content_type='application/x-ndjson'),
+        )
+
+        self.assertFalse(sse.has_header('Content-Encoding'))
+        self.assertEqual(ndjson['Content-Encoding'], 'gzip')
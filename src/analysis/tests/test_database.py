@@ -0,0 +1,98 @@
+import statistics
+import threading
+import time
+from unittest import skipUnless
+
+from django.db import OperationalError, connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from .. import database, result_cache
+from ..models import Pokemon
+from ..services import PokeService
+from ..stub_api import StubPokeAPI
+
+
+@skipUnless(connection.vendor == 'sqlite', "Pragmas de SQLite")
+class PragmasTest(TestCase):
+    def test_connection_uses_wal_and_tuned_pragmas(self):
+        pragmas = database.current_pragmas(connection)
+
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['synchronous'], 1)  # NORMAL
+        self.assertEqual(pragmas['cache_size'], -20000)
+        self.assertEqual(pragmas['temp_store'], 2)  # MEMORY
+        self.assertGreater(pragmas['busy_timeout'], 0)
+
+    def test_trigram_indexes_are_postgres_only(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            indexes = {row[0] for row in cursor.fetchall()}
+        self.assertFalse(set(database.TRIGRAM_INDEXES) & indexes)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Índices GIN de pg_trgm")
+class PostgresIndexesTest(TestCase):
+    def test_trigram_index_installed_by_migrations(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'analysis_pokemon'")
+            indexes = {row[0] for row in cursor.fetchall()}
+        self.assertTrue(set(database.TRIGRAM_INDEXES) <= indexes)
+        self.assertTrue({'pokemon_weight_height_idx', 'pokemon_height_weight_idx'} <= indexes)
+
+    def test_name_filter_can_use_trigram_index(self):
+        Pokemon.objects.bulk_create([
+            Pokemon(pokedex_id=i, name=f"mon{i:04d}", types="normal", height=i, weight=i) for i in range(1, 200)
+        ])
+        with connection.cursor() as cursor:
+            # Tabla chica: sin esto el planificador prefiere el recorrido secuencial
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = Pokemon.objects.filter(name__icontains='on01').explain()
+        self.assertIn('pokemon_name_trgm_idx', plan)
+
+
+class ConcurrentReadsTest(TransactionTestCase):
+    """Lecturas del dashboard mientras una sincronización completa escribe."""
+
+    def test_dashboard_reads_during_full_sync(self):
+        errors, latencies = [], []
+        done = threading.Event()
+
+        def sync():
+            try:
+                PokeService.sync_data(concurrency=4, batch_size=20)
+            except OperationalError as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+                done.set()
+
+        def read():
+            client = Client()
+            try:
+                while not done.is_set():
+                    # Sin caché de resultados: cada lectura llega a la DB
+                    result_cache.clear()
+                    start = time.perf_counter()
+                    response = client.get(reverse('home'))
+                    latencies.append(time.perf_counter() - start)
+                    self.assertEqual(response.status_code, 200)
+                    time.sleep(0.01)
+            except OperationalError as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        with StubPokeAPI(count=120) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=120):
+                threads = [threading.Thread(target=sync)] + [threading.Thread(target=read) for _ in range(2)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(timeout=60)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Pokemon.objects.count(), 120)
+        self.assertGreater(len(latencies), 0)
+        # Con WAL los lectores no esperan a los commits de la sincronización
+        self.assertLess(statistics.median(latencies), 1.0)
+        self.assertLess(max(latencies), 5.0)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from .. import dataset, result_cache, search
+from ..models import Pokemon
+
+
+class DatasetTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69,
+                               etag='"abc"', content_hash='h1')
+        Pokemon.objects.create(pokedex_id=29, name="nidoran-f", types="poison", height=4, weight=70)
+        Pokemon.objects.create(pokedex_id=122, name="mr. mime ñ", types="psychic, fairy", height=13, weight=545)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def snapshot(self):
+        return list(dataset.iter_table())
+
+    def test_round_trip_in_every_format(self):
+        expected = self.snapshot()
+        for name in ('dump.ndjson.gz', 'dump.csv', 'dump.pkcol'):
+            with self.subTest(name):
+                self.assertEqual(dataset.dump(self.path(name)), 3)
+                self.assertEqual(list(dataset.iter_records(self.path(name))), expected)
+
+                self.assertEqual(dataset.load(self.path(name), replace=True), 3)
+                self.assertEqual(self.snapshot(), expected)
+                bulbasaur = Pokemon.objects.get(pokedex_id=1)
+                self.assertEqual(list(bulbasaur.slots.values_list('type__name', flat=True)), ['grass', 'poison'])
+                self.assertEqual((bulbasaur.types_count, bulbasaur.name_reversed), (2, 'ruasablub'))
+
+    def test_columnar_spans_several_blocks(self):
+        with mock.patch.object(dataset, 'BLOCK_ROWS', 2):
+            dataset.dump(self.path('dump.pkcol'))
+        self.assertEqual([r['pokedex_id'] for r in dataset.iter_records(self.path('dump.pkcol'))], [1, 29, 122])
+
+    def test_truncated_columnar_file_is_rejected(self):
+        dataset.dump(self.path('dump.pkcol'))
+        with open(self.path('dump.pkcol'), 'r+b') as fh:
+            fh.truncate(os.path.getsize(self.path('dump.pkcol')) - 8)
+        with self.assertRaises(dataset.DatasetError):
+            list(dataset.iter_records(self.path('dump.pkcol')))
+
+    def test_load_upserts_in_batches(self):
+        dataset.dump(self.path('dump.ndjson'), queryset=Pokemon.objects.filter(pokedex_id__in=[1, 29]))
+        Pokemon.objects.filter(pokedex_id=1).update(name="changed", types="fire")
+
+        with self.assertNumQueries(11):
+            # Por lote: upsert, pks, borrado y alta de slots (+ catálogo de tipos y savepoint)
+            self.assertEqual(dataset.load(self.path('dump.ndjson'), batch_size=1), 2)
+
+        self.assertEqual(Pokemon.objects.get(pokedex_id=1).name, "bulbasaur")
+        self.assertEqual(list(Pokemon.objects.get(pokedex_id=1).slots.values_list('type__name', flat=True)),
+                         ['grass', 'poison'])
+        # Sin --replace las filas que no están en el snapshot se conservan
+        self.assertTrue(Pokemon.objects.filter(pokedex_id=122).exists())
+
+    def test_replace_rebuilds_search_index(self):
+        dataset.dump(self.path('dump.csv'), queryset=Pokemon.objects.filter(pokedex_id=29))
+        dataset.load(self.path('dump.csv'), replace=True)
+
+        self.assertEqual(list(Pokemon.objects.values_list('pokedex_id', flat=True)), [29])
+        names = search.filter_name(Pokemon.objects.all(), 'doran').values_list('name', flat=True)
+        self.assertEqual(list(names), ['nidoran-f'])
+        if search.fts_supported():
+            self.assertTrue(search.fts_enabled())
+
+    def test_invalid_record_rolls_back(self):
+        with open(self.path('bad.ndjson'), 'w') as fh:
+            fh.write('{"pokedex_id": 500, "name": "ok", "types": "fire", "height": 1, "weight": 1}\n')
+            fh.write('{"pokedex_id": 501, "name": "broken", "types": "fire", "height": "tall", "weight": 1}\n')
+
+        with self.assertRaises(dataset.DatasetError):
+            dataset.load(self.path('bad.ndjson'), batch_size=1, replace=True)
+        self.assertEqual(Pokemon.objects.count(), 3)
+
+    def test_ndjson_lines_must_be_objects(self):
+        with open(self.path('list.ndjson'), 'w') as fh:
+            fh.write('{"pokedex_id": 500, "name": "ok", "types": "fire", "height": 1, "weight": 1}\n')
+            fh.write('[501, "lista"]\n')
+
+        with self.assertRaisesMessage(dataset.DatasetError, f"{self.path('list.ndjson')}:2: se esperaba un objeto JSON"):
+            list(dataset.iter_records(self.path('list.ndjson')))
+
+    def test_unknown_extension_needs_explicit_format(self):
+        with self.assertRaises(dataset.DatasetError):
+            dataset.detect_format('dump.txt')
+        self.assertEqual(dataset.detect_format('dump.txt', 'csv'), 'csv')
+
+
+class DatasetCommandsTest(TestCase):
+    def test_export_then_import(self):
+        Pokemon.objects.create(pokedex_id=25, name="pikachu", types="electric", height=4, weight=60)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'pokedex.pkcol')
+            out = StringIO()
+            call_command('export_pokemon', path, stdout=out)
+            self.assertIn('1 Pokémon exportados', out.getvalue())
+
+            call_command('import_pokemon', path, '--replace', stdout=out)
+            self.assertIn('1 Pokémon importados', out.getvalue())
+            self.assertEqual(Pokemon.objects.get().name, 'pikachu')
+
+            with self.assertRaises(CommandError):
+                call_command('import_pokemon', os.path.join(tmp, 'pokedex.xml'), stdout=out)
@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from ..http_cache import CacheMiss, CachingSession, DiskCache, SnapshotStore
+from ..models import Pokemon
+from ..services import PokeService
+from ..stub_api import StubPokeAPI
+
+
+def body(payload):
+    return json.dumps(payload).encode()
+
+
+class DiskCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.sqlite3')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_is_compressed(self):
+        cache = DiskCache(self.path)
+        payload = body({'results': ['bulbasaur'] * 200})
+        cache.set("http://api/1/", payload, etag='"abc"')
+
+        entry = cache.get("http://api/1/")
+        self.assertEqual(entry.body, payload)
+        self.assertEqual(entry.etag, '"abc"')
+        self.assertLess(cache.stats()['bytes'], len(payload))
+        cache.close()
+
+    def test_identical_payloads_share_one_blob(self):
+        """El almacén es direccionado por contenido: mismo cuerpo, un solo blob."""
+        cache = DiskCache(self.path)
+        cache.set("http://api/a/", body({'id': 1}))
+        cache.set("http://api/b/", body({'id': 1}))
+        self.assertEqual(cache.stats(), {'entries': 2, 'blobs': 1, 'bytes': cache.stats()['bytes']})
+
+        # Reemplazar una URL no borra el blob que la otra sigue usando
+        cache.set("http://api/a/", body({'id': 2}))
+        self.assertEqual(cache.get("http://api/b/").body, body({'id': 1}))
+        self.assertEqual(cache.stats()['blobs'], 2)
+        cache.close()
+
+    def test_ttl_marks_entries_stale(self):
+        cache = DiskCache(self.path, ttl=0.05)
+        cache.set("http://api/1/", body({'id': 1}))
+        self.assertTrue(cache.get("http://api/1/").is_fresh(cache.ttl))
+        time.sleep(0.06)
+        self.assertFalse(cache.get("http://api/1/").is_fresh(cache.ttl))
+        cache.close()
+
+    def test_size_bound_evicts_least_recently_used(self):
+        probe = DiskCache(os.path.join(self.tmp.name, 'probe.sqlite3'))
+        probe.set("http://api/x/", body({'id': 'x' * 50}))
+        entry_size = probe.stats()['bytes']
+        probe.close()
+
+        cache = DiskCache(self.path, max_bytes=int(entry_size * 2.5))
+        cache.set("http://api/1/", body({'id': '1' * 50}))
+        time.sleep(0.01)
+        cache.set("http://api/2/", body({'id': '2' * 50}))
+        time.sleep(0.01)
+        cache.get("http://api/1/")  # 1 pasa a ser el más reciente
+        time.sleep(0.01)
+        cache.set("http://api/3/", body({'id': '3' * 50}))
+
+        self.assertIsNotNone(cache.get("http://api/1/"))
+        self.assertIsNone(cache.get("http://api/2/"))
+        self.assertIsNotNone(cache.get("http://api/3/"))
+        cache.close()
+
+
+class CachingSessionTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self.tmp.name, 'cache.sqlite3'), ttl=3600)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def test_offline_miss_raises_request_exception(self):
+        session = CachingSession(inner=None, cache=self.cache, offline=True)
+        with self.assertRaises(CacheMiss):
+            session.get("http://api/404/")
+
+    def test_conditional_request_against_cache_returns_304(self):
+        self.cache.set("http://api/1/", body({'id': 1}), etag='"v1"')
+        session = CachingSession(inner=None, cache=self.cache)
+
+        self.assertEqual(session.get("http://api/1/").status_code, 200)
+        resp = session.get("http://api/1/", headers={'If-None-Match': '"v1"'})
+        self.assertEqual(resp.status_code, 304)
+
+    def test_snapshot_serves_offline(self):
+        self.cache.set("http://api/1/", body({'id': 1}), etag='"v1"')
+        path = os.path.join(self.tmp.name, 'snap.json.gz')
+        self.assertEqual(self.cache.export_snapshot(path), 1)
+
+        session = CachingSession(inner=None, snapshot=SnapshotStore(path), offline=True)
+        resp = session.get("http://api/1/")
+        self.assertEqual(resp.json(), {'id': 1})
+        self.assertEqual(resp.headers['ETag'], '"v1"')
+
+
+@override_settings(POKEAPI_RATE_LIMIT=0, POKEAPI_PAGE_SIZE=10, POKEDEX_TARGET_SIZE=20)
+class CachedSyncTest(TestCase):
+    """
+    Sincronizaciones repetidas servidas desde la caché en disco.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, 'pokeapi.sqlite3')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_sync_does_not_touch_the_network(self):
+        with StubPokeAPI(count=20, latency=0.02) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEAPI_CACHE_PATH=self.cache_path):
+                PokeService.sync_data()
+                self.assertEqual(len(api.hits), 22)
+
+                Pokemon.objects.all().delete()
+                api.hits.clear()
+                report = PokeService.sync_data()
+
+            self.assertEqual(api.hits, [])
+
+        self.assertEqual(report.inserted, 20)
+        self.assertEqual(Pokemon.objects.count(), 20)
+
+    def test_offline_sync_from_cache_and_snapshot(self):
+        with StubPokeAPI(count=20) as api:
+            url = api.url
+            with override_settings(POKEAPI_URL=url, POKEAPI_CACHE_PATH=self.cache_path):
+                PokeService.sync_data()
+
+        snapshot = os.path.join(self.tmp.name, 'snapshot.json.gz')
+        with override_settings(POKEAPI_CACHE_PATH=self.cache_path):
+            call_command('pokeapi_cache', export_snapshot=snapshot, stdout=StringIO())
+
+        # Servidor apagado: solo snapshot, sin caché en disco
+        Pokemon.objects.all().delete()
+        with override_settings(POKEAPI_URL=url, POKEAPI_CACHE_PATH='',
+                               POKEAPI_OFFLINE=True, POKEAPI_SNAPSHOT_PATH=snapshot):
+            report = PokeService.sync_data()
+
+        self.assertEqual(report.inserted, 20)
+        self.assertEqual(Pokemon.objects.count(), 20)
+
+    def test_offline_sync_without_data_fails_gracefully(self):
+        with override_settings(POKEAPI_URL="http://offline.invalid/api/v2/pokemon",
+                               POKEAPI_CACHE_PATH=self.cache_path, POKEAPI_OFFLINE=True):
+            report = PokeService.sync_data()
+
+        self.assertEqual(report.processed, 0)
+        self.assertEqual(Pokemon.objects.count(), 0)
@@ -0,0 +1,110 @@
+import re
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from .. import metrics, result_cache
+from ..instrumentation import RequestTimings
+from ..models import Pokemon
+from ..services import PokeService
+from ..stub_api import StubPokeAPI
+
+
+class RegistryTest(SimpleTestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_histogram_exposes_cumulative_buckets(self):
+        histogram = self.registry.histogram('demo_seconds', "Demo.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, view='home')
+
+        text = self.registry.render()
+        self.assertIn('# TYPE demo_seconds histogram', text)
+        self.assertIn('demo_seconds_bucket{view="home",le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{view="home",le="1"} 3', text)
+        self.assertIn('demo_seconds_bucket{view="home",le="+Inf"} 4', text)
+        self.assertIn('demo_seconds_sum{view="home"} 4.25', text)
+        self.assertIn('demo_seconds_count{view="home"} 4', text)
+
+    def test_counter_escapes_label_values(self):
+        counter = self.registry.counter('demo_total', "Demo.")
+        counter.inc(reason='say "hi"')
+        counter.inc(2, reason='say "hi"')
+
+        self.assertIn('demo_total{reason="say \\"hi\\""} 3', self.registry.render())
+        self.assertEqual(counter.value(reason='say "hi"'), 3)
+
+
+class RequestTimingsTest(SimpleTestCase):
+    def test_template_time_excludes_its_queries(self):
+        timings = RequestTimings()
+        with timings.rendering():
+            timings.db_wrapper(lambda *args: None, 'SELECT 1', (), False, {})
+        timings.total = timings.db + timings.template + 0.5
+
+        self.assertEqual(timings.queries, 1)
+        self.assertAlmostEqual(timings.view, 0.5)
+        self.assertRegex(timings.server_timing(), r'^db;dur=[\d.]+;desc="1 queries", view;dur=500\.\d\d, ')
+
+
+@override_settings(POKEDEX_METRICS_ENABLED=True)
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        metrics.reset()
+        Pokemon.objects.create(pokedex_id=25, name="pikachu", types="electric", height=4, weight=60)
+
+    def _phases(self, response):
+        return dict(re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing']))
+
+    def test_server_timing_splits_db_view_and_template(self):
+        response = self.client.get(reverse('home'))
+
+        phases = self._phases(response)
+        self.assertEqual(set(phases), {'db', 'view', 'template', 'total'})
+        self.assertGreater(float(phases['template']), 0)
+        self.assertGreater(float(phases['db']), 0)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        self.client.get('/no-existe/')
+
+        self.assertEqual(metrics.REQUEST_DURATION.count(view='home', phase='total'), 2)
+        self.assertEqual(metrics.REQUESTS.value(view='home', method='GET', status=200), 2)
+        self.assertEqual(metrics.REQUESTS.value(view='unmatched', method='GET', status=404), 1)
+        self.assertGreater(metrics.DB_QUERIES.value(view='home'), 0)
+
+    def test_metrics_endpoint_uses_prometheus_text_format(self):
+        self.client.get(reverse('home'))
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE pokedex_request_duration_seconds histogram', body)
+        self.assertIn('pokedex_request_duration_seconds_count{phase="template",view="home"} 1', body)
+
+    def test_pokeapi_fetches_are_metered(self):
+        with StubPokeAPI(count=6, failing_ids={3}) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=6,
+                                   POKEAPI_RETRIES=0, POKEAPI_DEFERRED_ROUNDS=0):
+                PokeService.sync_data()
+
+        self.assertEqual(metrics.FETCH_DURATION.count(endpoint='detail'), 6)
+        self.assertEqual(metrics.FETCH_DURATION.count(endpoint='list'), 1)
+        self.assertEqual(metrics.FETCH_ERRORS.value(endpoint='detail', reason='http_500'), 1)
+
+
+@override_settings(POKEDEX_METRICS_ENABLED=False)
+class MetricsDisabledTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_nothing_is_recorded_when_disabled(self):
+        response = self.client.get(reverse('home'))
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(metrics.REQUEST_DURATION.count(view='home', phase='total'), 0)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
@@ -1,5 +1,11 @@
+from importlib import import_module
+
+from unittest import skipUnless
+
+from django.apps import apps
+from django.db import connection
 from django.test import TestCase
-from ..models import Pokemon
+from ..models import Pokemon, PokemonType, Type
 
 class PokemonModelTest(TestCase):
     def test_pokemon_str(self):
@@ -7,4 +13,113 @@ class PokemonModelTest(TestCase):
         p = Pokemon.objects.create(
             pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69
         )
-        self.assertEqual(str(p), "bulbasaur")
\ No newline at end of file
+        self.assertEqual(str(p), "bulbasaur")
+
+
+class PokemonDerivedColumnsTest(TestCase):
+    def test_save_computes_derived_columns(self):
+        """types_count y name_reversed se recalculan en cada save()."""
+        p = Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        self.assertEqual((p.types_count, p.name_reversed), (2, "ruasablub"))
+
+        p.name, p.types = "ivysaur", "grass"
+        p.save(update_fields=['name', 'types'])
+        p.refresh_from_db()
+        self.assertEqual((p.types_count, p.name_reversed), (1, "ruasyvi"))
+
+
+@skipUnless(connection.vendor == 'sqlite', "Los planes de ejecución se verifican con EXPLAIN QUERY PLAN de SQLite")
+class PokemonIndexPlanTest(TestCase):
+    """
+    Las consultas del dashboard deben resolverse con los índices declarados
+    en Pokemon.Meta (SEARCH/SCAN ... USING INDEX) y no con un SCAN + ordenamiento temporal.
+    """
+
+    def setUp(self):
+        for i in range(1, 21):
+            Pokemon.objects.create(pokedex_id=i, name=f"p{i}", types="normal", height=i, weight=i * 10)
+
+    def assertUsesIndex(self, qs, index_name):
+        plan = qs.explain()
+        self.assertIn(index_name, plan)
+        self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_weight_range_uses_composite_index(self):
+        qs = Pokemon.objects.filter(weight__gt=50, weight__lt=150, height__gte=2).order_by('weight')
+        self.assertUsesIndex(qs, 'pokemon_weight_height_idx')
+
+    def test_height_range_uses_composite_index(self):
+        qs = Pokemon.objects.filter(height__gt=2, height__lt=8).order_by('-height')
+        self.assertUsesIndex(qs, 'pokemon_height_weight_idx')
+
+    def test_sort_by_types_count_in_sql(self):
+        self.assertUsesIndex(Pokemon.objects.order_by('-types_count'), 'pokemon_types_count_idx')
+
+    def test_sort_by_transformed_in_sql(self):
+        self.assertUsesIndex(Pokemon.objects.order_by('name_reversed'), 'pokemon_name_reversed_idx')
+
+    def test_sort_by_name_in_sql(self):
+        self.assertUsesIndex(Pokemon.objects.order_by('name'), 'pokemon_name_idx')
+
+
+class PokemonTypeRelationTest(TestCase):
+    """
+    Relación normalizada Pokemon <-> Type y su sincronía con el CSV.
+    """
+
+    def _slots(self, pokemon):
+        return list(pokemon.slots.values_list('slot', 'type__name'))
+
+    def test_save_builds_ordered_slots(self):
+        """Al guardar, el CSV se refleja en slots ordenados."""
+        p = Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        self.assertEqual(self._slots(p), [(1, 'grass'), (2, 'poison')])
+
+    def test_changing_types_replaces_slots(self):
+        """Editar el CSV reemplaza los slots en lugar de acumularlos."""
+        p = Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        p.types = "fire"
+        p.save()
+
+        self.assertEqual(self._slots(p), [(1, 'fire')])
+        self.assertEqual(PokemonType.objects.count(), 1)
+
+    def test_replace_for_uses_constant_queries(self):
+        """El costo de replace_for no crece con la cantidad de Pokémon."""
+        Pokemon.objects.bulk_create([
+            Pokemon(pokedex_id=i, name=f"p{i}", types="", height=1, weight=1) for i in range(1, 101)
+        ])
+        pks = list(Pokemon.objects.values_list('pk', flat=True))
+
+        with self.assertNumQueries(4):
+            PokemonType.replace_for({pk: "water, ice" for pk in pks})
+
+        self.assertEqual(PokemonType.objects.count(), 200)
+        self.assertEqual(Type.objects.count(), 2)
+
+    def test_data_migration_backfills_existing_rows(self):
+        """La migración de datos reconstruye los slots desde el CSV."""
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+        PokemonType.objects.all().delete()
+        Type.objects.all().delete()
+
+        migration = import_module('analysis.migrations.0005_populate_type_relation')
+        migration.populate_slots(apps, None)
+
+        self.assertEqual(
+            sorted(PokemonType.objects.values_list('pokemon__name', 'slot', 'type__name')),
+            [('bulbasaur', 1, 'grass'), ('bulbasaur', 2, 'poison'), ('charmander', 1, 'fire')],
+        )
+
+
+class TypeFilterBenchmarkTest(TestCase):
+    def test_both_filters_return_the_same_rows(self):
+        """En datos sintéticos el filtro indexado encuentra lo mismo que el LIKE."""
+        from ..benchmarks import seed, types_suite
+
+        seed(200)
+        results = types_suite(repeat=1)
+
+        self.assertGreater(results['relation']['rows'], 0)
+        self.assertEqual(results['relation']['rows'], results['icontains']['rows'])
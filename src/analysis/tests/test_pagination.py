@@ -0,0 +1,70 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ..models import Pokemon
+from ..pagination import KeysetPaginator, encode_token
+
+
+class KeysetPaginatorTest(TestCase):
+    """
+    Paginación por clave: recorrido completo sin saltos ni duplicados,
+    incluso cuando la columna de orden tiene valores repetidos.
+    """
+
+    def setUp(self):
+        # weight con muchos empates para forzar el uso del desempate pokedex_id
+        Pokemon.objects.bulk_create([
+            Pokemon(pokedex_id=i, name=f"p{i:02d}", types="normal", height=i, weight=i % 4)
+            for i in range(1, 24)
+        ])
+
+    def _walk_forward(self, field, descending, limit):
+        paginator = KeysetPaginator(Pokemon.objects.all(), field, descending, limit)
+        seen, token, pages = [], '', []
+        while True:
+            page = paginator.page(token)
+            pages.append(page)
+            seen.extend(p.pokedex_id for p in page.items)
+            if not page.next_token:
+                return seen, pages
+            token = page.next_token
+
+    def test_forward_walk_matches_full_ordering(self):
+        for descending in (False, True):
+            seen, _ = self._walk_forward('weight', descending, limit=5)
+            prefix = '-' if descending else ''
+            expected = list(
+                Pokemon.objects.order_by(f"{prefix}weight", f"{prefix}pokedex_id").values_list('pokedex_id', flat=True)
+            )
+            self.assertEqual(seen, expected)
+
+    def test_prev_token_returns_previous_page(self):
+        paginator = KeysetPaginator(Pokemon.objects.all(), 'name', False, 5)
+        first = paginator.page()
+        second = paginator.page(first.next_token)
+        third = paginator.page(second.next_token)
+
+        self.assertEqual(first.prev_token, '')
+        back = paginator.page(third.prev_token)
+        self.assertEqual([p.pk for p in back.items], [p.pk for p in second.items])
+        self.assertEqual(paginator.page(back.prev_token).items, first.items)
+
+    def test_each_page_fetches_at_most_limit_plus_one_rows(self):
+        _, pages = self._walk_forward('pokedex_id', False, limit=5)
+        deep_token = pages[-2].next_token
+
+        with CaptureQueriesContext(connection) as ctx:
+            page = KeysetPaginator(Pokemon.objects.all(), 'pokedex_id', False, 5).page(deep_token)
+
+        self.assertEqual([p.pokedex_id for p in page.items], [21, 22, 23])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('LIMIT 6', ctx.captured_queries[0]['sql'])
+        self.assertNotIn('OFFSET', ctx.captured_queries[0]['sql'])
+
+    def test_invalid_or_foreign_token_falls_back_to_first_page(self):
+        paginator = KeysetPaginator(Pokemon.objects.all(), 'name', False, 5)
+        first = [p.pk for p in paginator.page().items]
+
+        other_sort = encode_token('weight:asc', 'next', 2, 10)
+        for token in ('basura', '!!!', other_sort):
+            self.assertEqual([p.pk for p in paginator.page(token).items], first)
@@ -0,0 +1,62 @@
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase
+from ..models import Pokemon
+from ..query import PokemonQuery, parse_fields
+
+
+class PokemonQueryParsingTest(SimpleTestCase):
+    def _query(self, qs, **kwargs):
+        return PokemonQuery.from_params(QueryDict(qs), **kwargs)
+
+    def test_defaults(self):
+        query = self._query('')
+        self.assertEqual((query.limit, query.sort_field, query.descending, query.inverts_name), (50, 'pokedex_id', False, True))
+
+    def test_units_are_converted_and_bad_input_ignored(self):
+        query = self._query('min_weight=30&max_weight=abc&min_height=150&max_height=None')
+        self.assertEqual(query.weight_range, (300.0, None))
+        self.assertEqual(query.height_range, (15.0, None))
+        self.assertEqual(query.max_height, '')
+
+    def test_dashboard_limits_are_enforced(self):
+        self.assertEqual(self._query('limit=25').limit, 25)
+        self.assertEqual(self._query('limit=1000').limit, 50)
+        self.assertEqual(self._query('limit=1000', limits=None, default_limit=None).limit, 1000)
+        self.assertIsNone(self._query('limit=-3', limits=None, default_limit=None).limit)
+
+    def test_transformed_sort_follows_transform_func(self):
+        self.assertEqual(self._query('sort=transformed').sort_field, 'name_reversed')
+        self.assertEqual(self._query('sort=transformed&transform_func=none').sort_field, 'name')
+
+    def test_equivalent_queries_share_cache_params(self):
+        a = self._query('name=Char&type=FIRE&min_weight=5')
+        b = self._query('name=char+&type=fire&min_weight=5.0&limit=50')
+        self.assertEqual(a.cache_params(), b.cache_params())
+
+    def test_sync_stream_only_matches_the_default_view(self):
+        for qs in ('', 'limit=10', 'type=all', 'min_weight=abc', 'sort=pokedex_id&direction=asc'):
+            self.assertTrue(self._query(qs).matches_sync_stream, qs)
+        for qs in ('name=char', 'type=fire', 'min_weight=5', 'max_height=100', 'sort=weight',
+                   'direction=desc', 'transform_func=none', 'cursor=abc'):
+            self.assertFalse(self._query(qs).matches_sync_stream, qs)
+
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields('name, types,name'), ['name', 'types'])
+        self.assertIn('pokedex_id', parse_fields(''))
+        with self.assertRaises(ValueError):
+            parse_fields('name,secret')
+
+
+class PokemonQueryRowsTest(TestCase):
+    def setUp(self):
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+
+    def test_rows_only_select_requested_columns(self):
+        query = PokemonQuery.from_params(QueryDict('sort=weight&direction=desc'), limits=None, default_limit=None)
+        rows = list(query.rows(['name', 'weight_kg', 'types']))
+
+        self.assertEqual(rows, [
+            {'name': 'charmander', 'weight_kg': 8.5, 'types': ['fire']},
+            {'name': 'bulbasaur', 'weight_kg': 6.9, 'types': ['grass', 'poison']},
+        ])
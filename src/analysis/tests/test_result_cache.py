@@ -0,0 +1,159 @@
+from unittest import skipUnless
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from .. import result_cache
+from ..models import Pokemon
+from ..services import PokeService
+
+
+class ResultCacheViewTest(TestCase):
+    """
+    Caché de resultados de pokedex_view: aciertos por parámetros equivalentes
+    e invalidación por versión del dataset ante cualquier escritura.
+    """
+
+    def setUp(self):
+        result_cache.clear()
+        result_cache.reset_stats()
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+
+    def _names(self, response):
+        return [p.name for p in response.context['pokemons']]
+
+    def test_repeated_query_is_served_without_sql(self):
+        self.client.get('/', {'type': 'fire'})
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/', {'type': 'fire'})
+
+        self.assertEqual(self._names(response), ['charmander'])
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual((result_cache.stats()['hits'], result_cache.stats()['misses']), (1, 1))
+
+    def test_equivalent_params_share_an_entry(self):
+        """Mayúsculas, espacios y '5' vs '5.0' producen la misma clave."""
+        self.client.get('/', {'name': 'Char', 'min_weight': '5', 'limit': '50'})
+        self.client.get('/', {'name': ' char ', 'min_weight': '5.0'})
+
+        self.assertEqual(result_cache.stats()['hits'], 1)
+
+    def test_invalid_numbers_are_normalized_away(self):
+        self.client.get('/')
+        self.client.get('/', {'min_weight': 'abc', 'max_height': 'None'})
+
+        self.assertEqual(result_cache.stats()['hits'], 1)
+
+    def test_save_invalidates(self):
+        self.assertEqual(len(self.client.get('/').context['pokemons']), 2)
+        Pokemon.objects.create(pokedex_id=7, name="squirtle", types="water", height=5, weight=90)
+
+        self.assertEqual(len(self.client.get('/').context['pokemons']), 3)
+        self.assertEqual(result_cache.stats()['hits'], 0)
+
+    def test_bulk_writes_invalidate(self):
+        self.client.get('/', {'type': 'water'})
+
+        PokeService.persist_batch([{
+            'pokedex_id': 7, 'name': 'squirtle', 'types': 'water', 'height': 5, 'weight': 90,
+        }])
+        self.assertEqual(self._names(self.client.get('/', {'type': 'water'})), ['squirtle'])
+
+        Pokemon.objects.filter(pokedex_id=7).update(name='wartortle')
+        self.assertEqual(self._names(self.client.get('/', {'type': 'water'})), ['wartortle'])
+
+        Pokemon.objects.filter(pokedex_id=7).delete()
+        self.assertEqual(self._names(self.client.get('/', {'type': 'water'})), [])
+
+    @override_settings(POKEDEX_DATASET_VERSION_TTL=0)
+    def test_version_lives_in_the_database(self):
+        """Vaciar la caché no cambia la versión; una escritura por SQL crudo sí."""
+        old = result_cache.dataset_version()
+        result_cache.clear()
+        self.assertEqual(result_cache.dataset_version(), old)
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE analysis_pokemon SET weight = 90 WHERE pokedex_id = 4")
+        self.assertGreater(result_cache.dataset_version(), old)
+
+    def test_writes_outside_this_process_are_seen_after_the_ttl(self):
+        """Dentro del TTL la versión memorizada no consulta la DB; vencido, se relee."""
+        old = result_cache.dataset_version()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE analysis_pokemon SET weight = 90 WHERE pokedex_id = 4")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(result_cache.dataset_version(), old)
+        with override_settings(POKEDEX_DATASET_VERSION_TTL=0):
+            self.assertGreater(result_cache.dataset_version(), old)
+
+    def test_own_writes_are_seen_immediately(self):
+        old = result_cache.dataset_version()
+        Pokemon.objects.filter(pokedex_id=4).update(weight=90)
+        self.assertGreater(result_cache.dataset_version(), old)
+
+    @skipUnless(connection.vendor == 'sqlite', "Solo SQLite borra triggers al reconstruir una tabla")
+    @override_settings(POKEDEX_DATASET_VERSION_TTL=0)
+    def test_migrate_restores_version_triggers(self):
+        """Si una migración reconstruye analysis_pokemon, post_migrate repone los triggers."""
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'au', 'ad'):
+                cursor.execute(f"DROP TRIGGER pokemon_dataset_version_{suffix}")
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+
+        old = result_cache.dataset_version()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE analysis_pokemon SET weight = 95 WHERE pokedex_id = 4")
+        self.assertGreater(result_cache.dataset_version(), old)
+
+    @override_settings(POKEDEX_DATASET_VERSION_TTL=0)
+    def test_writes_outside_this_process_invalidate_cached_pages(self):
+        """SQL crudo (sin señales ni QuerySet) equivale a otro proceso escribiendo."""
+        self.assertEqual(self._names(self.client.get('/', {'type': 'fire'})), ['charmander'])
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE analysis_pokemon SET name = 'charmeleon' WHERE pokedex_id = 4")
+
+        self.assertEqual(self._names(self.client.get('/', {'type': 'fire'})), ['charmeleon'])
+
+    def test_rolled_back_version_is_never_reused(self):
+        before = result_cache.dataset_version()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Pokemon.objects.filter(pokedex_id=4).update(weight=90)
+            discarded = result_cache.dataset_version()
+            raise RuntimeError
+        self.assertEqual(result_cache.dataset_version(), before)
+
+        Pokemon.objects.filter(pokedex_id=4).update(weight=91)
+        self.assertNotIn(result_cache.dataset_version(), (before, discarded))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'results': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lru-test',
+            'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3},
+        },
+    })
+    def test_least_recently_used_entry_is_evicted(self):
+        # Con las 3 entradas ocupadas, la cuarta expulsa a la menos usada recientemente
+        keys = [result_cache.make_key((query,)) for query in ('fire', 'grass', 'water', 'ice')]
+        for key in keys[:3]:
+            result_cache.store(key, {'key': key})
+        result_cache.lookup(keys[0])
+        result_cache.store(keys[3], {'key': keys[3]})
+
+        self.assertIsNotNone(result_cache.lookup(keys[0]))
+        self.assertIsNone(result_cache.lookup(keys[1]))
+        self.assertIsNotNone(result_cache.lookup(keys[3]))
+
+    def test_stats_endpoint(self):
+        self.client.get('/')
+        self.client.get('/')
+
+        data = self.client.get('/cache-stats/').json()
+        self.assertEqual((data['hits'], data['misses'], data['hit_ratio']), (1, 1, 0.5))
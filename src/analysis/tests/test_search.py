@@ -0,0 +1,195 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from .. import result_cache, search
+from ..benchmarks import search_suite, seed
+from ..models import Pokemon
+
+
+class TrigramsTest(SimpleTestCase):
+    def test_trigrams_pad_each_word(self):
+        self.assertEqual(search.trigrams('Mew'), {'  m', ' me', 'mew', 'ew '})
+        # El guion separa palabras (ej: 'mr-mime')
+        self.assertIn('  m', search.trigrams('mr-mime'))
+        self.assertEqual(search.trigrams(''), set())
+
+
+class FullTextIndexTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+        Pokemon.objects.create(pokedex_id=6, name="charizard", types="fire, flying", height=17, weight=905)
+        Pokemon.objects.create(pokedex_id=7, name="squirtle", types="water", height=5, weight=90)
+
+    def _fts_names(self, text):
+        return set(search.filter_name(Pokemon.objects.all(), text).values_list('name', flat=True))
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 solo existe en SQLite; otros motores usan icontains")
+    def test_index_installed_by_migrations(self):
+        self.assertTrue(search.fts_enabled(connection))
+
+    def test_filter_name_matches_icontains(self):
+        for text in ('char', 'ARM', 'zard', 'e', 'rtl', 'missing', 'a"b'):
+            expected = set(Pokemon.objects.filter(name__icontains=text).values_list('name', flat=True))
+            self.assertEqual(self._fts_names(text), expected, text)
+
+    def test_triggers_follow_updates_and_deletes(self):
+        Pokemon.objects.filter(name="squirtle").update(name="wartortle")
+        self.assertEqual(self._fts_names('tort'), {'wartortle'})
+        self.assertEqual(self._fts_names('squirt'), set())
+
+        Pokemon.objects.filter(name="charmander").delete()
+        self.assertEqual(self._fts_names('char'), {'charizard'})
+
+    def test_bulk_create_is_indexed(self):
+        Pokemon.objects.bulk_create([Pokemon(pokedex_id=9, name="blastoise", types="water", height=16, weight=855)])
+        self.assertEqual(self._fts_names('toise'), {'blastoise'})
+
+    @skipUnless(connection.vendor == 'sqlite', "FTS5 solo existe en SQLite")
+    def test_fts_availability_is_checked_once(self):
+        search.fts_enabled(connection)
+        # Solo la búsqueda: sqlite_master ya no se consulta
+        with self.assertNumQueries(1):
+            self._fts_names('char')
+
+    def test_prefix_matches_use_name_range(self):
+        names = list(search.prefix_matches('CHAR').values_list('name', flat=True))
+        self.assertEqual(names, ['charizard', 'charmander'])
+
+
+@skipUnless(search.fts_supported(), "Requiere SQLite con FTS5")
+class FullTextIndexLifecycleTest(TransactionTestCase):
+    """drop_fts / install_fts confirmados de verdad (un rollback de FTS5 no es fiable)."""
+
+    def tearDown(self):
+        search.install_fts(connection)
+
+    def test_drop_and_install_refresh_cached_availability(self):
+        Pokemon.objects.create(pokedex_id=6, name="charizard", types="fire, flying", height=17, weight=905)
+        self.assertTrue(search.fts_enabled(connection))
+
+        search.drop_fts(connection)
+        self.assertFalse(search.fts_enabled(connection))
+        names = search.filter_name(Pokemon.objects.all(), 'zard').values_list('name', flat=True)
+        self.assertEqual(list(names), ['charizard'])
+
+        search.install_fts(connection)
+        self.assertTrue(search.fts_enabled(connection))
+        self.assertEqual(list(names.all()), ['charizard'])
+
+
+class FuzzySearchTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        for pokedex_id, name in ((6, "charizard"), (25, "pikachu"), (122, "mr-mime"), (143, "snorlax")):
+            Pokemon.objects.create(pokedex_id=pokedex_id, name=name, types="normal", height=10, weight=100)
+
+    def test_typo_finds_closest_name(self):
+        matches = search.fuzzy('charzard')
+        self.assertEqual(matches[0].name, 'charizard')
+        self.assertEqual(search.fuzzy('pikchu')[0].name, 'pikachu')
+        self.assertEqual(search.fuzzy('xyz'), [])
+
+    def test_autocomplete_requests_do_not_query_the_database(self):
+        self.client.get(reverse('autocomplete'), {'q': 'p'})
+        for prefix in ('pi', 'pik', 'pika'):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('autocomplete'), {'q': prefix})
+            self.assertEqual(response.json()['results'], [{'pokedex_id': 25, 'name': 'pikachu'}])
+
+    @override_settings(POKEDEX_DATASET_VERSION_TTL=0)
+    def test_index_rebuilds_after_writes_from_other_processes(self):
+        search.get_prefix_index()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE analysis_pokemon SET name = 'raichu' WHERE pokedex_id = 25")
+        self.assertEqual(search.autocomplete('rai'), [{'pokedex_id': 25, 'name': 'raichu'}])
+
+    def test_index_rebuilds_after_writes(self):
+        first = search.get_index()
+        self.assertIs(search.get_index(), first)
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass", height=7, weight=69)
+        self.assertEqual(search.fuzzy('bulbasaor')[0].name, 'bulbasaur')
+
+    def test_search_combines_tiers_without_duplicates(self):
+        results = search.search('char')
+        self.assertEqual([(r['name'], r['match']) for r in results][:1], [('charizard', 'prefix')])
+        self.assertEqual(len({r['pokedex_id'] for r in results}), len(results))
+
+        results = search.search('charzard')
+        self.assertEqual(results[0]['name'], 'charizard')
+        self.assertEqual(results[0]['match'], 'fuzzy')
+
+    def test_search_endpoint(self):
+        response = self.client.get(reverse('search'), {'q': 'snor', 'limit': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['name'], 'snorlax')
+        self.assertEqual(self.client.get(reverse('search')).json()['results'], [])
+
+    def test_dashboard_falls_back_to_fuzzy_matches(self):
+        response = self.client.get(reverse('home'), {'name': 'charzard'})
+        self.assertEqual([p.name for p in response.context['pokemons']], ['charizard'])
+        self.assertEqual(response.context['fuzzy_names'], ['charizard'])
+        self.assertContains(response, 'id="fuzzy-notice"')
+
+        response = self.client.get(reverse('home'), {'name': 'chari'})
+        self.assertEqual(response.context['fuzzy_names'], [])
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        for pokedex_id, name in ((4, "charmander"), (5, "charmeleon"), (6, "charizard"), (25, "pikachu")):
+            Pokemon.objects.create(pokedex_id=pokedex_id, name=name, types="normal", height=10, weight=100)
+
+    def test_complete_returns_sorted_prefix_range(self):
+        index = search.get_prefix_index()
+        self.assertEqual([r['name'] for r in index.complete('CHARM')], ['charmander', 'charmeleon'])
+        self.assertEqual(index.complete('char', limit=1), [{'pokedex_id': 6, 'name': 'charizard'}])
+        self.assertEqual(index.complete('zzz'), [])
+        self.assertEqual(index.complete('  '), [])
+
+    def test_keystrokes_do_not_query_the_database(self):
+        search.get_prefix_index()
+        with self.assertNumQueries(0):
+            for prefix in ('c', 'ch', 'cha', 'char'):
+                search.autocomplete(prefix)
+
+    def test_autocomplete_requests_do_not_query_the_database(self):
+        self.client.get(reverse('autocomplete'), {'q': 'p'})
+        for prefix in ('pi', 'pik', 'pika'):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('autocomplete'), {'q': prefix})
+            self.assertEqual(response.json()['results'], [{'pokedex_id': 25, 'name': 'pikachu'}])
+
+    @override_settings(POKEDEX_DATASET_VERSION_TTL=0)
+    def test_index_rebuilds_after_writes_from_other_processes(self):
+        search.get_prefix_index()
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE analysis_pokemon SET name = 'raichu' WHERE pokedex_id = 25")
+        self.assertEqual(search.autocomplete('rai'), [{'pokedex_id': 25, 'name': 'raichu'}])
+
+    def test_index_rebuilds_after_writes(self):
+        first = search.get_prefix_index()
+        Pokemon.objects.create(pokedex_id=26, name="raichu", types="electric", height=8, weight=300)
+        self.assertIsNot(search.get_prefix_index(), first)
+        self.assertEqual(search.autocomplete('rai'), [{'pokedex_id': 26, 'name': 'raichu'}])
+
+    def test_autocomplete_endpoint(self):
+        response = self.client.get(reverse('autocomplete'), {'q': 'pi', 'limit': '0'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'pokedex_id': 25, 'name': 'pikachu'}])
+
+    def test_filters_form_wires_the_endpoint(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'id="name-suggestions"')
+        self.assertContains(response, '/autocomplete/')
+
+
+class SearchSuiteTest(TestCase):
+    def test_search_suite_reports_every_variant(self):
+        seed(200)
+        results = search_suite(repeat=1)
+        self.assertEqual(set(results), {'prefix', 'icontains', 'fts5', 'autocomplete', 'fuzzy'})
+        self.assertEqual(results['icontains']['rows'], results['fts5']['rows'])
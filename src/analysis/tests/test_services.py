@@ -1,7 +1,17 @@
-from django.test import TestCase, override_settings
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from unittest.mock import patch, Mock
-from ..models import Pokemon
-from ..services import PokeService
+from .. import result_cache
+from ..models import Pokemon, SyncCheckpoint
+from ..query import PokemonQuery
+from ..services import PokeService, RateLimiter
+from ..stub_api import LAST_MODIFIED, StubPokeAPI, make_detail
 
 class PokeServiceTest(TestCase):
     
@@ -33,7 +43,7 @@ class PokeServiceTest(TestCase):
         }
         mock_requests.get.return_value = mock_list_resp
 
-        mock_detail_resp = Mock()
+        mock_detail_resp = Mock(status_code=200, headers={})
         mock_detail_resp.json.return_value = {
             'id': 25,
             'name': 'pikachu',
@@ -51,4 +61,375 @@ class PokeServiceTest(TestCase):
         self.assertTrue(Pokemon.objects.filter(name='pikachu').exists())
         pika = Pokemon.objects.get(name='pikachu')
         self.assertEqual(pika.weight, 60)
-        self.assertEqual(pika.types, "electric")
\ No newline at end of file
+        self.assertEqual(pika.types, "electric")
+
+class ConcurrentSyncTest(TestCase):
+    """
+    Ingesta contra un servidor local que imita PokeAPI con latencia inyectada.
+    """
+
+    def _timed_sync(self, api, concurrency):
+        Pokemon.objects.all().delete()
+        with override_settings(POKEAPI_URL=api.url, POKEAPI_RATE_LIMIT=0):
+            start = time.perf_counter()
+            PokeService.sync_data(concurrency=concurrency)
+            return time.perf_counter() - start
+
+    def test_concurrent_sync_is_faster_than_sequential(self):
+        """Con 50ms por petición, el pool debe recortar el tiempo de pared."""
+        with StubPokeAPI(count=20, latency=0.05) as api:
+            sequential = self._timed_sync(api, concurrency=1)
+            self.assertEqual(Pokemon.objects.count(), 20)
+
+            concurrent = self._timed_sync(api, concurrency=8)
+            self.assertEqual(Pokemon.objects.count(), 20)
+
+        # Secuencial ~ 21 * 50ms; concurrente ~ 50ms + 3 rondas de 50ms
+        self.assertLess(concurrent, sequential / 2)
+
+    def test_concurrent_sync_isolates_item_errors(self):
+        """Un detalle que falla no debe impedir la persistencia del resto."""
+        with StubPokeAPI(count=10, failing_ids={3, 7}) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEAPI_RATE_LIMIT=0,
+                                   POKEAPI_BACKOFF_BASE=0.01, POKEAPI_BREAKER_COOLDOWN=0.1):
+                PokeService.sync_data(concurrency=4)
+
+        ids = set(Pokemon.objects.values_list('pokedex_id', flat=True))
+        self.assertEqual(ids, {1, 2, 4, 5, 6, 8, 9, 10})
+
+    @override_settings(POKEAPI_CONCURRENCY=3)
+    def test_concurrency_defaults_to_settings(self):
+        """Sin argumento explícito, el tamaño del pool sale de settings."""
+        with patch('analysis.services.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool_cls:
+            with StubPokeAPI(count=4) as api:
+                with override_settings(POKEAPI_URL=api.url, POKEAPI_RATE_LIMIT=0):
+                    PokeService.sync_data()
+
+        pool_cls.assert_called_once_with(max_workers=3)
+        self.assertEqual(Pokemon.objects.count(), 4)
+
+
+class RateLimiterTest(SimpleTestCase):
+
+    def test_limits_requests_per_host(self):
+        """5 llamadas a 20 req/s requieren al menos 4 intervalos de 50ms."""
+        limiter = RateLimiter(rate=20)
+        start = time.perf_counter()
+        for _ in range(5):
+            limiter.wait("http://pokeapi.test/api/v2/pokemon/1/")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.19)
+
+    def test_hosts_are_limited_independently(self):
+        """El turno de un host no retrasa a otro host distinto."""
+        limiter = RateLimiter(rate=1)
+        start = time.perf_counter()
+        limiter.wait("http://a.test/")
+        limiter.wait("http://b.test/")
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_zero_rate_disables_limit(self):
+        limiter = RateLimiter(rate=0)
+        start = time.perf_counter()
+        for _ in range(100):
+            limiter.wait("http://pokeapi.test/")
+        self.assertLess(time.perf_counter() - start, 0.1)
+
+
+class BulkPersistenceTest(TestCase):
+    """
+    Persistencia por lotes (upsert) del pipeline de sincronización.
+    """
+
+    def _records(self, count, start=1):
+        return [
+            {
+                'pokedex_id': i,
+                'name': f"pokemon-{i}",
+                'types': "normal",
+                'height': i,
+                'weight': i * 10,
+            }
+            for i in range(start, start + count)
+        ]
+
+    def _count_queries(self, records, batch_size):
+        with CaptureQueriesContext(connection) as ctx:
+            PokeService._persist_all(iter(records), batch_size=batch_size)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_constant_per_batch(self):
+        """
+        El costo depende del número de lotes, no del número de filas:
+        3 lotes de 400 cuestan exactamente el triple que 1 lote de 400.
+        """
+        one_batch = self._count_queries(self._records(400), batch_size=400)
+        three_batches = self._count_queries(self._records(1200, start=1000), batch_size=400)
+
+        self.assertEqual(three_batches, 3 * one_batch)
+        self.assertEqual(Pokemon.objects.count(), 1600)
+
+    def test_full_dex_load_does_not_issue_per_row_queries(self):
+        """Una carga de 1000+ filas se resuelve con pocas sentencias."""
+        queries = self._count_queries(self._records(1025), batch_size=500)
+        # 3 lotes: upsert + reconstrucción de slots de PokemonType en cada uno
+        self.assertLess(queries, 40)
+        self.assertEqual(Pokemon.objects.count(), 1025)
+
+    def test_resync_refreshes_changed_rows(self):
+        """Un upsert sobre un pokedex_id existente actualiza sus columnas."""
+        Pokemon.objects.create(pokedex_id=25, name="pikachu", types="electric", height=4, weight=60)
+
+        PokeService.persist_batch([{
+            'pokedex_id': 25,
+            'name': "pikachu",
+            'types': "electric, fairy",
+            'height': 5,
+            'weight': 65,
+        }])
+
+        pika = Pokemon.objects.get(pokedex_id=25)
+        self.assertEqual(Pokemon.objects.count(), 1)
+        self.assertEqual(pika.types, "electric, fairy")
+        self.assertEqual(pika.height, 5)
+        self.assertEqual(pika.weight, 65)
+
+
+@override_settings(POKEAPI_RATE_LIMIT=0, POKEAPI_PAGE_SIZE=10)
+class PaginatedSyncTest(TestCase):
+    """
+    Sincronización en streaming siguiendo los enlaces 'next' de PokeAPI.
+    """
+
+    def test_walks_pages_until_target_size(self):
+        """Se detiene en el objetivo aunque la API tenga más especies."""
+        with StubPokeAPI(count=40) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=25):
+                PokeService.sync_data()
+
+            # 3 páginas de 10: la tercera se recorta a 5 items
+            self.assertEqual(len(api.list_hits()), 3)
+            self.assertEqual(len(api.detail_hits()), 25)
+
+        self.assertEqual(Pokemon.objects.count(), 25)
+        checkpoint = SyncCheckpoint.load()
+        self.assertTrue(checkpoint.completed)
+        self.assertEqual(checkpoint.offset, 25)
+        self.assertEqual(checkpoint.last_pokedex_id, 25)
+
+    def test_interrupted_sync_resumes_from_checkpoint(self):
+        """Un fallo en la tercera página no obliga a repetir las dos primeras."""
+        with StubPokeAPI(count=30, failing_offsets={20}) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=30, POKEAPI_BACKOFF_BASE=0.01):
+                PokeService.sync_data()
+
+                self.assertEqual(Pokemon.objects.count(), 20)
+                checkpoint = SyncCheckpoint.load()
+                self.assertFalse(checkpoint.completed)
+                self.assertIn("offset=20", checkpoint.next_url)
+
+                # La API se recupera: la segunda corrida solo pide lo que falta
+                api.failing_offsets.clear()
+                api.hits.clear()
+                PokeService.sync_data()
+
+            self.assertEqual(len(api.list_hits()), 1)
+            self.assertEqual(len(api.detail_hits()), 10)
+
+        self.assertEqual(Pokemon.objects.count(), 30)
+        self.assertTrue(SyncCheckpoint.load().completed)
+
+    @override_settings(POKEAPI_RETRIES=0, POKEAPI_DEFERRED_ROUNDS=0)
+    def test_failed_details_are_fetched_again_on_resync(self):
+        """Un detalle fallido no queda detrás del checkpoint: la siguiente corrida lo recupera."""
+        with StubPokeAPI(count=30, failing_ids={5}) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=30):
+                with self.assertLogs('analysis.services', level='ERROR'):
+                    report = PokeService.sync_data()
+
+                self.assertEqual((report.inserted, report.failed), (29, 1))
+                checkpoint = SyncCheckpoint.load()
+                self.assertFalse(checkpoint.completed)
+                self.assertEqual(checkpoint.offset, 0)
+
+                api.failing_ids.clear()
+                report = PokeService.sync_data()
+
+        self.assertEqual(report.failed, 0)
+        self.assertEqual(Pokemon.objects.count(), 30)
+        self.assertTrue(SyncCheckpoint.load().completed)
+
+    def test_completed_checkpoint_restarts_when_rows_are_missing(self):
+        with StubPokeAPI(count=20) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEDEX_TARGET_SIZE=20):
+                PokeService.sync_data()
+                Pokemon.objects.filter(pokedex_id=3).delete()
+
+                api.hits.clear()
+                PokeService.sync_data()
+
+            self.assertEqual(len(api.list_hits()), 2)
+
+        self.assertEqual(Pokemon.objects.count(), 20)
+
+    def test_iter_pages_is_lazy(self):
+        """El generador solo pide la página siguiente cuando se consume."""
+        with StubPokeAPI(count=30) as api:
+            pages = PokeService.iter_pages(f"{api.url}?limit=10", limit=30)
+            self.assertEqual(api.list_hits(), [])
+
+            results, next_url = next(pages)
+            self.assertEqual(len(results), 10)
+            self.assertIn("offset=10", next_url)
+            self.assertEqual(len(api.list_hits()), 1)
+
+            self.assertEqual(sum(len(r) for r, _ in pages), 20)
+            self.assertEqual(len(api.list_hits()), 3)
+
+
+@override_settings(POKEAPI_RATE_LIMIT=0, POKEAPI_PAGE_SIZE=10, POKEDEX_TARGET_SIZE=10)
+class IncrementalSyncTest(TestCase):
+    """
+    Refresco incremental con peticiones condicionales (ETag / Last-Modified).
+    """
+
+    def _pokemon_writes(self, ctx):
+        return [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith(('INSERT', 'UPDATE')) and '"analysis_pokemon"' in q['sql']
+        ]
+
+    def test_full_sync_stores_validators(self):
+        with StubPokeAPI(count=10) as api:
+            with override_settings(POKEAPI_URL=api.url):
+                report = PokeService.sync_data()
+
+        self.assertEqual(report.inserted, 10)
+        pokemon = Pokemon.objects.get(pokedex_id=1)
+        self.assertTrue(pokemon.etag.startswith('"'))
+        self.assertEqual(pokemon.last_modified, LAST_MODIFIED)
+        self.assertEqual(len(pokemon.content_hash), 64)
+
+    def test_unchanged_catalogue_is_served_by_304s_without_writes(self):
+        with StubPokeAPI(count=10) as api:
+            with override_settings(POKEAPI_URL=api.url):
+                PokeService.sync_data()
+
+                with CaptureQueriesContext(connection) as ctx:
+                    report = PokeService.sync_data(mode='incremental')
+
+            self.assertEqual(api.not_modified, 10)
+
+        self.assertEqual(report.unchanged, 10)
+        self.assertEqual(report.updated + report.inserted, 0)
+        self.assertEqual(self._pokemon_writes(ctx), [])
+
+    def test_only_changed_rows_are_rewritten(self):
+        with StubPokeAPI(count=10) as api:
+            with override_settings(POKEAPI_URL=api.url):
+                PokeService.sync_data()
+                api.pokemon[4]['weight'] = 999
+
+                with CaptureQueriesContext(connection) as ctx:
+                    report = PokeService.sync_data(mode='incremental')
+
+        self.assertEqual(report.updated, 1)
+        self.assertEqual(report.unchanged, 9)
+        self.assertEqual(len(self._pokemon_writes(ctx)), 1)
+        self.assertEqual(Pokemon.objects.get(pokedex_id=4).weight, 999)
+
+    def test_content_hash_skips_writes_without_validators(self):
+        """Si la API no entrega ETag, el content_hash evita reescribir filas idénticas."""
+        with StubPokeAPI(count=10, validators=False) as api:
+            with override_settings(POKEAPI_URL=api.url):
+                PokeService.sync_data()
+                api.pokemon[11] = make_detail(11)
+
+                with override_settings(POKEDEX_TARGET_SIZE=11):
+                    report = PokeService.sync_data(mode='incremental')
+
+            self.assertEqual(api.not_modified, 0)
+
+        self.assertEqual(report.unchanged, 10)
+        self.assertEqual(report.inserted, 1)
+        self.assertEqual(Pokemon.objects.count(), 11)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            PokeService.sync_data(mode='turbo')
+
+
+@override_settings(POKEAPI_RATE_LIMIT=0, POKEDEX_TARGET_SIZE=10)
+class SyncCommandTest(TestCase):
+    """`manage.py sync_pokedex` contra el stub local."""
+
+    def _call(self, api, *args):
+        out = StringIO()
+        with override_settings(POKEAPI_URL=api.url):
+            call_command('sync_pokedex', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_delta(self):
+        with StubPokeAPI(count=10) as api:
+            output = self._call(api, '--mode', 'full')
+            self.assertIn("10 insertados, 0 actualizados, 0 sin cambios, 0 fallidos", output)
+
+            api.pokemon[4]['weight'] = 999
+            output = self._call(api)
+
+        self.assertIn("Sincronización incremental", output)
+        self.assertIn("0 insertados, 1 actualizados, 9 sin cambios, 0 fallidos", output)
+
+    def test_local_result_cache_is_not_warmed(self):
+        """Con LocMemCache las entradas morirían con el comando: no se precalienta."""
+        result_cache.clear()
+        with StubPokeAPI(count=10) as api:
+            output = self._call(api, '--mode', 'full')
+
+        self.assertIn("Precalentado omitido", output)
+        self.assertNotIn("precalentada", output)
+        key = result_cache.make_key(PokemonQuery.from_params({}).cache_params())
+        self.assertIsNone(result_cache.lookup(key))
+
+    def test_shared_result_cache_is_warmed(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            shared = {
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                'results': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir},
+            }
+            with override_settings(CACHES=shared), StubPokeAPI(count=10) as api:
+                output = self._call(api, '--mode', 'full')
+
+                self.assertIn("Caché de resultados precalentada", output)
+                key = result_cache.make_key(PokemonQuery.from_params({}).cache_params())
+                self.assertIsNotNone(result_cache.lookup(key))
+
+    def test_dry_run_writes_nothing(self):
+        with StubPokeAPI(count=10) as api:
+            output = self._call(api, '--mode', 'full', '--dry-run')
+
+        self.assertIn("[dry-run]", output)
+        self.assertIn("10 insertados", output)
+        self.assertNotIn("precalentada", output)
+        self.assertEqual(Pokemon.objects.count(), 0)
+        self.assertEqual(SyncCheckpoint.load().offset, 0)
+
+    def test_concurrency_and_page_size_options(self):
+        with patch('analysis.services.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as pool_cls:
+            with StubPokeAPI(count=10) as api:
+                self._call(api, '--mode', 'full', '--concurrency', '2', '--page-size', '4', '--no-warm')
+                self.assertEqual(len(api.list_hits()), 3)
+
+        pool_cls.assert_called_once_with(max_workers=2)
+        self.assertEqual(Pokemon.objects.count(), 10)
+
+    @override_settings(POKEAPI_RETRIES=0, POKEAPI_DEFERRED_ROUNDS=0)
+    def test_failed_details_exit_with_error(self):
+        with StubPokeAPI(count=10, failing_ids={3}) as api:
+            with self.assertRaisesMessage(CommandError, "1 detalles"), self.assertLogs('analysis.services', 'ERROR'):
+                self._call(api, '--mode', 'full', '--no-warm')
+
+        self.assertEqual(Pokemon.objects.count(), 9)
+
+    def test_invalid_options_are_rejected(self):
+        with self.assertRaisesMessage(CommandError, "--page-size"):
+            call_command('sync_pokedex', '--page-size', '0')
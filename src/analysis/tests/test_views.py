@@ -1,9 +1,22 @@
-from django.test import TestCase, Client
+import asyncio
+import json
+import threading
+import time
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from unittest.mock import patch
-from ..models import Pokemon
+from .. import result_cache
+from ..jobs import Job, runner
+from ..models import Pokemon, Type
+from ..services import SyncReport
+from ..views import _run_sync
+from ..stub_api import StubPokeAPI
 
 class PokedexViewTest(TestCase):
     def setUp(self):
+        result_cache.clear()
 
         # La DB guarda Hectogramos (HG). La vista recibe Kilogramos (KG).
         # Factor de conversión: 1 KG = 10 HG.
@@ -73,6 +86,52 @@ class PokedexViewTest(TestCase):
         # 0 resultados (igual que el test estricto)
         self.assertEqual(len(pokemons), 0)
 
+    @patch('analysis.services.PokeService.sync_data')
+    def test_view_filter_type_exact(self, mock_sync):
+        """
+        El filtro por tipo usa la relación normalizada: coincidencia exacta,
+        sin falsos positivos por subcadena ('roc' no encuentra 'rock').
+        """
+        response = self.client.get('/', {'type': 'rock'})
+        self.assertEqual([p.name for p in response.context['pokemons']], ['heavy'])
+
+        response = self.client.get('/', {'type': 'roc'})
+        self.assertEqual(len(response.context['pokemons']), 0)
+
+    @patch('analysis.services.PokeService.sync_data')
+    def test_sort_by_derived_columns_happens_in_sql(self, mock_sync):
+        """Ordenar por 'transformed' o 'types_count' se resuelve con ORDER BY."""
+        Pokemon.objects.create(pokedex_id=4, name="dual", types="water, ice", height=10, weight=10)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/', {'sort': 'transformed', 'direction': 'asc'})
+        names = [p.name for p in response.context['pokemons']]
+        self.assertEqual(names, ['dual', 'medium', 'light', 'heavy'])  # laud, muidem, thgil, yvaeh
+        self.assertTrue(any('ORDER BY "analysis_pokemon"."name_reversed" ASC' in q['sql'] for q in ctx.captured_queries))
+
+        response = self.client.get('/', {'sort': 'types_count', 'direction': 'desc'})
+        self.assertEqual(response.context['pokemons'][0].name, 'dual')
+
+    @patch('analysis.services.PokeService.sync_data')
+    def test_pagination_counts_in_sql_and_follows_tokens(self, mock_sync):
+        """total_found sale de COUNT y la página siguiente se pide con el token."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/', {'limit': 10, 'sort': 'weight'})
+        self.assertEqual(response.context['total_found'], 3)
+        self.assertTrue(any('COUNT(*)' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(response.context['next_token'], '')
+
+        Pokemon.objects.bulk_create([
+            Pokemon(pokedex_id=i, name=f"extra{i}", types="normal", height=1, weight=i) for i in range(10, 22)
+        ])
+        first = self.client.get('/', {'limit': 10, 'sort': 'weight'})
+        second = self.client.get('/', {'limit': 10, 'sort': 'weight', 'cursor': first.context['next_token']})
+
+        self.assertEqual(first.context['total_found'], 15)
+        self.assertEqual(len(first.context['pokemons']), 10)
+        self.assertEqual([p.name for p in second.context['pokemons']], ['extra20', 'extra21', 'light', 'medium', 'heavy'])
+        self.assertNotEqual(second.context['prev_token'], '')
+
     @patch('analysis.services.PokeService.sync_data')
     def test_reversed_name_logic(self, mock_sync):
         """
@@ -143,20 +202,23 @@ class PokedexViewTest(TestCase):
     @patch('analysis.services.PokeService.sync_data')
     def test_sync_data_view_endpoint(self, mock_sync):
         """
-        Prueba el nuevo endpoint auxiliar '/sync-data/'.
-        Debe llamar al servicio de sincronización y devolver JSON {'status': 'ok'}.
+        Prueba el endpoint auxiliar '/sync-data/'.
+        Debe lanzar la sincronización como tarea en segundo plano y responder
+        de inmediato con 202 y el estado de la tarea.
         """
         mock_sync.return_value = None
+        runner.clear()
         
         response = self.client.get('/sync-data/')
         
-        # 1. Verificar Status HTTP
-        self.assertEqual(response.status_code, 200)
+        # 1. Verificar Status HTTP (aceptado, se procesa en segundo plano)
+        self.assertEqual(response.status_code, 202)
         
         # 2. Verificar Contenido JSON
-        self.assertJSONEqual(response.content, {'status': 'ok'})
+        self.assertEqual(response.json()['status'], 'started')
         
         # 3. Verificar que efectivamente llamó al servicio
+        self.assertTrue(runner.get('sync').wait(timeout=5))
         mock_sync.assert_called_once()
 
     def test_needs_sync_context_flag(self):
@@ -190,4 +252,267 @@ class PokedexViewTest(TestCase):
         self.assertFalse(
             response_b.context['needs_sync'], 
             "La bandera needs_sync debería ser False cuando hay >= 50 registros."
-        )
\ No newline at end of file
+        )
+
+class TableFragmentViewTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=6, name="charizard", types="fire, flying", height=17, weight=905)
+
+    def test_fragment_renders_only_the_table(self):
+        response = self.client.get(reverse('table'), {'sort': 'weight', 'direction': 'desc'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'analysis/components/table_fragment.html')
+        self.assertTemplateNotUsed(response, 'analysis/base.html')
+        self.assertNotContains(response, '<html')
+        self.assertNotContains(response, '<script')
+        body = response.content.decode()
+        self.assertLess(body.index('Charizard'), body.index('Bulbasaur'))
+        self.assertContains(response, 'id="pokemon-rows"')
+
+        active = [h['field'] for h in response.context['sort_headers'] if h['active']]
+        self.assertEqual(active, ['weight'])
+        self.assertTrue(response.context['sort_headers'][4]['descending'])
+
+    def test_streamed_rows_are_only_painted_on_the_default_view(self):
+        """Con filtros u otro orden, el stream de sincronización no toca la tabla (data-live="0")."""
+        self.assertContains(self.client.get(reverse('table')), 'data-live="1"')
+        for params in ({'type': 'fire'}, {'min_weight': '50'}, {'sort': 'weight'}):
+            with self.subTest(params):
+                self.assertContains(self.client.get(reverse('table'), params), 'data-live="0"')
+
+    def test_dashboard_embeds_the_same_fragment(self):
+        params = {'type': 'fire'}
+        page = self.client.get(reverse('home'), params).content.decode()
+        fragment = self.client.get(reverse('table'), params).content.decode()
+
+        self.assertIn('id="pokemon-table"', page)
+        self.assertIn(fragment.strip()[:200], page)
+
+    def test_type_options_are_cached_per_dataset_version(self):
+        Type.objects.create(name='stellar')
+        self.client.get(reverse('home'))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'), {'name': 'bulba'})
+        self.assertContains(response, '<option value="stellar"')
+        self.assertFalse(any('analysis_type' in q['sql'] for q in queries.captured_queries))
+
+        # Una escritura cambia la versión y el fragmento se vuelve a generar
+        Type.objects.create(name='shadow')
+        Pokemon.objects.filter(pokedex_id=1).update(weight=70)
+        self.assertContains(self.client.get(reverse('home')), '<option value="shadow"')
+
+
+class PokemonApiViewTest(TestCase):
+    """
+    API JSON/NDJSON: mismos filtros que el dashboard, selección de campos y streaming.
+    """
+
+    def setUp(self):
+        result_cache.clear()
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass, poison", height=7, weight=69)
+        Pokemon.objects.create(pokedex_id=4, name="charmander", types="fire", height=6, weight=85)
+        Pokemon.objects.create(pokedex_id=6, name="charizard", types="fire, flying", height=17, weight=905)
+
+    def _json(self, response):
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_json_matches_dashboard_semantics(self):
+        params = {'type': 'fire', 'min_weight': 10, 'range_mode': 'inclusive', 'sort': 'weight', 'direction': 'desc'}
+        dashboard = [p.name for p in self.client.get('/', params).context['pokemons']]
+
+        rows = self._json(self.client.get('/api/pokemon/', params))
+
+        self.assertEqual([row['name'] for row in rows], dashboard)
+        self.assertEqual(dashboard, ['charizard'])
+
+    def test_field_selection(self):
+        rows = self._json(self.client.get('/api/pokemon/', {'fields': 'pokedex_id,transformed', 'limit': 2}))
+        self.assertEqual(rows, [
+            {'pokedex_id': 1, 'transformed': 'ruasablub'},
+            {'pokedex_id': 4, 'transformed': 'rednamrahc'},
+        ])
+
+    def test_ndjson_by_param_and_accept_header(self):
+        by_param = self.client.get('/api/pokemon/', {'format': 'ndjson'})
+        by_header = self.client.get('/api/pokemon/', {'fields': 'name'}, HTTP_ACCEPT='application/x-ndjson')
+
+        for response in (by_param, by_header):
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            lines = b''.join(response.streaming_content).decode().splitlines()
+            self.assertEqual([json.loads(line)['name'] for line in lines], ['bulbasaur', 'charmander', 'charizard'])
+
+    def test_streams_large_results_in_chunks(self):
+        Pokemon.objects.bulk_create([
+            Pokemon(pokedex_id=i, name=f"p{i}", types="normal", height=1, weight=1) for i in range(100, 1300)
+        ])
+        response = self.client.get('/api/pokemon/', {'fields': 'pokedex_id'})
+        chunks = list(response.streaming_content)
+
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(len(json.loads(b''.join(chunks))), 1203)
+
+    def test_invalid_field_or_format_is_rejected(self):
+        self.assertEqual(self.client.get('/api/pokemon/', {'fields': 'name,password'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/pokemon/', {'format': 'xml'}).status_code, 400)
+
+
+class SyncJobViewTest(TestCase):
+    """
+    Sincronización en segundo plano: deduplicación y endpoint de estado.
+    """
+
+    def setUp(self):
+        runner.clear()
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        job = runner.get('sync')
+        if job:
+            job.wait(timeout=5)
+
+    def _blocking_sync(self, progress=None, **kwargs):
+        progress(SyncReport(inserted=3, total=10))
+        self.release.wait(timeout=5)
+        return SyncReport(inserted=10, total=10)
+
+    def test_status_is_idle_before_any_sync(self):
+        response = self.client.get('/sync-status/')
+        self.assertEqual(response.json(), {'status': 'idle', 'needs_sync': True})
+
+    @override_settings(POKEDEX_TARGET_SIZE=1)
+    def test_idle_status_reports_catalog_filled_by_another_worker(self):
+        Pokemon.objects.create(pokedex_id=1, name="bulbasaur", types="grass", height=7, weight=69)
+        response = self.client.get('/sync-status/')
+        self.assertEqual(response.json(), {'status': 'idle', 'needs_sync': False})
+
+    @override_settings(POKEDEX_SYNC_ON_VISIT=False)
+    def test_sync_on_visit_can_be_disabled(self):
+        """Con la ingesta delegada a `sync_pokedex`, el navegador nunca la lanza."""
+        result_cache.clear()
+        self.assertFalse(self.client.get('/').context['needs_sync'])
+        self.assertEqual(self.client.get('/sync-status/').json(), {'status': 'idle', 'needs_sync': False})
+
+    def test_concurrent_triggers_share_one_job(self):
+        with patch('analysis.services.PokeService.sync_data', side_effect=self._blocking_sync) as mock_sync:
+            first = self.client.get('/sync-data/').json()
+            second = self.client.get('/sync-data/').json()
+
+            self.assertEqual(first['status'], 'started')
+            self.assertEqual(second['status'], 'running')
+            self.assertEqual(first['job']['id'], second['job']['id'])
+
+            self.release.set()
+            self.assertTrue(runner.get('sync').wait(timeout=5))
+
+        mock_sync.assert_called_once()
+
+    def test_status_reports_progress_counts(self):
+        with patch('analysis.services.PokeService.sync_data', side_effect=self._blocking_sync):
+            self.client.get('/sync-data/')
+
+            # Espera activa hasta que la tarea publique su primer avance
+            for _ in range(100):
+                status = self.client.get('/sync-status/').json()
+                if status['progress']:
+                    break
+                time.sleep(0.01)
+
+            self.assertEqual(status['status'], 'running')
+            self.assertEqual(status['progress']['processed'], 3)
+            self.assertEqual(status['progress']['total'], 10)
+
+            self.release.set()
+            runner.get('sync').wait(timeout=5)
+
+        status = self.client.get('/sync-status/').json()
+        self.assertEqual(status['status'], 'done')
+
+    def test_failed_sync_is_reported(self):
+        with patch('analysis.services.PokeService.sync_data', side_effect=RuntimeError("boom")):
+            with self.assertLogs('analysis.jobs', level='ERROR'):
+                self.client.get('/sync-data/')
+                runner.get('sync').wait(timeout=5)
+
+        status = self.client.get('/sync-status/').json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertEqual(status['error'], 'boom')
+
+        # Una tarea fallida no bloquea un nuevo intento
+        with patch('analysis.services.PokeService.sync_data', return_value=None):
+            self.assertEqual(self.client.get('/sync-data/').json()['status'], 'started')
+            runner.get('sync').wait(timeout=5)
+
+
+class SyncEventsViewTest(TestCase):
+    """
+    Stream SSE de la ingesta (/sync-events/).
+    """
+
+    def setUp(self):
+        runner.clear()
+
+    async def _read_stream(self, response):
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode() if isinstance(chunk, bytes) else chunk)
+        return ''.join(chunks)
+
+    def _parse(self, body):
+        events = []
+        for block in body.strip().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+            events.append((fields['event'], json.loads(fields['data'])))
+        return events
+
+    async def test_no_job_returns_404(self):
+        response = await self.async_client.get('/sync-events/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_streams_rows_then_done(self):
+        def fake_sync(job):
+            job.publish('pokemon', {'pokedex_id': 1, 'name': 'bulbasaur'})
+            job.update(processed=1, total=2)
+            job.publish('pokemon', {'pokedex_id': 2, 'name': 'ivysaur'})
+
+        job, _ = runner.submit('sync', fake_sync)
+        await asyncio.to_thread(job.wait, 5)
+
+        response = await self.async_client.get('/sync-events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = self._parse(await self._read_stream(response))
+
+        self.assertEqual([e[0] for e in events], ['pokemon', 'progress', 'pokemon', 'done'])
+        self.assertEqual(events[2][1]['name'], 'ivysaur')
+        self.assertEqual(events[-1][1]['status'], 'done')
+
+    async def test_resumes_from_last_event_id(self):
+        def fake_sync(job):
+            for i in range(1, 4):
+                job.publish('pokemon', {'pokedex_id': i})
+
+        job, _ = runner.submit('sync', fake_sync)
+        await asyncio.to_thread(job.wait, 5)
+
+        response = await self.async_client.get('/sync-events/', headers={'Last-Event-ID': '2'})
+        events = self._parse(await self._read_stream(response))
+        self.assertEqual([e[1].get('pokedex_id') for e in events[:-1]], [3])
+
+    def test_sync_job_publishes_each_persisted_row(self):
+        """La tarea real emite un evento 'pokemon' por fila confirmada."""
+        with StubPokeAPI(count=12) as api:
+            with override_settings(POKEAPI_URL=api.url, POKEAPI_RATE_LIMIT=0,
+                                   POKEDEX_TARGET_SIZE=12, SYNC_EVENTS_BATCH_SIZE=5):
+                job = Job('sync')
+                _run_sync(job)
+
+        events, _ = job.events_since(0)
+        rows = [e['data'] for e in events if e['type'] == 'pokemon']
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0]['transformed'], rows[0]['name'][::-1])
+        self.assertEqual(Pokemon.objects.count(), 12)
@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from .. import result_cache, search, warmup
+from ..models import Pokemon
+from ..query import PokemonQuery
+
+
+class WarmupTest(TestCase):
+    def setUp(self):
+        result_cache.clear()
+        Pokemon.objects.create(pokedex_id=25, name="pikachu", types="electric", height=4, weight=60)
+
+    def test_check_passes_on_migrated_database(self):
+        self.assertEqual(warmup.check(), [])
+
+    def test_warm_loads_indexes_and_first_dashboard_page(self):
+        timings = warmup.warm()
+
+        self.assertEqual(list(timings), ['db', 'result_cache', 'analytics', 'fuzzy_index', 'prefix_index', 'dashboard'])
+        # Los índices ya están construidos: la siguiente consulta no toca la DB
+        with self.assertNumQueries(0):
+            self.assertEqual(search.autocomplete('pika'), [{'pokedex_id': 25, 'name': 'pikachu'}])
+        key = result_cache.make_key(PokemonQuery.from_params({}).cache_params())
+        self.assertIsNotNone(result_cache.lookup(key))
+
+    def test_warm_results_caches_every_sort_order(self):
+        timings = warmup.warm_results()
+
+        self.assertIn('default', timings)
+        self.assertIn('sort=weight', timings)
+        for params in ({}, {'sort': 'weight'}, {'sort': 'transformed'}):
+            key = result_cache.make_key(PokemonQuery.from_params(params).cache_params())
+            self.assertIsNotNone(result_cache.lookup(key))
+
+    def test_command_check_only(self):
+        out = StringIO()
+        call_command('warmup', '--check-only', stdout=out)
+        self.assertIn('Chequeo de arranque OK', out.getvalue())
@@ -1,16 +1,437 @@
+import asyncio
+import json
+from typing import Optional
+from dataclasses import replace
+from django.conf import settings
 from django.shortcuts import render
-from django.http import JsonResponse
-from .models import Pokemon
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from . import analytics, conditional, metrics, result_cache, search
+from .models import Pokemon, Type
+from .pagination import KeysetPaginator
+from .query import PokemonQuery, parse_fields
+from .jobs import runner
 from .services import PokeService
 
+SYNC_JOB = 'sync'
+
+# Búsqueda: máximo de resultados de /search/ y de coincidencias aproximadas en el dashboard
+SEARCH_LIMIT = 10
+FUZZY_LIMIT = 50
+
+# API JSON: filas por lectura a la DB y por bloque enviado al cliente
+API_CHUNK_SIZE = 500
+API_FORMATS = {'json': 'application/json', 'ndjson': 'application/x-ndjson'}
+
+# Catálogo de tipos del filtro, en el orden de la Pokédex
+TYPE_OPTIONS = [
+    "normal", "fighting", "flying", "poison", "ground", "rock", "bug",
+    "ghost", "steel", "fire", "water", "grass", "electric", "psychic",
+    "ice", "dragon", "dark", "fairy",
+]
+
+# Columnas ordenables de la tabla: (campo de `sort`, encabezado, clases del <th>)
+SORT_COLUMNS = [
+    ('pokedex_id', "ID", 'ps-4 py-3'),
+    ('name', "Nombre", 'py-3'),
+    ('types_count', "Tipo(s)", 'py-3'),
+    ('height', "Altura (cm)", 'py-3 text-end'),
+    ('weight', "Peso (kg)", 'py-3 text-end pe-4'),
+    ('transformed', "Transformación de Datos", 'py-3 text-end pe-4'),
+]
+
+# Segundos entre lecturas del registro de eventos y entre comentarios keep-alive del stream SSE
+SSE_POLL_INTERVAL = 0.2
+SSE_KEEPALIVE = 15.0
+
+
+def _event_row(record: dict) -> dict:
+    """Fila lista para pintar en la tabla a partir de un registro recién persistido."""
+    return {
+        'pokedex_id': record['pokedex_id'],
+        'name': record['name'],
+        'types': [t.strip() for t in record['types'].split(',')],
+        'height_cm': int(record['height'] * 10),
+        'weight_kg': round(record['weight'] / 10, 2),
+        'transformed': record['name'][::-1],
+    }
+
+
+def _run_sync(job) -> dict:
+    """
+    Tarea de sincronización: publica el avance de cada página y un evento
+    'pokemon' por cada fila en cuanto su lote queda confirmado en la DB.
+    """
+    def on_persist(records):
+        for record in records:
+            job.publish('pokemon', _event_row(record))
+
+    report = PokeService.sync_data(
+        progress=lambda r: job.update(**r.as_dict()),
+        on_persist=on_persist,
+        batch_size=settings.SYNC_EVENTS_BATCH_SIZE,
+    )
+    return report.as_dict() if report else {}
+
+
+def _sse(event_id: int, event_type: str, data) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sync_event_stream(job, cursor: int):
+    """
+    Generador asíncrono que reenvía los eventos del Job como Server-Sent Events.
+
+    Cierra el stream con un evento 'done' o 'failed' cuando la tarea termina.
+    """
+    idle = 0.0
+    while True:
+        events, finished = job.events_since(cursor)
+        for event in events:
+            cursor += 1
+            yield _sse(cursor, event['type'], event['data'])
+
+        if finished and not events:
+            yield _sse(cursor, job.status, job.snapshot())
+            return
+
+        if events:
+            idle = 0.0
+            continue
+
+        await asyncio.sleep(SSE_POLL_INTERVAL)
+        idle += SSE_POLL_INTERVAL
+        if idle >= SSE_KEEPALIVE:
+            idle = 0.0
+            yield ": keep-alive\n\n"
+
+
+async def sync_events_view(request):
+    """
+    Stream SSE (text/event-stream) con la ingesta de la sincronización en curso.
+
+    Eventos emitidos:
+        pokemon  : fila recién persistida (ver _event_row).
+        progress : contadores del SyncReport al cerrar cada página.
+        done / failed : estado final de la tarea; el stream se cierra.
+
+    Soporta reanudación con la cabecera estándar Last-Event-ID (o ?cursor=N).
+    Pensado para servirse sobre ASGI; bajo WSGI funciona pero ocupa un worker.
+    """
+    job = runner.get(SYNC_JOB)
+    if job is None:
+        return JsonResponse({'status': 'idle'}, status=404)
+
+    try:
+        cursor = int(request.headers.get('Last-Event-ID') or request.GET.get('cursor', 0))
+    except ValueError:
+        cursor = 0
+
+    return StreamingHttpResponse(
+        _sync_event_stream(job, max(0, cursor)),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+def _needs_sync() -> bool:
+    """True si el navegador debe lanzar la sincronización inicial (ver POKEDEX_SYNC_ON_VISIT)."""
+    return settings.POKEDEX_SYNC_ON_VISIT and Pokemon.objects.count() < settings.POKEDEX_TARGET_SIZE
+
+
 def sync_data_view(request):
     """
     Endpoint auxiliar llamado vía AJAX por el frontend (loader.html).
-    Ejecuta la sincronización en segundo plano para no congelar la carga inicial.
+
+    Lanza la sincronización como tarea en segundo plano y responde de
+    inmediato (202), sin ocupar el worker durante la ingesta. Si ya hay una
+    sincronización en curso se reutiliza en lugar de lanzar otra.
+    """
+    job, created = runner.submit(SYNC_JOB, _run_sync)
+    return JsonResponse(
+        {'status': 'started' if created else 'running', 'job': job.snapshot()},
+        status=202,
+    )
+
+
+def sync_status_view(request):
+    """
+    Estado de la última sincronización, consultado periódicamente por el loader.
+
+    Devuelve {'status': 'idle', 'needs_sync': bool} si nunca se lanzó una en
+    este proceso. Con varios workers la tarea puede correr en otro proceso:
+    `needs_sync` False indica que el catálogo ya está completo.
+    """
+    job = runner.get(SYNC_JOB)
+    if job is None:
+        return JsonResponse({
+            'status': 'idle',
+            'needs_sync': _needs_sync(),
+        })
+    return JsonResponse(job.snapshot())
+
+def search_view(request):
+    """
+    Búsqueda por nombre para autocompletado: prefijos (índice de `name`),
+    subcadenas (FTS5) y, si faltan resultados, coincidencias aproximadas.
+
+    Query Parameters:
+        q (str): Texto buscado.
+        limit (int): Máximo de resultados (1-50, por defecto 10).
     """
-    PokeService.sync_data()
-    return JsonResponse({'status': 'ok'})
+    try:
+        limit = min(max(int(request.GET.get('limit', SEARCH_LIMIT)), 1), 50)
+    except ValueError:
+        limit = SEARCH_LIMIT
+    text = request.GET.get('q', '')
+    return JsonResponse({'query': text, 'results': search.search(text, limit=limit)})
+
+
+def autocomplete_view(request):
+    """
+    Sugerencias para el campo de nombre del dashboard (una llamada por tecla,
+    con debounce en filters.html).
+
+    Responde desde el índice de prefijos en memoria, sin consultar la DB; el
+    índice se reconstruye solo cuando cambia la versión del dataset.
+
+    Query Parameters:
+        q (str): Prefijo del nombre.
+        limit (int): Máximo de resultados (1-50, por defecto 10).
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', SEARCH_LIMIT)), 1), 50)
+    except ValueError:
+        limit = SEARCH_LIMIT
+    text = request.GET.get('q', '')
+    return JsonResponse({'query': text, 'results': search.autocomplete(text, limit=limit)})
+
+
+def _stats_etag(request) -> str:
+    query = PokemonQuery.from_params(request.GET)
+    # La versión del almacén y no la vigente: durante una recarga en segundo plano
+    # la respuesta sale del almacén anterior y no debe llevar el ETag nuevo
+    return conditional.dataset_etag(
+        'stats', query.cache_params(), request.GET.get('bins', ''), request.GET.get('percentiles', ''),
+        version=analytics.get_store().version,
+    )
+
+
+@conditional.dataset_cached(_stats_etag)
+def stats_view(request):
+    """
+    Estadísticas agregadas (distribución de tipos, histogramas, percentiles
+    e IMC por tipo) calculadas sobre el almacén columnar en memoria.
+
+    Acepta los mismos filtros que el dashboard (name, type, rangos de peso y
+    altura, range_mode) más:
+        bins (int): Intervalos de los histogramas (1-100, por defecto 10).
+        percentiles (str): Lista separada por coma (ej: '50,90,99').
+    """
+    query = PokemonQuery.from_params(request.GET)
+
+    try:
+        bins = min(max(int(request.GET.get('bins', 10)), 1), 100)
+    except ValueError:
+        bins = 10
+    try:
+        percentiles = [
+            p for p in (float(v) for v in request.GET.get('percentiles', '').split(',') if v.strip())
+            if 0 <= p <= 100
+        ] or analytics.DEFAULT_PERCENTILES
+    except ValueError:
+        percentiles = analytics.DEFAULT_PERCENTILES
+
+    store = analytics.get_store()
+    indices = store.select(
+        name=query.name,
+        type_name=query.type_filter,
+        weight_range=query.weight_range,
+        height_range=query.height_range,
+        inclusive=query.inclusive,
+    )
+    return JsonResponse(store.summary(indices, bins=bins, percentiles=percentiles))
 
+
+def result_cache_stats_view(request):
+    """Aciertos/fallos de la caché de resultados del dashboard en este proceso."""
+    return JsonResponse(result_cache.stats())
+
+def _stream_rows(rows, fmt: str):
+    """Serializa las filas en bloques de API_CHUNK_SIZE (array JSON o una línea por fila)."""
+    buffer, first = [], True
+    if fmt == 'json':
+        yield '['
+    for row in rows:
+        line = json.dumps(row)
+        if fmt == 'json':
+            line = line if first else ',' + line
+        else:
+            line += '\n'
+        buffer.append(line)
+        first = False
+        if len(buffer) >= API_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer.clear()
+    if buffer:
+        yield ''.join(buffer)
+    if fmt == 'json':
+        yield ']'
+
+
+def _api_format(request) -> str:
+    """Formato pedido con ?format= o, si falta, por el header Accept."""
+    fmt = request.GET.get('format')
+    if not fmt:
+        fmt = 'ndjson' if API_FORMATS['ndjson'] in request.headers.get('Accept', '') else 'json'
+    return fmt
+
+
+def _api_etag(request) -> Optional[str]:
+    fmt = _api_format(request)
+    try:
+        fields = parse_fields(request.GET.get('fields', ''))
+    except ValueError:
+        return None
+    if fmt not in API_FORMATS:
+        return None
+    query = PokemonQuery.from_params(request.GET, limits=None, default_limit=None)
+    return conditional.dataset_etag('api', fmt, fields, query.cache_params())
+
+
+@conditional.dataset_cached(_api_etag, vary=('Accept',))
+def pokemon_api_view(request):
+    """
+    Consulta de Pokémon en JSON o NDJSON con la misma semántica de filtros y
+    orden que el dashboard (ver analysis/query.py).
+
+    Query Parameters adicionales:
+    -----------------------------
+    fields : str
+        Campos separados por coma (ej: 'name,types,weight_kg'). Vacío = todos.
+    format : str ('json' | 'ndjson')
+        Por defecto 'json', o 'ndjson' si el header Accept lo pide.
+    limit : int
+        Cantidad máxima de filas (sin límite si se omite).
+
+    La respuesta se transmite por bloques a medida que se leen de la DB, así
+    que el resultado completo nunca está en memoria.
+    """
+    fmt = _api_format(request)
+    if fmt not in API_FORMATS:
+        return JsonResponse({'error': f"Formato desconocido: {fmt}. Use 'json' o 'ndjson'."}, status=400)
+
+    try:
+        fields = parse_fields(request.GET.get('fields', ''))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    query = PokemonQuery.from_params(request.GET, limits=None, default_limit=None)
+    rows = query.rows(fields, chunk_size=API_CHUNK_SIZE)
+    return StreamingHttpResponse(_stream_rows(rows, fmt), content_type=API_FORMATS[fmt])
+
+
+def metrics_view(request):
+    """
+    Métricas del proceso en formato de texto de Prometheus: duración por
+    vista y fase, consultas SQL, estados HTTP y latencia/errores de PokeAPI.
+
+    Responde 404 si POKEDEX_METRICS_ENABLED está desactivado.
+    """
+    if not metrics.enabled():
+        raise Http404("Métricas desactivadas")
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _type_options() -> list:
+    """Tipos del filtro: el catálogo fijo más los que haya traído PokeAPI fuera de él."""
+    extra = Type.objects.exclude(name__in=TYPE_OPTIONS).order_by('name').values_list('name', flat=True)
+    return TYPE_OPTIONS + list(extra)
+
+
+def _sort_headers(query: PokemonQuery) -> list:
+    """Encabezados de la tabla con su estado de orden, resuelto aquí y no en el template."""
+    return [
+        {
+            'field': field,
+            'label': label,
+            'classes': classes,
+            'end': 'text-end' in classes,
+            'active': query.sort == field,
+            'descending': query.sort == field and query.direction == 'desc',
+        }
+        for field, label, classes in SORT_COLUMNS
+    ]
+
+
+def _dashboard_etag(request) -> str:
+    """Mismo criterio que la clave de la caché de resultados, por vista."""
+    scope = request.resolver_match.url_name if request.resolver_match else 'home'
+    return conditional.dataset_etag(scope, PokemonQuery.from_params(request.GET).cache_params())
+
+
+def _dashboard_context(request) -> dict:
+    """Contexto común del dashboard completo y del fragmento de la tabla."""
+    # --- 1. Captura de Filtros ---
+    query = PokemonQuery.from_params(request.GET)
+
+    # --- 2. Caché de Resultados ---
+    # Clave: parámetros normalizados (los inválidos se descartan igual que en
+    # los filtros) + versión del dataset, que cada escritura incrementa.
+    cache_key = result_cache.make_key(query.cache_params())
+    results = result_cache.lookup(cache_key)
+
+    if results is None:
+        # --- 3. Filtros, Conteo y Paginación (en SQL) ---
+        # COUNT(*) sobre el filtro y solo `limit` filas instanciadas por página
+        pokemons_qs = query.filtered()
+
+        # Sin coincidencias por nombre (ej: error de tipeo): coincidencias aproximadas
+        fuzzy_names = []
+        if query.name and not pokemons_qs.exists():
+            matches = search.fuzzy(query.name, limit=query.limit or FUZZY_LIMIT)
+            if matches:
+                fuzzy_names = [m.name for m in matches]
+                pokemons_qs = replace(query, name='').filtered().filter(pk__in=[m.pk for m in matches])
+
+        page = KeysetPaginator(pokemons_qs, query.sort_field, query.descending, query.limit).page(query.cursor)
+
+        # --- 4. Transformación para Visualización ---
+        for p in page.items:
+            p.type_list = [t.strip() for t in p.types.split(',')]
+
+            # DISPLAY: DB (dm) -> CM (dm * 10)
+            p.height_cm = int(p.height * 10)
+            p.weight_kg = round(p.weight / 10, 2)
+
+            if query.inverts_name:
+                p.transformed_value = p.name_reversed
+            else:
+                p.transformed_value = p.name
+
+        results = {
+            'pokemons': page.items,
+            'total_found': pokemons_qs.count(),
+            'next_token': page.next_token,
+            'prev_token': page.prev_token,
+            'needs_sync': _needs_sync(),
+            'fuzzy_names': fuzzy_names,
+        }
+        result_cache.store(cache_key, results)
+
+    return {
+        **results,
+        'current_limit': query.limit,
+        # Invocable: el template solo lo evalúa si el fragmento cacheado no existe
+        'types_options': _type_options,
+        'dataset_version': result_cache.dataset_version(),
+        'sort_headers': _sort_headers(query),
+        'filters': query.form_state(),
+        # Las filas del stream de sincronización solo se pintan si encajan en esta vista
+        'live_rows': query.matches_sync_stream,
+    }
+
+
+@conditional.dataset_cached(_dashboard_etag)
 def pokedex_view(request):
     """
     Controlador principal del Dashboard de Análisis.
@@ -32,155 +453,37 @@ def pokedex_view(request):
         Define si los rangos numéricos incluyen los límites (>=) o no (>).
     sort : str
         Campo por el cual ordenar ('pokedex_id', 'name', 'weight', etc.).
+    cursor : str
+        Token opaco de paginación por clave (ver analysis/pagination.py).
     transform_func : str
         Función de transformación en tiempo de ejecución (ej: 'invert').
 
     Context Context:
     ----------------
-    pokemons : QuerySet
-        Lista paginada/limitada de objetos Pokemon filtrados.
+    pokemons : list
+        Página actual (como máximo `limit` objetos Pokemon filtrados).
     total_found : int
-        Cantidad total de registros que coinciden antes del corte (limit).
+        Cantidad total de registros que coinciden (COUNT en la DB).
+    next_token / prev_token : str
+        Tokens para pedir la página siguiente / anterior ('' si no hay).
+    fuzzy_names : list
+        Nombres aproximados mostrados cuando el filtro por nombre no tuvo coincidencias.
     filters : dict
         Estado actual de los filtros para mantener la persistencia en la UI.
     needs_sync : bool
         Indica al frontend si debe activar el loader inicial y llamar al endpoint de sync.
     """
+    return render(request, 'analysis/index.html', _dashboard_context(request))
 
-    # --- 1. Captura de Filtros ---
-    search_name = request.GET.get('name', '').strip()
-    search_type = request.GET.get('type', '').strip()
-    
-    # Inputs crudos
-    min_weight_input = request.GET.get('min_weight', '').strip()
-    max_weight_input = request.GET.get('max_weight', '').strip()
-    min_height_input = request.GET.get('min_height', '').strip()
-    max_height_input = request.GET.get('max_height', '').strip()
-
-    # Captura del Límite de Registros
-    limit_input = request.GET.get('limit', '50')
-    try:
-        limit = int(limit_input)
-        if limit not in [10, 25, 50]: limit = 50
-    except ValueError:
-        limit = 50
-
-    # Limpieza de "None"
-    if min_weight_input == 'None': min_weight_input = ''
-    if max_weight_input == 'None': max_weight_input = ''
-    if min_height_input == 'None': min_height_input = ''
-    if max_height_input == 'None': max_height_input = ''
 
-    # Configuración
-    range_mode = request.GET.get('range_mode', 'strict')
-    transform_func = request.GET.get('transform_func', 'invert')
-    
-    # Ordenamiento
-    sort_param = request.GET.get('sort', 'pokedex_id')
-    sort_dir = request.GET.get('direction', 'asc')
-
-    db_sort_fields = ['pokedex_id', 'name', 'weight', 'height']
-    
-    pokemons_qs = Pokemon.objects.all()
-
-    if sort_param in db_sort_fields:
-        order_string = sort_param
-        if sort_dir == 'desc':
-            order_string = f"-{sort_param}"
-        pokemons_qs = pokemons_qs.order_by(order_string)
-
-    # --- 2. Aplicación de Filtros ---
-    if search_name:
-        pokemons_qs = pokemons_qs.filter(name__icontains=search_name)
-    
-    if search_type and search_type != 'all':
-        pokemons_qs = pokemons_qs.filter(types__icontains=search_type)
-        
-    is_inclusive = (range_mode == 'inclusive')
-
-    # PESO (Input KG -> DB HG) (1 kg = 10 hg)
-    if min_weight_input:
-        try:
-            val_hg = float(min_weight_input) * 10
-            if is_inclusive: pokemons_qs = pokemons_qs.filter(weight__gte=val_hg)
-            else: pokemons_qs = pokemons_qs.filter(weight__gt=val_hg)
-        except ValueError: pass
-
-    if max_weight_input:
-        try:
-            val_hg = float(max_weight_input) * 10
-            if is_inclusive: pokemons_qs = pokemons_qs.filter(weight__lte=val_hg)
-            else: pokemons_qs = pokemons_qs.filter(weight__lt=val_hg)
-        except ValueError: pass
-
-    # ALTURA (Input CM -> DB DM) 
-    # Conversión: 10 cm = 1 dm. Por tanto: cm / 10 = dm
-    if min_height_input:
-        try:
-            val_dm = float(min_height_input) / 10
-            if is_inclusive: pokemons_qs = pokemons_qs.filter(height__gte=val_dm)
-            else: pokemons_qs = pokemons_qs.filter(height__gt=val_dm)
-        except ValueError: pass
-
-    if max_height_input:
-        try:
-            val_dm = float(max_height_input) / 10
-            if is_inclusive: pokemons_qs = pokemons_qs.filter(height__lte=val_dm)
-            else: pokemons_qs = pokemons_qs.filter(height__lt=val_dm)
-        except ValueError: pass
-
-    # --- 3. Procesamiento y Transformación ---
-    pokemons_list = list(pokemons_qs)
-
-    for p in pokemons_list:
-        p.type_list = [t.strip() for t in p.types.split(',')]
-        p.types_count = len(p.type_list)
-        
-        # DISPLAY: DB (dm) -> CM (dm * 10)
-        p.height_cm = int(p.height * 10)
-        p.weight_kg = round(p.weight / 10, 2)
-
-        if transform_func == 'invert':
-            p.transformed_value = p.name[::-1]
-        else:
-            p.transformed_value = p.name 
-
-    # --- 4. Ordenamiento Personalizado ---
-    reverse_sort = (sort_dir == 'desc')
-
-    if sort_param == 'transformed':
-        pokemons_list.sort(key=lambda x: x.transformed_value, reverse=reverse_sort)
-    elif sort_param == 'types_count':
-        pokemons_list.sort(key=lambda x: x.types_count, reverse=reverse_sort)
-
-    # --- 5. Paginación ---
-    total_found = len(pokemons_list)
-    pokemons_display = pokemons_list[:limit]
-
-    all_types = [
-        "normal", "fighting", "flying", "poison", "ground", "rock", "bug", 
-        "ghost", "steel", "fire", "water", "grass", "electric", "psychic", 
-        "ice", "dragon", "dark", "fairy"
-    ]
-
-    context = {
-        'pokemons': pokemons_display,
-        'total_found': total_found,
-        'current_limit': limit,
-        'types_options': all_types,
-        'needs_sync': Pokemon.objects.count() < 50,
-        'filters': {
-            'name': search_name,
-            'type': search_type,
-            'min_weight': min_weight_input,
-            'max_weight': max_weight_input,
-            'min_height': min_height_input,
-            'max_height': max_height_input,
-            'range_mode': range_mode,
-            'current_sort': sort_param,
-            'current_dir': sort_dir,
-            'transform_func': transform_func
-        }
-    }
+@conditional.dataset_cached(_dashboard_etag)
+def table_view(request):
+    """
+    Fragmento de la tabla (encabezados, filas y pie de paginación).
 
-    return render(request, 'analysis/index.html', context)
\ No newline at end of file
+    Acepta los mismos parámetros que `pokedex_view` y comparte su caché de
+    resultados. El dashboard lo pide por AJAX al ordenar, filtrar, paginar o
+    cambiar el límite, y reemplaza solo la tabla en lugar de recargar la
+    página completa (base, formulario de filtros y tabla).
+    """
+    return render(request, 'analysis/components/table_fragment.html', _dashboard_context(request))
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Chequeo de arranque y precalentamiento de un proceso servidor.
+
+`check` verifica que el proceso puede atender peticiones: DB accesible,
+migraciones aplicadas y, con el pipeline de estáticos, el manifest de
+collectstatic presente. El entrypoint lo ejecuta antes de lanzar gunicorn
+para fallar rápido en lugar de responder 500.
+
+`warm` carga lo que de otro modo pagaría la primera petición de cada
+worker: conexión a la DB, almacén columnar, índices de búsqueda, templates
+compilados y la primera página del dashboard. Las cachés son por proceso,
+así que gunicorn lo llama en cada worker (hook `post_worker_init`).
+
+`warm_results` solo llena la caché de resultados con las primeras páginas
+del dashboard. Otro proceso solo lo aprovecha si el alias `results` es
+compartido (FileBasedCache en modo producción). Por eso `sync_pokedex` lo
+llama únicamente en ese caso: con LocMemCache las entradas morirían con el
+comando.
+"""
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory
+
+from . import analytics, result_cache, search
+from .views import SORT_COLUMNS, pokedex_view
+
+
+def check() -> List[str]:
+    """
+    Problemas que impiden servir (lista vacía si todo está bien).
+    """
+    problems = []
+    connection = connections[DEFAULT_DB_ALIAS]
+    try:
+        connection.ensure_connection()
+    except Exception as e:
+        return [f"La base de datos no responde: {e}"]
+
+    executor = MigrationExecutor(connection)
+    pending = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if pending:
+        problems.append(f"Hay {len(pending)} migraciones sin aplicar (ejecutar `manage.py migrate`).")
+
+    if isinstance(staticfiles_storage, ManifestFilesMixin) and not staticfiles_storage.load_manifest():
+        problems.append(f"Falta el manifest de estáticos en {settings.STATIC_ROOT} (ejecutar `manage.py collectstatic`).")
+    return problems
+
+
+def warm() -> Dict[str, float]:
+    """
+    Precalienta el proceso actual.
+
+    Returns:
+        Milisegundos por paso, en orden de ejecución.
+    """
+    steps = {
+        'db': lambda: connections[DEFAULT_DB_ALIAS].ensure_connection(),
+        'result_cache': result_cache.dataset_version,
+        'analytics': analytics.get_store,
+        'fuzzy_index': search.get_index,
+        'prefix_index': search.get_prefix_index,
+        'dashboard': lambda: pokedex_view(RequestFactory().get('/')),
+    }
+    timings = {}
+    for label, step in steps.items():
+        start = time.perf_counter()
+        step()
+        timings[label] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
+
+
+def warm_results() -> Dict[str, float]:
+    """
+    Renderiza la primera página del dashboard con el orden por defecto y con
+    cada columna ordenable, dejando sus resultados en la caché.
+
+    Returns:
+        Milisegundos por consulta ('default' o 'sort=<campo>').
+    """
+    queries = {'default': {}}
+    queries.update({f"sort={field}": {'sort': field} for field, _, _ in SORT_COLUMNS if field != 'pokedex_id'})
+    timings = {}
+    factory = RequestFactory()
+    for label, params in queries.items():
+        start = time.perf_counter()
+        pokedex_view(factory.get('/', params))
+        timings[label] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
@@ -0,0 +1,62 @@
+"""
+Configuración de gunicorn para los modos de servicio 'wsgi' y 'asgi'
+(POKEDEX_SERVER_MODE, ver docker/entrypoint.sh).
+
+* wsgi: worker gthread; los hilos cubren la E/S de la DB y las conexiones
+  largas (SSE de /sync-events/).
+* asgi: worker uvicorn (paquete uvicorn-worker); las vistas async (SSE) no
+  ocupan un hilo.
+
+Por defecto corre un solo worker. Las tareas en segundo plano
+(analysis/jobs.py) viven en la memoria del proceso que las lanzó. Con varios
+workers, /sync-data/ puede iniciar una segunda sincronización en otro
+proceso, y /sync-status/ y /sync-events/ solo ven la tarea si la petición
+cae en el worker que la ejecuta. WEB_CONCURRENCY > 1 sirve si la ingesta
+corre fuera del servidor (`sync_pokedex` desde cron con
+POKEDEX_SYNC_ON_VISIT=False).
+"""
+import multiprocessing
+
+# Sin `from decouple import config`: gunicorn interpreta cada nombre del módulo
+# como una opción, y `config` es una de ellas.
+import decouple
+
+MODE = decouple.config('POKEDEX_SERVER_MODE', default='wsgi')
+CORES = multiprocessing.cpu_count()
+
+bind = decouple.config('POKEDEX_BIND', default='0.0.0.0:8000')
+
+# Un worker: el registro de tareas de JobRunner es por proceso (ver arriba)
+workers = decouple.config('WEB_CONCURRENCY', default=1, cast=int)
+
+if MODE == 'asgi':
+    wsgi_app = 'pokedex_project.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'pokedex_project.wsgi:application'
+    worker_class = 'gthread'
+    # Con un único proceso, los hilos son los que atienden en paralelo
+    threads = decouple.config('POKEDEX_THREADS', default=CORES * 2 + 1, cast=int)
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    if server.cfg.workers > 1:
+        server.log.warning(
+            "%s workers: las tareas de /sync-data/ no se deduplican entre procesos y "
+            "/sync-status/ y /sync-events/ solo las ven en el worker que las ejecuta. "
+            "Sincronizar con `manage.py sync_pokedex` y POKEDEX_SYNC_ON_VISIT=False.",
+            server.cfg.workers,
+        )
+
+
+def post_worker_init(worker):
+    """Cada worker tiene sus propias cachés en memoria: se precalientan antes de aceptar tráfico."""
+    from analysis.warmup import warm
+
+    worker.log.info("Worker %s precalentado: %s", worker.pid, warm())
@@ -31,6 +31,87 @@ DEBUG = config('DEBUG', default=True, cast=bool)
 # URL de la API (Configuración personalizada solicitada)
 POKEAPI_URL = config('POKEAPI_URL', default='https://pokeapi.co/api/v2/pokemon')
 
+# Ingesta concurrente: peticiones de detalle simultáneas y límite por host (req/s, 0 = sin límite)
+POKEAPI_CONCURRENCY = config('POKEAPI_CONCURRENCY', default=8, cast=int)
+POKEAPI_RATE_LIMIT = config('POKEAPI_RATE_LIMIT', default=20.0, cast=float)
+
+# Resiliencia del cliente: reintentos por petición, backoff exponencial con jitter (base y tope en segundos),
+# circuit breaker (errores consecutivos que lo abren y segundos abierto) y pasadas diferidas sobre detalles fallidos
+POKEAPI_RETRIES = config('POKEAPI_RETRIES', default=3, cast=int)
+POKEAPI_BACKOFF_BASE = config('POKEAPI_BACKOFF_BASE', default=0.5, cast=float)
+POKEAPI_BACKOFF_MAX = config('POKEAPI_BACKOFF_MAX', default=30.0, cast=float)
+POKEAPI_BREAKER_THRESHOLD = config('POKEAPI_BREAKER_THRESHOLD', default=5, cast=int)
+POKEAPI_BREAKER_COOLDOWN = config('POKEAPI_BREAKER_COOLDOWN', default=10.0, cast=float)
+POKEAPI_DEFERRED_ROUNDS = config('POKEAPI_DEFERRED_ROUNDS', default=2, cast=int)
+
+# Persistencia: filas por lote en cada upsert (bulk_create)
+POKEAPI_BATCH_SIZE = config('POKEAPI_BATCH_SIZE', default=500, cast=int)
+
+# Catálogo: cantidad objetivo de especies a sincronizar y tamaño de página del listado
+POKEDEX_TARGET_SIZE = config('POKEDEX_TARGET_SIZE', default=50, cast=int)
+POKEAPI_PAGE_SIZE = config('POKEAPI_PAGE_SIZE', default=50, cast=int)
+
+# Caché de respuestas de PokeAPI en disco ('' la desactiva) y modo sin red
+POKEAPI_CACHE_PATH = config('POKEAPI_CACHE_PATH', default='')
+POKEAPI_CACHE_TTL = config('POKEAPI_CACHE_TTL', default=86400, cast=int)
+POKEAPI_CACHE_MAX_BYTES = config('POKEAPI_CACHE_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+POKEAPI_OFFLINE = config('POKEAPI_OFFLINE', default=False, cast=bool)
+POKEAPI_SNAPSHOT_PATH = config('POKEAPI_SNAPSHOT_PATH', default='')
+
+# Sincronización en segundo plano: filas por lote cuando se emiten eventos SSE al navegador
+SYNC_EVENTS_BATCH_SIZE = config('SYNC_EVENTS_BATCH_SIZE', default=10, cast=int)
+
+# Si es False el dashboard nunca lanza la sincronización desde el navegador (usar `manage.py sync_pokedex`)
+POKEDEX_SYNC_ON_VISIT = config('POKEDEX_SYNC_ON_VISIT', default=True, cast=bool)
+
+# Caché de resultados del dashboard: segundos de vida y cantidad máxima de consultas distintas (LRU)
+POKEDEX_RESULT_CACHE_TIMEOUT = config('POKEDEX_RESULT_CACHE_TIMEOUT', default=300, cast=int)
+POKEDEX_RESULT_CACHE_MAX_ENTRIES = config('POKEDEX_RESULT_CACHE_MAX_ENTRIES', default=512, cast=int)
+
+# Segundos que cada proceso reutiliza la versión del dataset sin leerla de la DB. Las escrituras
+# propias se ven al instante; las de otro proceso (cron, otro worker) como mucho tras este plazo
+POKEDEX_DATASET_VERSION_TTL = config('POKEDEX_DATASET_VERSION_TTL', default=2.0, cast=float)
+
+# Modo de servicio: 'dev' (runserver), 'wsgi' (gunicorn con hilos) o 'asgi' (gunicorn + workers uvicorn).
+# Fuera de 'dev' los estáticos se sirven comprimidos con WhiteNoise y la caché de resultados
+# se comparte entre workers (ver docker/entrypoint.sh y gunicorn.conf.py)
+POKEDEX_SERVER_MODE = config('POKEDEX_SERVER_MODE', default='dev')
+PRODUCTION_SERVING = POKEDEX_SERVER_MODE != 'dev'
+POKEDEX_RESULT_CACHE_DIR = config('POKEDEX_RESULT_CACHE_DIR', default=str(BASE_DIR / '.cache' / 'results'))
+
+# Almacén columnar de /stats/: si es True, tras una escritura se recarga en segundo plano y
+# mientras tanto se responde con el anterior (por defecto, fuera del modo 'dev')
+POKEDEX_ANALYTICS_BACKGROUND_REFRESH = config(
+    'POKEDEX_ANALYTICS_BACKGROUND_REFRESH', default=PRODUCTION_SERVING, cast=bool,
+)
+
+# Motor de base de datos: 'sqlite' (por defecto, archivo local) o 'postgresql' (varios
+# usuarios concurrentes; requiere psycopg y los datos de conexión POKEDEX_DB_*)
+POKEDEX_DB_ENGINE = config('POKEDEX_DB_ENGINE', default='sqlite')
+POKEDEX_DB_NAME = config('POKEDEX_DB_NAME', default='pokedex')
+POKEDEX_DB_USER = config('POKEDEX_DB_USER', default='pokedex')
+POKEDEX_DB_PASSWORD = config('POKEDEX_DB_PASSWORD', default='')
+POKEDEX_DB_HOST = config('POKEDEX_DB_HOST', default='localhost')
+POKEDEX_DB_PORT = config('POKEDEX_DB_PORT', default=5432, cast=int)
+
+# Segundos que se reutiliza una conexión a la DB entre peticiones (0 = una por petición)
+POKEDEX_DB_CONN_MAX_AGE = config('POKEDEX_DB_CONN_MAX_AGE', default=60, cast=int)
+
+# SQLite: journaling WAL (lecturas en paralelo a la sincronización), pragmas de rendimiento
+# (cache_size negativo = KiB) y segundos de espera ante un bloqueo antes de fallar
+POKEDEX_SQLITE_JOURNAL_MODE = config('POKEDEX_SQLITE_JOURNAL_MODE', default='wal')
+POKEDEX_SQLITE_SYNCHRONOUS = config('POKEDEX_SQLITE_SYNCHRONOUS', default='normal')
+POKEDEX_SQLITE_CACHE_SIZE = config('POKEDEX_SQLITE_CACHE_SIZE', default=-20000, cast=int)
+POKEDEX_SQLITE_MMAP_SIZE = config('POKEDEX_SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int)
+POKEDEX_SQLITE_BUSY_TIMEOUT = config('POKEDEX_SQLITE_BUSY_TIMEOUT', default=20.0, cast=float)
+
+# Segundos que navegador/proxy reutilizan dashboard, /table/, /api/pokemon/ y /stats/ sin revalidar
+# (0 = revalidan siempre; con el ETag por versión del dataset la respuesta es un 304 vacío)
+POKEDEX_HTTP_MAX_AGE = config('POKEDEX_HTTP_MAX_AGE', default=0, cast=int)
+
+# Instrumentación: cabecera Server-Timing, métricas en /metrics/ y latencia de PokeAPI
+POKEDEX_METRICS_ENABLED = config('POKEDEX_METRICS_ENABLED', default=True, cast=bool)
+
 # Permitimos todos los hosts para que Docker responda correctamente
 ALLOWED_HOSTS = ['*']
 
@@ -48,7 +129,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analysis.instrumentation.MetricsMiddleware',
+    # La versión del dataset (una consulta) se lee a lo sumo una vez por petición
+    'analysis.result_cache.DatasetVersionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # gzip de HTML/JSON (excepto SSE); los estáticos ya llegan comprimidos por WhiteNoise
+    'analysis.conditional.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -57,14 +143,28 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if PRODUCTION_SERVING:
+    # WhiteNoise sirve /static/ desde STATIC_ROOT, antes de sesiones y CSRF
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'whitenoise.middleware.WhiteNoiseMiddleware',
+    )
+
 ROOT_URLCONF = 'pokedex_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates con medición del tiempo de render (ver analysis/instrumentation.py)
+        'BACKEND': 'analysis.instrumentation.TimedDjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates compilados una vez por proceso (con DEBUG se recargan al editarlos)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -81,13 +181,64 @@ WSGI_APPLICATION = 'pokedex_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if POKEDEX_DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': POKEDEX_DB_NAME,
+            'USER': POKEDEX_DB_USER,
+            'PASSWORD': POKEDEX_DB_PASSWORD,
+            'HOST': POKEDEX_DB_HOST,
+            'PORT': POKEDEX_DB_PORT,
+            'CONN_MAX_AGE': POKEDEX_DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': POKEDEX_DB_CONN_MAX_AGE > 0,
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': POKEDEX_DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': POKEDEX_DB_CONN_MAX_AGE > 0,
+            'OPTIONS': {
+                # Espera (busy timeout) antes de "database is locked"
+                'timeout': POKEDEX_SQLITE_BUSY_TIMEOUT,
+                # BEGIN IMMEDIATE: una transacción de escritura toma el lock al empezar
+                # y respeta el timeout, en lugar de fallar al promover un lock de lectura
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # Tests en archivo (no en memoria compartida) para ejercitar WAL y los locks reales
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# 'results' guarda las páginas del dashboard (ver analysis/result_cache.py).
+# LocMemCache es por proceso y expulsa por LRU al superar MAX_ENTRIES.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'results': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pokedex-results',
+        'TIMEOUT': POKEDEX_RESULT_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': POKEDEX_RESULT_CACHE_MAX_ENTRIES},
+    },
 }
 
+if PRODUCTION_SERVING:
+    # Con varios workers las páginas cacheadas se comparten entre procesos. La versión
+    # del dataset vive en la DB, así que la invalidación no depende de este backend.
+    CACHES['results'].update({
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': POKEDEX_RESULT_CACHE_DIR,
+    })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -124,6 +275,15 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+if PRODUCTION_SERVING:
+    # collectstatic genera nombres con hash (manifest) y copias .gz / .br. WhiteNoise
+    # sirve los archivos con hash con Cache-Control de larga duración (immutable).
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+    }
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
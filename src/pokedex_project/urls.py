@@ -1,9 +1,21 @@
 from django.contrib import admin
 from django.urls import path
-from analysis.views import pokedex_view, sync_data_view 
+from analysis.views import (
+    autocomplete_view, metrics_view, pokedex_view, pokemon_api_view, result_cache_stats_view, search_view, stats_view,
+    sync_data_view, sync_events_view, sync_status_view, table_view,
+)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', pokedex_view, name='home'),
+    path('table/', table_view, name='table'),
     path('sync-data/', sync_data_view, name='sync_data'),
+    path('sync-status/', sync_status_view, name='sync_status'),
+    path('sync-events/', sync_events_view, name='sync_events'),
+    path('cache-stats/', result_cache_stats_view, name='cache_stats'),
+    path('api/pokemon/', pokemon_api_view, name='pokemon_api'),
+    path('stats/', stats_view, name='stats'),
+    path('search/', search_view, name='search'),
+    path('autocomplete/', autocomplete_view, name='autocomplete'),
+    path('metrics/', metrics_view, name='metrics'),
 ]
\ No newline at end of file